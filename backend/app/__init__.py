@@ -4,13 +4,16 @@ from flask_migrate import Migrate
 from flask_login import LoginManager
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
+from flask_caching import Cache
 from config import config
+from app import json_provider
 
 # Initialize extensions
 db = SQLAlchemy()
 migrate = Migrate()
 login_manager = LoginManager()
 jwt = JWTManager()
+cache = Cache()
 
 def create_app(config_name='default'):
     """Application factory pattern."""
@@ -18,17 +21,34 @@ def create_app(config_name='default'):
                 template_folder='../../frontend/html',
                 static_folder='../../frontend')
     app.config.from_object(config[config_name])
+    app.json = json_provider.OrjsonProvider(app)
     
     # JWT Configuration
     app.config['JWT_SECRET_KEY'] = app.config['SECRET_KEY']
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = 3600  # 1 hour
     app.config['JWT_REFRESH_TOKEN_EXPIRES'] = 2592000  # 30 days
     
+    # Serialize JSON columns with orjson
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **app.config['SQLALCHEMY_ENGINE_OPTIONS'],
+        'json_serializer': json_provider.dumps,
+        'json_deserializer': json_provider.loads,
+    }
+    
+    # Connection pool sizing (SQLite uses its own single-file pools)
+    if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            **app.config['SQLALCHEMY_ENGINE_OPTIONS'],
+            'pool_size': app.config['DB_POOL_SIZE'],
+            'max_overflow': app.config['DB_MAX_OVERFLOW'],
+        }
+    
     # Initialize extensions with app
     db.init_app(app)
     migrate.init_app(app, db)
     login_manager.init_app(app)
     jwt.init_app(app)
+    cache.init_app(app)
     CORS(app, origins=['http://localhost:3000', 'http://127.0.0.1:3000', 'http://127.0.0.1:5500', 'http://localhost:5500'])  # Allow frontend
     
     # Initialize database for production
@@ -42,6 +62,13 @@ def create_app(config_name='default'):
                 from scripts.create_sample_data import create_sample_data
                 create_sample_data()
     
+    # Write activity logged after a request's last commit
+    @app.teardown_request
+    def flush_pending_activity_logs(exception=None):
+        if exception is None:
+            from app.models import ActivityLog
+            ActivityLog.flush_pending()
+    
     # Configure login manager
     login_manager.login_view = 'auth.login'
     login_manager.login_message = 'Please log in to access this page.'
@@ -3,14 +3,16 @@ Complete API endpoints for Emergency Response Platform.
 All REST API endpoints in one organized file.
 """
 
-from flask import request, jsonify, current_app
+from flask import request, jsonify, current_app, stream_with_context
 from flask_jwt_extended import (
     jwt_required, get_jwt_identity, get_jwt,
     create_access_token, create_refresh_token
 )
+from sqlalchemy.orm import joinedload
 from app.api import bp
 from app.models import *
-from app import db
+from app import db, json_provider
+from app.json_provider import stream_array
 from app.services.emergency_service import EmergencyService
 from app.services.assignment_service import AssignmentService
 from app.services.admin_service import AdminService
@@ -95,6 +97,9 @@ def login():
         if not user.is_active:
             return api_response(error='Account is deactivated', status=403)
         
+        # Save the password hash if check_password upgraded it
+        db.session.commit()
+        
         # Create tokens
         access_token = create_access_token(
             identity=user.id,
@@ -323,9 +328,9 @@ def require_role(required_role):
     return None
 
 def get_current_user():
-    """Get current authenticated user."""
+    """Get current authenticated user, with the volunteer profile joined in."""
     user_id = get_jwt_identity()
-    return User.query.get(user_id)
+    return db.session.get(User, user_id, options=[joinedload(User.volunteer_profile)])
 
 def api_response(data=None, message=None, error=None, status=200):
     """Standard API response format."""
@@ -521,7 +526,9 @@ def get_volunteer_assignments():
         
         status_filter = request.args.get('status')
         
-        query = Assignment.query.filter_by(volunteer_id=user.volunteer_profile.id)
+        query = Assignment.query.options(
+            *Assignment.to_dict_options(include_emergency=True)
+        ).filter_by(volunteer_id=user.volunteer_profile.id)
         if status_filter:
             query = query.filter_by(status=status_filter)
         
@@ -682,18 +689,29 @@ def get_emergencies():
         if priority:
             query = query.filter_by(priority_level=priority)
         
-        emergencies = query.order_by(
-            EmergencyRequest.created_at.desc()
-        ).paginate(page=page, per_page=per_page, error_out=False)
+        if db.session.get_bind().dialect.name == 'postgresql':
+            # Postgres builds the page's JSON itself, so no ORM objects or dicts are created
+            total = query.count()
+            pages = -(-total // max(per_page, 1))
+            items = json_provider.raw(EmergencyRequest.list_json(query, page, per_page))
+        else:
+            emergencies = query.options(
+                *EmergencyRequest.to_dict_options(include_authority=True, include_skills=True)
+            ).order_by(
+                EmergencyRequest.created_at.desc()
+            ).paginate(page=page, per_page=per_page, error_out=False)
+            total = emergencies.total
+            pages = emergencies.pages
+            items = [e.to_dict(include_authority=True, include_skills=True) 
+                     for e in emergencies.items]
         
         return api_response({
-            'emergencies': [e.to_dict(include_authority=True, include_skills=True) 
-                          for e in emergencies.items],
+            'emergencies': items,
             'pagination': {
                 'page': page,
-                'pages': emergencies.pages,
+                'pages': pages,
                 'per_page': per_page,
-                'total': emergencies.total
+                'total': total
             }
         })
         
@@ -748,7 +766,11 @@ def get_emergency(emergency_id):
         user = get_current_user()
         claims = get_jwt()
         
-        emergency = EmergencyRequest.query.get(emergency_id)
+        emergency = db.session.get(
+            EmergencyRequest, emergency_id,
+            options=EmergencyRequest.to_dict_options(include_authority=True, include_skills=True,
+                                                     include_assignments=True)
+        )
         if not emergency:
             return api_response(error='Emergency not found', status=404)
         
@@ -809,7 +831,9 @@ def get_assignments():
         per_page = min(request.args.get('per_page', 20, type=int), 100)
         status = request.args.get('status')
         
-        query = Assignment.query
+        query = Assignment.query.options(
+            *Assignment.to_dict_options(include_emergency=True, include_volunteer=True)
+        )
         
         # Role-based filtering
         if claims.get('role') == 'volunteer':
@@ -949,6 +973,54 @@ def get_users():
     except Exception as e:
         return api_response(error=str(e), status=500)
 
+@bp.route('/admin/activity/recent', methods=['GET'])
+@jwt_required()
+def get_recent_activity():
+    """Get recent system activity (admin only)."""
+    try:
+        role_check = require_role('admin')
+        if role_check:
+            return role_check
+        
+        limit = min(request.args.get('limit', 50, type=int), 200)
+        before = parse_datetime_param(request.args.get('before'))
+        before_id = request.args.get('before_id', type=int)
+        
+        # The activity array arrives already serialized, so wrap it in the
+        # standard response envelope without parsing it again
+        activity_json = ActivityLog.get_recent_activity_json(limit, before=before, before_id=before_id)
+        timestamp = current_app.json.dumps(datetime.now(timezone.utc).isoformat())
+        body = f'{{"data":{activity_json},"success":true,"timestamp":{timestamp}}}'
+        
+        return current_app.response_class(body, mimetype='application/json')
+        
+    except Exception as e:
+        return api_response(error=str(e), status=500)
+
+@bp.route('/admin/users/<int:user_id>/activity', methods=['GET'])
+@jwt_required()
+def get_user_activity(user_id):
+    """Stream a user's full activity history (admin only)."""
+    role_check = require_role('admin')
+    if role_check:
+        return role_check
+    
+    # Plain rows are fetched from a server-side cursor and written as they
+    # arrive, so memory use stays flat however long the history is
+    stmt = ActivityLog.select_rows().where(
+        ActivityLog.user_id == user_id
+    ).order_by(
+        ActivityLog.created_at.desc()
+    ).execution_options(stream_results=True, yield_per=500)
+    
+    def generate():
+        rows = db.session.execute(stmt).mappings()
+        yield b'{"data":'
+        yield from stream_array(ActivityLog.to_dict_row(row) for row in rows)
+        yield b',"success":true}'
+    
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/json')
+
 @bp.route('/admin/skill-verifications', methods=['GET'])
 @jwt_required()
 def get_skill_verifications():
@@ -1428,23 +1500,17 @@ def get_authority_dashboard_stats():
         ).count()
         
         # Get assignment statistics for authority's emergencies
-        authority_emergency_ids = [e.id for e in EmergencyRequest.query.filter_by(
-            authority_id=user.id
-        ).all()]
-        
-        if authority_emergency_ids:
-            pending_assignments = Assignment.query.filter(
-                Assignment.emergency_id.in_(authority_emergency_ids),
-                Assignment.status == 'requested'
-            ).count()
-            
-            active_assignments = Assignment.query.filter(
-                Assignment.emergency_id.in_(authority_emergency_ids),
-                Assignment.status == 'accepted'
-            ).count()
-        else:
-            pending_assignments = 0
-            active_assignments = 0
+        authority_assignments = Assignment.query.join(
+            EmergencyRequest, Assignment.emergency_id == EmergencyRequest.id
+        ).filter(EmergencyRequest.authority_id == user.id)
+        
+        pending_assignments = authority_assignments.filter(
+            Assignment.status == 'requested'
+        ).count()
+        
+        active_assignments = authority_assignments.filter(
+            Assignment.status == 'accepted'
+        ).count()
         
         stats = {
             'total_emergencies': total_emergencies,
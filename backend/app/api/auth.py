@@ -87,6 +87,9 @@ def login():
         if not user.is_active:
             return jsonify({'error': 'Account is deactivated'}), 403
         
+        # Save the password hash if check_password upgraded it
+        db.session.commit()
+        
         # Create tokens
         access_token = create_access_token(
             identity=user.id,
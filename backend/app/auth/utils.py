@@ -2,11 +2,20 @@
 Authentication utilities and decorators for the Emergency Response Platform.
 """
 
+import json
 from functools import wraps
-from flask import abort, request, jsonify
+from flask import abort, request, Response
 from flask_login import current_user
 import bcrypt
 from app.models.activity_log import ActivityLog
+from app.models.user import ROLE_VOLUNTEER, ROLE_AUTHORITY, ROLE_ADMIN
+
+# Pre-serialized body for JSON 401 responses from the role decorators
+_AUTH_REQUIRED_BODY = json.dumps({'error': 'Authentication required'})
+
+def _json_error_response(body, status):
+    """Build a JSON error response from a pre-serialized body."""
+    return Response(body, status=status, mimetype='application/json')
 
 def hash_password(password):
     """Hash a password using bcrypt."""
@@ -30,36 +39,27 @@ def check_password(password, hashed_password):
 
 def require_role(required_role):
     """Decorator to require a specific user role."""
-    def decorator(f):
-        @wraps(f)
-        def decorated_function(*args, **kwargs):
-            if not current_user.is_authenticated:
-                if request.is_json:
-                    return jsonify({'error': 'Authentication required'}), 401
-                abort(401)
-            
-            if current_user.role != required_role:
-                if request.is_json:
-                    return jsonify({'error': f'Role {required_role} required'}), 403
-                abort(403)
-            
-            return f(*args, **kwargs)
-        return decorated_function
-    return decorator
+    return require_roles(required_role)
 
 def require_roles(*required_roles):
     """Decorator to require one of multiple user roles."""
+    allowed_roles = frozenset(required_roles)
+    if len(required_roles) == 1:
+        forbidden_body = json.dumps({'error': f'Role {required_roles[0]} required'})
+    else:
+        forbidden_body = json.dumps({'error': f'One of roles {required_roles} required'})
+    
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
             if not current_user.is_authenticated:
                 if request.is_json:
-                    return jsonify({'error': 'Authentication required'}), 401
+                    return _json_error_response(_AUTH_REQUIRED_BODY, 401)
                 abort(401)
             
-            if current_user.role not in required_roles:
+            if current_user.role not in allowed_roles:
                 if request.is_json:
-                    return jsonify({'error': f'One of roles {required_roles} required'}), 403
+                    return _json_error_response(forbidden_body, 403)
                 abort(403)
             
             return f(*args, **kwargs)
@@ -68,28 +68,28 @@ def require_roles(*required_roles):
 
 def require_volunteer():
     """Decorator to require volunteer role."""
-    return require_role('volunteer')
+    return require_role(ROLE_VOLUNTEER)
 
 def require_authority():
     """Decorator to require authority role."""
-    return require_role('authority')
+    return require_role(ROLE_AUTHORITY)
 
 def require_admin():
     """Decorator to require admin role."""
-    return require_role('admin')
+    return require_role(ROLE_ADMIN)
 
 def require_volunteer_or_admin():
     """Decorator to require volunteer or admin role."""
-    return require_roles('volunteer', 'admin')
+    return require_roles(ROLE_VOLUNTEER, ROLE_ADMIN)
 
 def require_authority_or_admin():
     """Decorator to require authority or admin role."""
-    return require_roles('authority', 'admin')
+    return require_roles(ROLE_AUTHORITY, ROLE_ADMIN)
 
 def log_user_activity(action, entity_type, entity_id=None, details=None):
     """Log user activity for audit trail."""
     if current_user.is_authenticated:
-        ip_address = request.environ.get('HTTP_X_FORWARDED_FOR', request.remote_addr)
+        ip_address = get_client_ip()
         user_agent = request.headers.get('User-Agent')
         
         ActivityLog.log_action(
@@ -104,12 +104,16 @@ def log_user_activity(action, entity_type, entity_id=None, details=None):
 
 def get_client_ip():
     """Get client IP address from request."""
-    return request.environ.get('HTTP_X_FORWARDED_FOR', request.remote_addr)
+    # access_route is parsed from X-Forwarded-For once and cached on the request
+    access_route = request.access_route
+    return access_route[0] if access_route else request.remote_addr
 
 def get_user_agent():
     """Get user agent from request."""
     return request.headers.get('User-Agent', '')
 
+PASSWORD_SPECIAL_CHARS = frozenset("!@#$%^&*()_+-=[]{}|;:,.<>?")
+
 def validate_password_strength(password):
     """Validate password strength requirements."""
     errors = []
@@ -117,18 +121,28 @@ def validate_password_strength(password):
     if len(password) < 8:
         errors.append('Password must be at least 8 characters long')
     
-    if not any(c.isupper() for c in password):
+    # Collect character classes in a single pass over the password
+    has_upper = has_lower = has_digit = has_special = False
+    for c in set(password):
+        if c.isupper():
+            has_upper = True
+        elif c.islower():
+            has_lower = True
+        elif c.isdigit():
+            has_digit = True
+        elif c in PASSWORD_SPECIAL_CHARS:
+            has_special = True
+    
+    if not has_upper:
         errors.append('Password must contain at least one uppercase letter')
     
-    if not any(c.islower() for c in password):
+    if not has_lower:
         errors.append('Password must contain at least one lowercase letter')
     
-    if not any(c.isdigit() for c in password):
+    if not has_digit:
         errors.append('Password must contain at least one number')
     
-    # Check for special characters
-    special_chars = "!@#$%^&*()_+-=[]{}|;:,.<>?"
-    if not any(c in special_chars for c in password):
+    if not has_special:
         errors.append('Password must contain at least one special character')
     
     return errors
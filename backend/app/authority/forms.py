@@ -7,6 +7,10 @@ from wtforms import StringField, TextAreaField, SelectField, IntegerField, Float
 from wtforms.validators import DataRequired, Length, NumberRange, Optional
 from wtforms.widgets import CheckboxInput, ListWidget
 
+def _to_int(value):
+    """Coerce a choice value to int, skipping the conversion when it already is one."""
+    return value if type(value) is int else int(value)
+
 class MultiCheckboxField(SelectMultipleField):
     widget = ListWidget(prefix_label=False)
     option_widget = CheckboxInput()
@@ -49,7 +53,7 @@ class EmergencyRequestForm(FlaskForm):
         DataRequired(message='Search radius is required'),
         NumberRange(min=1, max=100, message='Search radius must be between 1 and 100 km')
     ], default=10)
-    required_skills = MultiCheckboxField('Required Skills', coerce=int)
+    required_skills = MultiCheckboxField('Required Skills', coerce=_to_int)
     submit = SubmitField('Create Emergency Request')
 
 class EditEmergencyForm(FlaskForm):
@@ -78,6 +82,14 @@ class EditEmergencyForm(FlaskForm):
         DataRequired(message='Number of required volunteers is required'),
         NumberRange(min=1, max=50, message='Required volunteers must be between 1 and 50')
     ])
+    latitude = FloatField('Latitude', validators=[
+        Optional(),
+        NumberRange(min=-90, max=90, message='Latitude must be between -90 and 90')
+    ])
+    longitude = FloatField('Longitude', validators=[
+        Optional(),
+        NumberRange(min=-180, max=180, message='Longitude must be between -180 and 180')
+    ])
     search_radius_km = IntegerField('Search Radius (km)', validators=[
         DataRequired(message='Search radius is required'),
         NumberRange(min=1, max=100, message='Search radius must be between 1 and 100 km')
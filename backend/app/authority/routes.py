@@ -8,15 +8,67 @@ view volunteer assignments, and monitor system status.
 from flask import render_template, request, redirect, url_for, flash, jsonify, current_app
 from flask_login import login_required, current_user
 from app.authority import bp
-from app import db
+from app import db, cache
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import selectinload
 from app.models import EmergencyRequest, Assignment, Skill, VolunteerProfile, ActivityLog
+from app.models.volunteer import ALL_SKILLS_CACHE_KEY
 from app.services.emergency_service import EmergencyService
 from app.services.assignment_service import AssignmentService
+from app.services.matching_service import MatchingService
 from app.services.notification_service import NotificationService
 from app.auth.utils import require_role
+from app.authority.forms import EmergencyRequestForm, EditEmergencyForm
 from datetime import datetime, timedelta, timezone
+import hashlib
 import json
 
+@cache.cached(timeout=3600, key_prefix=ALL_SKILLS_CACHE_KEY)
+def _all_skills():
+    """
+    Get all skills for emergency forms (near-static, cached for an hour).
+    
+    Plain dictionaries of the fields the forms use are cached rather than
+    Skill instances, so cached entries never carry ORM state.
+    """
+    rows = db.session.execute(
+        select(Skill.id, Skill.name, Skill.category).order_by(Skill.name)
+    ).mappings()
+    return [dict(row) for row in rows]
+
+def _polled_json(data):
+    """
+    Serialize polled state, returning (etag, body).
+    
+    The ETag hashes everything except last_updated, which is stamped each time
+    the cached body is rebuilt, so unchanged state keeps the same validator.
+    """
+    state = {key: value for key, value in data.items() if key != 'last_updated'}
+    state_json = current_app.json.dumps(state, sort_keys=True)
+    etag = hashlib.blake2b(state_json.encode('utf-8'), digest_size=16).hexdigest()
+    return etag, current_app.json.dumps(data)
+
+def _conditional_json(etag, body):
+    """Build a JSON response with an ETag, answering 304 when the client copy matches."""
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+def _cached_count(cache_key, query):
+    """Count rows for a paginated list, sharing the total across page views for 30 seconds."""
+    total = cache.get(cache_key)
+    if total is None:
+        total = query.order_by(None).count()
+        cache.set(cache_key, total, timeout=30)
+    return total
+
+def _first_form_error(form):
+    """Get the first validation error message of a form."""
+    for errors in form.errors.values():
+        if errors:
+            return errors[0]
+    return 'Invalid form data'
+
 @bp.route('/dashboard')
 @login_required
 @require_role('authority')
@@ -36,25 +88,15 @@ def dashboard():
             user_id=current_user.id
         ).order_by(ActivityLog.created_at.desc()).limit(10).all()
         
-        # Get pending assignments for authority's emergencies
-        authority_emergency_ids = [e.id for e in emergencies]
-        pending_assignments = Assignment.query.filter(
-            Assignment.emergency_id.in_(authority_emergency_ids),
-            Assignment.status == 'requested'
-        ).count() if authority_emergency_ids else 0
-        
-        # Get active assignments
-        active_assignments = Assignment.query.filter(
-            Assignment.emergency_id.in_(authority_emergency_ids),
-            Assignment.status == 'accepted'
-        ).count() if authority_emergency_ids else 0
+        # Get pending and active assignments for authority's emergencies
+        assignment_counts = AssignmentService.get_authority_assignment_counts(current_user)
         
         dashboard_data = {
             'emergencies': emergencies,
             'system_stats': system_stats,
             'recent_activity': recent_activity,
-            'pending_assignments': pending_assignments,
-            'active_assignments': active_assignments,
+            'pending_assignments': assignment_counts['requested'],
+            'active_assignments': assignment_counts['accepted'],
             'total_emergencies': len(emergencies)
         }
         
@@ -75,8 +117,10 @@ def list_emergencies():
         page = request.args.get('page', 1, type=int)
         per_page = current_app.config.get('EMERGENCIES_PER_PAGE', 20)
         
-        # Get emergencies with pagination
-        query = EmergencyRequest.query.filter_by(authority_id=current_user.id)
+        # Get emergencies with pagination, loading assignment counts in one query
+        query = EmergencyRequest.query.options(
+            selectinload(EmergencyRequest.assignments)
+        ).filter_by(authority_id=current_user.id)
         
         if status_filter:
             query = query.filter_by(status=status_filter)
@@ -84,7 +128,10 @@ def list_emergencies():
         emergencies = query.order_by(
             EmergencyRequest.created_at.desc()
         ).paginate(
-            page=page, per_page=per_page, error_out=False
+            page=page, per_page=per_page, error_out=False, count=False
+        )
+        emergencies.total = _cached_count(
+            f'authority:{current_user.id}:emergencies:{status_filter or "all"}:count', query
         )
         
         return render_template('authority/emergencies.html', 
@@ -113,7 +160,6 @@ def view_emergency(emergency_id):
         assignments = AssignmentService.get_emergency_assignments(emergency_id, current_user)
         
         # Get available volunteers in the area (for manual assignment)
-        from app.services.matching_service import MatchingService
         available_volunteers = MatchingService.find_matching_volunteers(
             emergency, limit=10
         )
@@ -135,34 +181,29 @@ def create_emergency():
     """Create a new emergency request."""
     if request.method == 'GET':
         # Get available skills for the form
-        skills = Skill.query.all()
+        skills = _all_skills()
         return render_template('authority/create_emergency.html', skills=skills)
     
     try:
-        # Extract form data
-        emergency_data = {
-            'title': request.form.get('title', '').strip(),
-            'description': request.form.get('description', '').strip(),
-            'latitude': float(request.form.get('latitude', 0)),
-            'longitude': float(request.form.get('longitude', 0)),
-            'address': request.form.get('address', '').strip(),
-            'priority_level': request.form.get('priority_level', 'medium'),
-            'required_volunteers': int(request.form.get('required_volunteers', 1)),
-            'search_radius_km': int(request.form.get('search_radius_km', 10))
-        }
-        
-        # Validate required fields
-        if not emergency_data['title']:
-            flash('Emergency title is required.', 'error')
-            return redirect(url_for('authority.create_emergency'))
+        # Parse and validate the submitted form in one pass
+        form = EmergencyRequestForm(meta={'csrf': False})
+        form.required_skills.choices = [(skill['id'], skill['name']) for skill in _all_skills()]
         
-        if not emergency_data['description']:
-            flash('Emergency description is required.', 'error')
+        if not form.validate():
+            flash(f'Invalid input: {_first_form_error(form)}', 'error')
             return redirect(url_for('authority.create_emergency'))
         
-        # Get required skills
-        required_skill_ids = request.form.getlist('required_skills')
-        required_skill_ids = [int(sid) for sid in required_skill_ids if sid.isdigit()]
+        emergency_data = {
+            'title': form.title.data.strip(),
+            'description': form.description.data.strip(),
+            'latitude': form.latitude.data if form.latitude.data is not None else 0.0,
+            'longitude': form.longitude.data if form.longitude.data is not None else 0.0,
+            'address': (form.address.data or '').strip(),
+            'priority_level': form.priority_level.data,
+            'required_volunteers': form.required_volunteers.data,
+            'search_radius_km': form.search_radius_km.data
+        }
+        required_skill_ids = form.required_skills.data or []
         
         # Create emergency
         emergency = EmergencyService.create_emergency_request(
@@ -192,36 +233,32 @@ def edit_emergency(emergency_id):
             return redirect(url_for('authority.list_emergencies'))
         
         if request.method == 'GET':
-            skills = Skill.query.all()
+            skills = _all_skills()
             return render_template('authority/edit_emergency.html', 
                                  emergency=emergency, skills=skills)
         
-        # Handle POST request - update emergency
-        update_data = {}
-        
-        # Update fields if provided
-        if request.form.get('title'):
-            update_data['title'] = request.form.get('title').strip()
+        # Handle POST request - parse and validate the submitted form in one pass
+        form = EditEmergencyForm(meta={'csrf': False})
         
-        if request.form.get('description'):
-            update_data['description'] = request.form.get('description').strip()
-        
-        if request.form.get('address'):
-            update_data['address'] = request.form.get('address').strip()
-        
-        if request.form.get('priority_level'):
-            update_data['priority_level'] = request.form.get('priority_level')
+        if not form.validate():
+            flash(f'Error updating emergency: {_first_form_error(form)}', 'error')
+            return redirect(url_for('authority.view_emergency', emergency_id=emergency_id))
         
-        if request.form.get('required_volunteers'):
-            update_data['required_volunteers'] = int(request.form.get('required_volunteers'))
+        update_data = {
+            'title': form.title.data.strip(),
+            'description': form.description.data.strip(),
+            'priority_level': form.priority_level.data,
+            'required_volunteers': form.required_volunteers.data,
+            'search_radius_km': form.search_radius_km.data
+        }
         
-        if request.form.get('search_radius_km'):
-            update_data['search_radius_km'] = int(request.form.get('search_radius_km'))
+        if form.address.data:
+            update_data['address'] = form.address.data.strip()
         
         # Update coordinates if provided
-        if request.form.get('latitude') and request.form.get('longitude'):
-            update_data['latitude'] = float(request.form.get('latitude'))
-            update_data['longitude'] = float(request.form.get('longitude'))
+        if form.latitude.data is not None and form.longitude.data is not None:
+            update_data['latitude'] = form.latitude.data
+            update_data['longitude'] = form.longitude.data
         
         # Update emergency
         updated_emergency = EmergencyService.update_emergency_request(
@@ -323,18 +360,10 @@ def list_assignments():
         page = request.args.get('page', 1, type=int)
         per_page = current_app.config.get('ASSIGNMENTS_PER_PAGE', 20)
         
-        # Get authority's emergency IDs
-        authority_emergency_ids = [e.id for e in EmergencyRequest.query.filter_by(
-            authority_id=current_user.id
-        ).all()]
-        
-        if not authority_emergency_ids:
-            return render_template('authority/assignments.html', assignments=None)
-        
         # Get assignments for authority's emergencies
-        query = Assignment.query.filter(
-            Assignment.emergency_id.in_(authority_emergency_ids)
-        )
+        query = Assignment.query.join(
+            EmergencyRequest, Assignment.emergency_id == EmergencyRequest.id
+        ).filter(EmergencyRequest.authority_id == current_user.id)
         
         if status_filter:
             query = query.filter_by(status=status_filter)
@@ -342,7 +371,10 @@ def list_assignments():
         assignments = query.order_by(
             Assignment.assigned_at.desc()
         ).paginate(
-            page=page, per_page=per_page, error_out=False
+            page=page, per_page=per_page, error_out=False, count=False
+        )
+        assignments.total = _cached_count(
+            f'authority:{current_user.id}:assignments:{status_filter or "all"}:count', query
         )
         
         return render_template('authority/assignments.html', 
@@ -386,43 +418,61 @@ def reports():
         days = request.args.get('days', 30, type=int)
         start_date = datetime.now(timezone.utc) - timedelta(days=days)
         
-        # Get authority's emergencies in date range
-        emergencies = EmergencyRequest.query.filter(
+        # Emergency breakdowns by status and priority, aggregated in SQL
+        emergency_rows = db.session.query(
+            EmergencyRequest.status,
+            EmergencyRequest.priority_level,
+            func.count(EmergencyRequest.id)
+        ).filter(
             EmergencyRequest.authority_id == current_user.id,
             EmergencyRequest.created_at >= start_date
-        ).all()
+        ).group_by(EmergencyRequest.status, EmergencyRequest.priority_level).all()
         
-        # Calculate statistics
-        total_emergencies = len(emergencies)
+        total_emergencies = 0
         status_breakdown = {}
         priority_breakdown = {}
         
-        for emergency in emergencies:
-            # Status breakdown
-            status = emergency.status
-            status_breakdown[status] = status_breakdown.get(status, 0) + 1
-            
-            # Priority breakdown
-            priority = emergency.priority_level
-            priority_breakdown[priority] = priority_breakdown.get(priority, 0) + 1
-        
-        # Get assignment statistics
-        emergency_ids = [e.id for e in emergencies]
-        assignments = Assignment.query.filter(
-            Assignment.emergency_id.in_(emergency_ids)
-        ).all() if emergency_ids else []
+        for status, priority, count in emergency_rows:
+            total_emergencies += count
+            status_breakdown[status] = status_breakdown.get(status, 0) + count
+            priority_breakdown[priority] = priority_breakdown.get(priority, 0) + count
+        
+        # Assignment counts and response times per status, aggregated in SQL.
+        # Zero-minute responses are left out of the average as before.
+        response_time = Assignment.response_time_minutes
+        assignment_rows = db.session.query(
+            Assignment.status,
+            func.count(Assignment.id),
+            func.sum(case((response_time != 0, response_time), else_=0)),
+            func.count(case((response_time != 0, 1)))
+        ).join(EmergencyRequest).filter(
+            EmergencyRequest.authority_id == current_user.id,
+            EmergencyRequest.created_at >= start_date
+        ).group_by(Assignment.status).all()
         
         assignment_stats = {
-            'total_assignments': len(assignments),
-            'accepted': len([a for a in assignments if a.status == 'accepted']),
-            'declined': len([a for a in assignments if a.status == 'declined']),
-            'completed': len([a for a in assignments if a.status == 'completed']),
-            'cancelled': len([a for a in assignments if a.status == 'cancelled'])
+            'total_assignments': 0,
+            'accepted': 0,
+            'declined': 0,
+            'completed': 0,
+            'cancelled': 0
         }
+        response_time_total = 0
+        response_time_count = 0
         
-        # Calculate response times
-        response_times = [a.response_time_minutes for a in assignments if a.response_time_minutes]
-        avg_response_time = sum(response_times) / len(response_times) if response_times else 0
+        for status, count, time_total, time_count in assignment_rows:
+            assignment_stats['total_assignments'] += count
+            if status in assignment_stats:
+                assignment_stats[status] = count
+            response_time_total += time_total or 0
+            response_time_count += time_count
+        
+        avg_response_time = response_time_total / response_time_count if response_time_count else 0
+        
+        recent_emergencies = EmergencyRequest.query.filter(
+            EmergencyRequest.authority_id == current_user.id,
+            EmergencyRequest.created_at >= start_date
+        ).order_by(EmergencyRequest.created_at.desc()).limit(10).all()
         
         report_data = {
             'date_range': {
@@ -439,15 +489,15 @@ def reports():
             'performance_metrics': {
                 'average_response_time_minutes': round(avg_response_time, 2),
                 'acceptance_rate': round(
-                    (assignment_stats['accepted'] / len(assignments) * 100) 
-                    if assignments else 0, 2
+                    (assignment_stats['accepted'] / assignment_stats['total_assignments'] * 100) 
+                    if assignment_stats['total_assignments'] else 0, 2
                 ),
                 'completion_rate': round(
                     (assignment_stats['completed'] / assignment_stats['accepted'] * 100) 
                     if assignment_stats['accepted'] > 0 else 0, 2
                 )
             },
-            'recent_emergencies': emergencies[:10]
+            'recent_emergencies': recent_emergencies
         }
         
         return render_template('authority/reports.html', **report_data)
@@ -478,40 +528,71 @@ def cancel_assignment(assignment_id):
         flash(f'Error cancelling assignment: {str(e)}', 'error')
         return redirect(url_for('authority.list_assignments'))
 
+@bp.route('/assignments/cancel', methods=['POST'])
+@login_required
+@require_role('authority')
+def cancel_assignments():
+    """Cancel several volunteer assignments at once."""
+    try:
+        assignment_ids = request.form.getlist('assignment_ids', type=int)
+        reason = request.form.get('reason', '')
+        
+        if not assignment_ids:
+            flash('No assignments selected.', 'error')
+            return redirect(url_for('authority.list_assignments'))
+        
+        assignments = AssignmentService.cancel_assignments(
+            assignment_ids, current_user, reason
+        )
+        
+        flash(f'{len(assignments)} assignments cancelled successfully.', 'success')
+        return redirect(url_for('authority.list_assignments'))
+        
+    except Exception as e:
+        flash(f'Error cancelling assignments: {str(e)}', 'error')
+        return redirect(url_for('authority.list_assignments'))
+
 @bp.route('/api/emergency/<int:emergency_id>/status')
 @login_required
 @require_role('authority')
 def get_emergency_status(emergency_id):
     """Get real-time status of an emergency (AJAX endpoint)."""
     try:
-        emergency = EmergencyService.get_emergency_by_id(emergency_id, current_user)
-        
-        if not emergency:
-            return jsonify({'error': 'Emergency not found'}), 404
+        cache_key = EmergencyService.status_cache_key(current_user.id, emergency_id)
+        cached = cache.get(cache_key)
         
-        # Get current assignments
-        assignments = AssignmentService.get_emergency_assignments(emergency_id, current_user)
-        
-        status_data = {
-            'emergency': {
-                'id': emergency.id,
-                'status': emergency.status,
-                'priority_level': emergency.priority_level,
-                'escalation_count': emergency.escalation_count,
-                'volunteers_needed': emergency.volunteers_needed,
-                'expires_at': emergency.expires_at.isoformat() if emergency.expires_at else None
-            },
-            'assignments': {
-                'total': len(assignments),
-                'requested': len([a for a in assignments if a.status == 'requested']),
-                'accepted': len([a for a in assignments if a.status == 'accepted']),
-                'declined': len([a for a in assignments if a.status == 'declined']),
-                'completed': len([a for a in assignments if a.status == 'completed'])
-            },
-            'last_updated': datetime.now(timezone.utc).isoformat()
-        }
+        if cached is None:
+            emergency = EmergencyService.get_emergency_status_summary(emergency_id, current_user)
+            
+            if not emergency:
+                return jsonify({'error': 'Emergency not found'}), 404
+            
+            # Get current assignment counts
+            assignment_counts = AssignmentService.get_emergency_assignment_counts(emergency_id)
+            
+            status_data = {
+                'emergency': {
+                    'id': emergency.id,
+                    'status': emergency.status,
+                    'priority_level': emergency.priority_level,
+                    'escalation_count': emergency.escalation_count,
+                    'volunteers_needed': max(0, emergency.required_volunteers - assignment_counts['accepted']),
+                    'expires_at': emergency.expires_at.isoformat() if emergency.expires_at else None
+                },
+                'assignments': {
+                    'total': sum(assignment_counts.values()),
+                    'requested': assignment_counts['requested'],
+                    'accepted': assignment_counts['accepted'],
+                    'declined': assignment_counts['declined'],
+                    'completed': assignment_counts['completed']
+                },
+                'last_updated': datetime.now(timezone.utc).isoformat()
+            }
+            
+            cached = _polled_json(status_data)
+            cache.set(cache_key, cached, timeout=EmergencyService.STATUS_CACHE_TIMEOUT)
         
-        return jsonify(status_data)
+        return _conditional_json(*cached)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -522,58 +603,33 @@ def get_emergency_status(emergency_id):
 def get_dashboard_stats():
     """Get real-time dashboard statistics (AJAX endpoint)."""
     try:
-        # Get authority's emergency counts
-        emergency_counts = {
-            'open': EmergencyRequest.query.filter_by(
-                authority_id=current_user.id, status='open'
-            ).count(),
-            'assigned': EmergencyRequest.query.filter_by(
-                authority_id=current_user.id, status='assigned'
-            ).count(),
-            'completed': EmergencyRequest.query.filter_by(
-                authority_id=current_user.id, status='completed'
-            ).count(),
-            'cancelled': EmergencyRequest.query.filter_by(
-                authority_id=current_user.id, status='cancelled'
-            ).count()
-        }
+        cache_key = EmergencyService.dashboard_stats_cache_key(current_user.id)
+        cached = cache.get(cache_key)
         
-        # Get assignment counts for authority's emergencies
-        authority_emergency_ids = [e.id for e in EmergencyRequest.query.filter_by(
-            authority_id=current_user.id
-        ).all()]
-        
-        assignment_counts = {
-            'pending': 0,
-            'active': 0,
-            'completed': 0
-        }
-        
-        if authority_emergency_ids:
-            assignment_counts['pending'] = Assignment.query.filter(
-                Assignment.emergency_id.in_(authority_emergency_ids),
-                Assignment.status == 'requested'
-            ).count()
+        if cached is None:
+            # Get authority's emergency counts
+            emergency_counts = EmergencyService.get_emergency_status_counts(current_user)
             
-            assignment_counts['active'] = Assignment.query.filter(
-                Assignment.emergency_id.in_(authority_emergency_ids),
-                Assignment.status == 'accepted'
-            ).count()
+            # Get assignment counts for authority's emergencies
+            status_counts = AssignmentService.get_authority_assignment_counts(current_user)
+            assignment_counts = {
+                'pending': status_counts['requested'],
+                'active': status_counts['accepted'],
+                'completed': status_counts['completed']
+            }
             
-            assignment_counts['completed'] = Assignment.query.filter(
-                Assignment.emergency_id.in_(authority_emergency_ids),
-                Assignment.status == 'completed'
-            ).count()
-        
-        stats = {
-            'emergencies': emergency_counts,
-            'assignments': assignment_counts,
-            'total_emergencies': sum(emergency_counts.values()),
-            'total_assignments': sum(assignment_counts.values()),
-            'last_updated': datetime.now(timezone.utc).isoformat()
-        }
+            stats = {
+                'emergencies': emergency_counts,
+                'assignments': assignment_counts,
+                'total_emergencies': sum(emergency_counts.values()),
+                'total_assignments': sum(assignment_counts.values()),
+                'last_updated': datetime.now(timezone.utc).isoformat()
+            }
+            
+            cached = _polled_json(stats)
+            cache.set(cache_key, cached, timeout=EmergencyService.STATUS_CACHE_TIMEOUT)
         
-        return jsonify(stats)
+        return _conditional_json(*cached)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
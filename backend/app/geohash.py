@@ -0,0 +1,108 @@
+"""
+Geohash encoding for coarse spatial bucketing of locations.
+
+A geohash names a latitude/longitude cell with a base-32 string, and every
+point inside a cell has a geohash starting with that cell's string. Stored
+geohashes can therefore be searched with plain string range scans: the cells
+covering a search circle are found here, and each becomes one index range.
+"""
+
+import math
+
+# Characters of the geohash base-32 alphabet, in order
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Length of the geohash stored for each location (cells of about 37 x 19 m)
+STORED_PRECISION = 8
+
+# Kilometres per degree of latitude (and of longitude at the equator) on the
+# 6371 km sphere used for Haversine distances
+KM_PER_DEGREE = math.pi * 6371.0 / 180
+
+def encode(lat, lon, precision=STORED_PRECISION):
+    """Encode a point as a geohash of the given length."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    
+    while len(chars) < precision:
+        # Bits alternate between longitude and latitude, starting with longitude
+        coord, bounds = (lon, lon_range) if even else (lat, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        value <<= 1
+        if coord >= middle:
+            value |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+    
+    return ''.join(chars)
+
+def cell_size(precision):
+    """Height and width in degrees of the cells of a geohash length."""
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+def cell_end(cell):
+    """
+    Get the first string that sorts after every geohash inside a cell.
+    
+    The last character is advanced in base-32 order, carrying into earlier
+    characters past 'z'. Returns None for cells such as 'z' or 'zz' that
+    have no geohash after them.
+    """
+    prefix = cell.rstrip('z')
+    if not prefix:
+        return None
+    return prefix[:-1] + BASE32[BASE32.index(prefix[-1]) + 1]
+
+def covering_cells(lat, lon, radius_km):
+    """
+    Get geohash cells that together cover every point within radius_km.
+    
+    Uses the longest geohash whose cells are at least radius_km tall and
+    wide, so the cell containing the centre plus its eight neighbours cover
+    the circle. Returns None when the circle is too large or reaches a pole,
+    in which case no cell filter should be applied.
+    """
+    lat_delta = radius_km / KM_PER_DEGREE
+    if abs(lat) + lat_delta >= 90:
+        return None
+    
+    # Cells are narrowest on the edge of the circle nearest a pole
+    min_width_factor = math.cos(math.radians(abs(lat) + lat_delta))
+    
+    precision = 0
+    while precision < STORED_PRECISION:
+        height, width = cell_size(precision + 1)
+        if (height * KM_PER_DEGREE < radius_km or
+                width * KM_PER_DEGREE * min_width_factor < radius_km):
+            break
+        precision += 1
+    
+    if precision == 0:
+        return None
+    
+    height, width = cell_size(precision)
+    cells = set()
+    for lat_step in (-1, 0, 1):
+        cell_lat = lat + lat_step * height
+        if not -90 <= cell_lat <= 90:
+            continue
+        for lon_step in (-1, 0, 1):
+            # Wrap across the antimeridian
+            cell_lon = (lon + lon_step * width + 180) % 360 - 180
+            cells.add(encode(cell_lat, cell_lon, precision))
+    
+    return sorted(cells)
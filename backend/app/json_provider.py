@@ -0,0 +1,61 @@
+"""
+JSON serialization for the Emergency Response Platform.
+
+orjson is used for both JSON database columns and Flask JSON responses,
+in place of the much slower standard library json module.
+"""
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+def dumps(obj):
+    """Serialize a value stored in a JSON database column."""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+def loads(s):
+    """Deserialize a value read from a JSON database column."""
+    return orjson.loads(s)
+
+def stream_array(items):
+    """
+    Serialize an iterable as a JSON array one item at a time.
+    
+    Used as a streamed response body, so large results never have to be
+    held in memory or serialized in full before the first byte is sent.
+    """
+    yield b'['
+    for index, item in enumerate(items):
+        if index:
+            yield b','
+        yield orjson.dumps(item, option=orjson.OPT_NON_STR_KEYS)
+    yield b']'
+
+def raw(json_text):
+    """
+    Wrap already serialized JSON so it is embedded in a response as is.
+    
+    Used for JSON built by the database, which would otherwise have to be
+    parsed into Python objects only to be serialized again.
+    """
+    return orjson.Fragment(json_text)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson."""
+    
+    def dumps(self, obj, **kwargs):
+        """
+        Serialize data as JSON. Datetimes are written as ISO 8601 by orjson,
+        matching the isoformat() strings used throughout the API; other
+        types fall back to Flask's default handling.
+        """
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+    
+    def loads(self, s, **kwargs):
+        """Deserialize data as JSON."""
+        return orjson.loads(s)
@@ -3,4 +3,4 @@ from app.models.user import User
 from app.models.volunteer import VolunteerProfile, Skill, VolunteerSkill
 from app.models.emergency import EmergencyRequest, EmergencyRequiredSkill
 from app.models.assignment import Assignment
-from app.models.activity_log import ActivityLog
\ No newline at end of file
+from app.models.activity_log import ActivityLog, UserAgent
\ No newline at end of file
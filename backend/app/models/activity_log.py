@@ -1,7 +1,93 @@
 from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy import Text, and_, event, func, insert, or_, select, text, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
+from sqlalchemy.orm import Session, selectinload
 from app import db
+from app.models.sql_functions import insert_ignore, utcnow
+import hashlib
 import json
 
+# Session.info key holding activity log rows waiting to be inserted
+PENDING_LOGS_KEY = 'pending_activity_logs'
+
+# In-process map of User-Agent strings to their user_agents row id
+USER_AGENT_CACHE_SIZE = 4096
+_user_agent_ids = {}
+
+class UserAgent(db.Model):
+    """Distinct User-Agent strings, stored once and referenced by activity logs."""
+    
+    __tablename__ = 'user_agents'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    hash = db.Column(db.String(40), unique=True, nullable=False)  # SHA-1 hex digest of text
+    text = db.Column(db.Text, nullable=False)
+    
+    @staticmethod
+    def hash_text(text):
+        """Get the lookup hash for a User-Agent string."""
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def resolve_ids(session, texts):
+        """
+        Map User-Agent strings to user_agents ids, creating rows for new ones.
+        
+        Known strings are served from an in-process cache. Only ids that were
+        already in the database are cached, so a rolled back insert can never
+        leave a dangling id behind.
+        
+        Args:
+            session: Session whose transaction the lookups run in
+            texts: Iterable of User-Agent strings
+            
+        Returns:
+            Dictionary mapping each string to its id
+        """
+        ids = {}
+        missing = {}
+        for ua_text in set(texts):
+            if ua_text in _user_agent_ids:
+                ids[ua_text] = _user_agent_ids[ua_text]
+            else:
+                missing[UserAgent.hash_text(ua_text)] = ua_text
+        
+        if not missing:
+            return ids
+        
+        found = session.execute(
+            select(UserAgent.hash, UserAgent.id).where(UserAgent.hash.in_(missing))
+        ).all()
+        
+        if len(_user_agent_ids) + len(found) > USER_AGENT_CACHE_SIZE:
+            _user_agent_ids.clear()
+        
+        for ua_hash, ua_id in found:
+            ua_text = missing.pop(ua_hash)
+            ids[ua_text] = _user_agent_ids[ua_text] = ua_id
+        
+        if missing:
+            session.execute(
+                UserAgent._insert_ignore(session),
+                [{'hash': ua_hash, 'text': ua_text} for ua_hash, ua_text in missing.items()]
+            )
+            created = session.execute(
+                select(UserAgent.hash, UserAgent.id).where(UserAgent.hash.in_(missing))
+            ).all()
+            for ua_hash, ua_id in created:
+                ids[missing[ua_hash]] = ua_id
+        
+        return ids
+    
+    @staticmethod
+    def _insert_ignore(session):
+        """Build an INSERT that skips strings another writer already stored."""
+        return insert_ignore(UserAgent, ['hash'], session.get_bind().dialect.name)
+    
+    def __repr__(self):
+        return f'<UserAgent {self.text[:50]}>'
+
 class ActivityLog(db.Model):
     """Activity log model for audit trail of all user actions and system events."""
     
@@ -12,36 +98,143 @@ class ActivityLog(db.Model):
     action = db.Column(db.String(100), nullable=False)
     entity_type = db.Column(db.String(50), nullable=False)
     entity_id = db.Column(db.Integer)
-    details = db.Column(db.JSON)
+    details = db.Column(db.JSON().with_variant(JSONB(), 'postgresql'))
     ip_address = db.Column(db.String(45))
-    user_agent = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+    user_agent_id = db.Column(db.Integer, db.ForeignKey('user_agents.id'))
+    created_at = db.Column(db.DateTime, server_default=utcnow())
     
-    # Indexes for efficient querying
+    # Indexes for efficient querying. On Postgres the table can also be
+    # partitioned by month on created_at; see scripts/partition_activity_logs.sql
     __table_args__ = (
         db.Index('idx_user_action', 'user_id', 'action'),
         db.Index('idx_entity', 'entity_type', 'entity_id'),
-        db.Index('idx_created_at', 'created_at'),
+        # Covers recent-activity listings so Postgres can answer them from the index alone
+        db.Index('idx_created_at_cover', 'created_at',
+                 postgresql_include=['action', 'entity_type', 'entity_id', 'user_id']),
+        # Postgres only: containment searches on any details key, plus equality
+        # lookups on the hot id keys (see get_activity_by_detail)
+        db.Index('idx_activity_details_gin', 'details', postgresql_using='gin',
+                 postgresql_ops={'details': 'jsonb_path_ops'}).ddl_if(dialect='postgresql'),
+        db.Index('idx_activity_details_volunteer',
+                 text("(details->>'volunteer_id')")).ddl_if(dialect='postgresql'),
+        db.Index('idx_activity_details_emergency',
+                 text("(details->>'emergency_id')")).ddl_if(dialect='postgresql'),
     )
     
-    def __init__(self, **kwargs):
-        super(ActivityLog, self).__init__(**kwargs)
+    # Relationships
+    user_agent_entry = db.relationship('UserAgent')
+    
+    @property
+    def user_agent(self):
+        """Get the User-Agent string the action was made with."""
+        return self.user_agent_entry.text if self.user_agent_entry else None
+    
+    @staticmethod
+    def write_pending(session):
+        """Insert all queued log entries for a session in one batch."""
+        pending = session.info.pop(PENDING_LOGS_KEY, None)
+        if pending:
+            ActivityLog.insert_rows(session, pending)
+    
+    @staticmethod
+    def insert_rows(session, rows):
+        """
+        Insert queued log entries with one multi-row INSERT, replacing each
+        User-Agent string with a reference to its user_agents row.
+        """
+        user_agent_ids = UserAgent.resolve_ids(
+            session, [row['user_agent'] for row in rows if row['user_agent']]
+        )
+        
+        values = []
+        for row in rows:
+            row = dict(row)
+            row['user_agent_id'] = user_agent_ids.get(row.pop('user_agent'))
+            values.append(row)
+        
+        session.execute(insert(ActivityLog), values)
+    
+    @staticmethod
+    def discard_pending(session):
+        """Drop queued log entries, e.g. when their transaction is rolled back."""
+        session.info.pop(PENDING_LOGS_KEY, None)
+    
+    @staticmethod
+    def relax_commit_durability(session):
+        """
+        Let a transaction holding only audit rows commit without waiting for
+        the WAL flush on Postgres; losing the last few entries on a crash is acceptable.
+        """
+        if (current_app.config.get('AUDIT_LOG_ASYNC_COMMIT')
+                and session.get_bind().dialect.name == 'postgresql'):
+            session.execute(text('SET LOCAL synchronous_commit TO OFF'))
+    
+    @staticmethod
+    def uses_background_writes():
+        """
+        Check whether committed entries are handed to the background writer.
+        
+        SQLite allows only one writer at a time, so a flusher thread would
+        contend with requests for the lock; there entries are always written
+        in the committing transaction instead.
+        """
+        return bool(current_app.config.get('AUDIT_LOG_BACKGROUND_WRITES')
+                    and db.engine.dialect.name != 'sqlite')
+    
+    @staticmethod
+    def flush_pending():
+        """
+        Write log entries queued after the last commit of a request or task.
+        
+        The entries are inserted in their own short transaction, so changes
+        left uncommitted on the session are never committed along with them.
+        """
+        pending = db.session.info.pop(PENDING_LOGS_KEY, None)
+        if not pending:
+            return
+        
+        if ActivityLog.uses_background_writes():
+            from app.services.audit_log_service import AuditLogService
+            AuditLogService.enqueue(pending)
+            return
+        
+        try:
+            with Session(db.engine) as session, session.begin():
+                ActivityLog.relax_commit_durability(session)
+                ActivityLog.insert_rows(session, pending)
+        except Exception as e:
+            print(f"Error writing activity logs: {str(e)}")
     
     @staticmethod
     def log_action(user_id, action, entity_type, entity_id=None, details=None, 
                    ip_address=None, user_agent=None):
-        """Create a new activity log entry."""
-        log_entry = ActivityLog(
-            user_id=user_id,
-            action=action,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            details=details,
-            ip_address=ip_address,
-            user_agent=user_agent
-        )
+        """
+        Create a new activity log entry, queued on the current session.
+        
+        Queued entries are dropped if the session rolls back. Once it commits
+        they are handed to the background audit log writer, or written with a
+        single multi-row INSERT in the same transaction when
+        AUDIT_LOG_BACKGROUND_WRITES is off or the database is SQLite.
+        """
+        log_entry = {
+            'user_id': user_id,
+            'action': action,
+            'entity_type': entity_type,
+            'entity_id': entity_id,
+            'details': details,
+            'ip_address': ip_address,
+            'user_agent': user_agent,
+            # Stamped now rather than by the database, since the row may be
+            # written well after the action by the background writer
+            'created_at': datetime.now(timezone.utc)
+        }
         
-        db.session.add(log_entry)
+        # Tie the entry to a transaction so a rollback discards it
+        session = db.session()
+        if not session.in_transaction():
+            session.begin()
+        
+        session.info.setdefault(PENDING_LOGS_KEY, []).append(log_entry)
         return log_entry
     
     @staticmethod
@@ -115,14 +308,6 @@ class ActivityLog(db.Model):
             user_agent=user_agent
         )
     
-    @staticmethod
-    def log_skill_verification_decision(admin_user, volunteer_skill, decision, notes=None, 
-                                      ip_address=None, user_agent=None):
-        """Log skill verification decision (alias for compatibility)."""
-        return ActivityLog.log_skill_verification(
-            admin_user, volunteer_skill, decision, notes, ip_address, user_agent
-        )
-    
     @staticmethod
     def log_emergency_creation(user, emergency, ip_address=None, user_agent=None):
         """Log emergency request creation."""
@@ -245,10 +430,36 @@ class ActivityLog(db.Model):
             user_agent=user_agent
         )
     
+    @staticmethod
+    def select_rows():
+        """
+        Build a Core SELECT of the fields in to_dict.
+        
+        For reads that only need plain data: rows come back without ORM
+        instances or identity-map bookkeeping. Convert each mapping with
+        to_dict_row.
+        """
+        return select(
+            ActivityLog.id,
+            ActivityLog.user_id,
+            ActivityLog.action,
+            ActivityLog.entity_type,
+            ActivityLog.entity_id,
+            ActivityLog.details,
+            ActivityLog.ip_address,
+            UserAgent.text.label('user_agent'),
+            ActivityLog.created_at
+        ).outerjoin(UserAgent, ActivityLog.user_agent_id == UserAgent.id)
+    
+    @staticmethod
+    def to_dict_row(row):
+        """Convert a row from select_rows to the dictionary to_dict would give."""
+        return dict(row)
+    
     @staticmethod
     def get_user_activity(user_id, limit=None):
         """Get activity history for a specific user."""
-        query = ActivityLog.query.filter_by(user_id=user_id).order_by(
+        query = ActivityLog.query.options(selectinload(ActivityLog.user)).filter_by(user_id=user_id).order_by(
             ActivityLog.created_at.desc()
         )
         
@@ -271,11 +482,73 @@ class ActivityLog(db.Model):
         return query.all()
     
     @staticmethod
-    def get_recent_activity(limit=50):
-        """Get recent system activity."""
-        return ActivityLog.query.order_by(
-            ActivityLog.created_at.desc()
-        ).limit(limit).all()
+    def _before_cursor(before, before_id=None):
+        """
+        Build the filter for entries older than a keyset cursor.
+        
+        Entries are ordered by (created_at, id), so entries sharing the
+        cursor's timestamp are kept when they have a lower id. Without
+        before_id only the timestamp is compared.
+        """
+        # Stored timestamps are naive UTC
+        if before.tzinfo is not None:
+            before = before.astimezone(timezone.utc).replace(tzinfo=None)
+        
+        if before_id is None:
+            return ActivityLog.created_at < before
+        
+        return or_(
+            ActivityLog.created_at < before,
+            and_(ActivityLog.created_at == before, ActivityLog.id < before_id)
+        )
+    
+    @staticmethod
+    def get_recent_activity(limit=50, before=None, before_id=None):
+        """
+        Get recent system activity, newest first.
+        
+        Pages are fetched with a keyset cursor rather than an offset: pass the
+        created_at and id of the last entry on one page as `before` and
+        `before_id` to get the next.
+        """
+        query = ActivityLog.query.options(selectinload(ActivityLog.user))
+        if before:
+            query = query.filter(ActivityLog._before_cursor(before, before_id))
+        
+        return query.order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc()).limit(limit).all()
+    
+    @staticmethod
+    def get_recent_activity_json(limit=50, before=None, before_id=None):
+        """
+        Get recent system activity as a serialized JSON array.
+        
+        On Postgres the array is built by the database, so no ORM objects or
+        Python dictionaries are created; other databases select the same
+        columns and serialize them with the app's JSON provider. `before`
+        and `before_id` work as in get_recent_activity.
+        """
+        recent = select(
+            ActivityLog.id, ActivityLog.user_id, ActivityLog.action,
+            ActivityLog.entity_type, ActivityLog.entity_id,
+            ActivityLog.details, ActivityLog.created_at
+        ).order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc()).limit(limit)
+        
+        if before:
+            recent = recent.where(ActivityLog._before_cursor(before, before_id))
+        
+        if db.session.get_bind().dialect.name == 'postgresql':
+            recent = recent.subquery('t')
+            return db.session.execute(
+                select(func.coalesce(
+                    func.json_agg(aggregate_order_by(
+                        recent.table_valued(), recent.c.created_at.desc(), recent.c.id.desc()
+                    )),
+                    text("'[]'")
+                ).cast(Text))
+            ).scalar()
+        
+        rows = db.session.execute(recent).mappings().all()
+        return current_app.json.dumps([dict(row) for row in rows])
     
     @staticmethod
     def get_activity_by_action(action, limit=None):
@@ -289,8 +562,43 @@ class ActivityLog(db.Model):
         
         return query.all()
     
+    @staticmethod
+    def get_activity_by_detail(key, value, limit=None):
+        """
+        Get activity whose details contain key with the given value.
+        
+        On Postgres this is a JSONB containment query answered by the GIN index
+        on details, so any key is searchable; volunteer_id, emergency_id and
+        assignment_id are the ones recorded consistently by the log helpers.
+        
+        Args:
+            key: Top-level key in details, e.g. 'volunteer_id'
+            value: Value the key must have
+            limit: Maximum number of entries to return
+            
+        Returns:
+            List of ActivityLog objects, newest first
+        """
+        if db.session.get_bind().dialect.name == 'postgresql':
+            condition = type_coerce(ActivityLog.details, JSONB).contains({key: value})
+        elif isinstance(value, int):
+            condition = ActivityLog.details[key].as_integer() == value
+        else:
+            condition = ActivityLog.details[key].as_string() == value
+        
+        query = ActivityLog.query.filter(condition).order_by(ActivityLog.created_at.desc())
+        
+        if limit:
+            query = query.limit(limit)
+        
+        return query.all()
+    
     def to_dict(self, include_user=False):
-        """Convert activity log to dictionary representation."""
+        """
+        Convert activity log to dictionary representation.
+        
+        Timestamps are left as datetimes; the JSON provider writes them as ISO 8601.
+        """
         data = {
             'id': self.id,
             'user_id': self.user_id,
@@ -300,7 +608,7 @@ class ActivityLog(db.Model):
             'details': self.details,
             'ip_address': self.ip_address,
             'user_agent': self.user_agent,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
         
         if include_user and self.user:
@@ -314,4 +622,23 @@ class ActivityLog(db.Model):
         return data
     
     def __repr__(self):
-        return f'<ActivityLog {self.action} on {self.entity_type}:{self.entity_id}>'
\ No newline at end of file
+        return f'<ActivityLog {self.action} on {self.entity_type}:{self.entity_id}>'
+
+
+@event.listens_for(db.session, 'before_commit')
+def _write_pending_activity_logs(session):
+    if not ActivityLog.uses_background_writes():
+        ActivityLog.write_pending(session)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _enqueue_pending_activity_logs(session):
+    pending = session.info.pop(PENDING_LOGS_KEY, None)
+    if pending:
+        from app.services.audit_log_service import AuditLogService
+        AuditLogService.enqueue(pending)
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _discard_pending_activity_logs(session, previous_transaction):
+    ActivityLog.discard_pending(session)
@@ -1,5 +1,8 @@
 from datetime import datetime, timezone
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import selectinload
 from app import db
+from app.models.sql_functions import insert_ignore, minutes_between, utcnow
 
 class Assignment(db.Model):
     """Assignment model linking volunteers to emergency requests."""
@@ -11,18 +14,27 @@ class Assignment(db.Model):
     volunteer_id = db.Column(db.Integer, db.ForeignKey('volunteer_profiles.id'), nullable=False)
     status = db.Column(db.Enum('requested', 'accepted', 'declined', 'completed', 'cancelled',
                              name='assignment_statuses'), default='requested')
-    assigned_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    assigned_at = db.Column(db.DateTime, server_default=utcnow())
     responded_at = db.Column(db.DateTime)
     completed_at = db.Column(db.DateTime)
     notes = db.Column(db.Text)
     
+    # Timings in whole minutes, computed by the database (NULL until both times are set)
+    response_time_minutes = db.Column(db.Integer, db.Computed(minutes_between(assigned_at, responded_at), persisted=True))
+    completion_time_minutes = db.Column(db.Integer, db.Computed(minutes_between(responded_at, completed_at), persisted=True))
+    total_time_minutes = db.Column(db.Integer, db.Computed(minutes_between(assigned_at, completed_at), persisted=True))
+    
     # Unique constraint to prevent duplicate assignments
     __table_args__ = (
         db.UniqueConstraint('emergency_id', 'volunteer_id', name='unique_assignment'),
         db.Index('idx_volunteer_status', 'volunteer_id', 'status'),
         db.Index('idx_emergency_status', 'emergency_id', 'status'),
+        db.Index('idx_assigned_at', 'assigned_at'),
     )
     
+    # Fetch server-generated assigned_at and timings with the write itself (RETURNING where supported)
+    __mapper_args__ = {'eager_defaults': True}
+    
     def __init__(self, **kwargs):
         super(Assignment, self).__init__(**kwargs)
     
@@ -56,30 +68,6 @@ class Assignment(db.Model):
         """Check if assignment is active (accepted but not completed)."""
         return self.status == 'accepted'
     
-    @property
-    def response_time_minutes(self):
-        """Calculate response time in minutes."""
-        if self.responded_at and self.assigned_at:
-            delta = self.responded_at - self.assigned_at
-            return int(delta.total_seconds() / 60)
-        return None
-    
-    @property
-    def completion_time_minutes(self):
-        """Calculate completion time in minutes."""
-        if self.completed_at and self.responded_at:
-            delta = self.completed_at - self.responded_at
-            return int(delta.total_seconds() / 60)
-        return None
-    
-    @property
-    def total_time_minutes(self):
-        """Calculate total time from assignment to completion in minutes."""
-        if self.completed_at and self.assigned_at:
-            delta = self.completed_at - self.assigned_at
-            return int(delta.total_seconds() / 60)
-        return None
-    
     def accept(self, notes=None):
         """Accept the assignment."""
         self.status = 'accepted'
@@ -109,24 +97,71 @@ class Assignment(db.Model):
             self.notes = notes
         
         # Check if all assignments for this emergency are completed
-        emergency = self.emergency_request
-        active_assignments = [a for a in emergency.assignments if a.is_active]
+        active_count = db.session.query(func.count(Assignment.id)).filter(
+            Assignment.emergency_id == self.emergency_id,
+            Assignment.status == 'accepted',
+            Assignment.id != self.id
+        ).scalar()
         
-        if not active_assignments:
-            emergency.status = 'completed'
+        if not active_count:
+            self.emergency_request.status = 'completed'
     
     def cancel(self, notes=None):
         """Cancel the assignment."""
+        old_status = self.status
         self.status = 'cancelled'
         if notes:
             self.notes = notes
         
         # If this was an accepted assignment, update emergency status back to open
-        if self.status == 'accepted':
+        if old_status == 'accepted':
             emergency = self.emergency_request
             if emergency.status == 'assigned':
                 emergency.status = 'open'
     
+    @staticmethod
+    def upsert(emergency_id, volunteer_id, status='requested'):
+        """
+        Create an assignment unless the volunteer is already assigned to the emergency.
+        
+        The insert skips conflicts on the unique (emergency_id, volunteer_id) key in
+        the database, so concurrent dispatches cannot race each other into an
+        IntegrityError that would roll back the whole batch.
+        
+        Args:
+            emergency_id: ID of the emergency request
+            volunteer_id: ID of the volunteer profile
+            status: Initial assignment status
+            
+        Returns:
+            The new Assignment, or None if one already existed
+        """
+        session = db.session
+        stmt = insert_ignore(Assignment, ['emergency_id', 'volunteer_id'], session.get_bind().dialect.name)
+        result = session.execute(stmt.values(
+            emergency_id=emergency_id,
+            volunteer_id=volunteer_id,
+            status=status
+        ))
+        
+        if not result.rowcount:
+            return None
+        
+        # Core inserts skip the mapper events that queue this for ORM writes
+        Assignment.queue_statistics_invalidation(session, volunteer_id)
+        
+        return session.get(Assignment, result.inserted_primary_key[0])
+    
+    @staticmethod
+    def queue_statistics_invalidation(session, volunteer_id):
+        """
+        Drop a volunteer's cached assignment statistics once the session commits.
+        
+        ORM changes to assignments are queued automatically; bulk UPDATE and
+        Core INSERT statements must call this themselves.
+        """
+        session.info.setdefault(PENDING_STATS_INVALIDATION_KEY, set()).add(volunteer_id)
+    
     @staticmethod
     def get_volunteer_history(volunteer_id, limit=None):
         """Get assignment history for a volunteer."""
@@ -162,23 +197,49 @@ class Assignment(db.Model):
             status='accepted'
         ).order_by(Assignment.assigned_at.desc()).all()
     
+    @staticmethod
+    def to_dict_options(include_emergency=False, include_volunteer=False):
+        """
+        Get query loader options for everything to_dict reads with the same flags.
+        
+        Apply these to list queries that are serialized with to_dict, so related
+        rows load in one query per relationship instead of one per assignment.
+        """
+        from app.models.emergency import EmergencyRequest
+        from app.models.volunteer import VolunteerProfile
+        
+        options = []
+        if include_emergency:
+            options.append(selectinload(Assignment.emergency_request).options(
+                *EmergencyRequest.to_dict_options(include_authority=True, include_skills=True)
+            ))
+        if include_volunteer:
+            options.append(selectinload(Assignment.volunteer_profile).joinedload(VolunteerProfile.user))
+        
+        return options
+    
     def to_dict(self, include_emergency=False, include_volunteer=False):
-        """Convert assignment to dictionary representation."""
+        """
+        Convert assignment to dictionary representation.
+        
+        Timestamps are left as datetimes; the JSON provider writes them as ISO 8601.
+        """
+        status = self.status
         data = {
             'id': self.id,
             'emergency_id': self.emergency_id,
             'volunteer_id': self.volunteer_id,
-            'status': self.status,
-            'is_requested': self.is_requested,
-            'is_accepted': self.is_accepted,
-            'is_declined': self.is_declined,
-            'is_completed': self.is_completed,
-            'is_cancelled': self.is_cancelled,
-            'is_active': self.is_active,
+            'status': status,
+            'is_requested': status == 'requested',
+            'is_accepted': status == 'accepted',
+            'is_declined': status == 'declined',
+            'is_completed': status == 'completed',
+            'is_cancelled': status == 'cancelled',
+            'is_active': status == 'accepted',
             'notes': self.notes,
-            'assigned_at': self.assigned_at.isoformat() if self.assigned_at else None,
-            'responded_at': self.responded_at.isoformat() if self.responded_at else None,
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'assigned_at': self.assigned_at,
+            'responded_at': self.responded_at,
+            'completed_at': self.completed_at,
             'response_time_minutes': self.response_time_minutes,
             'completion_time_minutes': self.completion_time_minutes,
             'total_time_minutes': self.total_time_minutes
@@ -193,4 +254,32 @@ class Assignment(db.Model):
         return data
     
     def __repr__(self):
-        return f'<Assignment {self.emergency_id}:{self.volunteer_id} ({self.status})>'
\ No newline at end of file
+        return f'<Assignment {self.emergency_id}:{self.volunteer_id} ({self.status})>'
+
+
+# Session info key for volunteers whose cached statistics are dropped after commit
+PENDING_STATS_INVALIDATION_KEY = 'pending_assignment_stats_invalidations'
+
+@event.listens_for(Assignment, 'after_insert')
+@event.listens_for(Assignment, 'after_delete')
+def _invalidate_written_assignment_statistics(mapper, connection, target):
+    Assignment.queue_statistics_invalidation(inspect(target).session, target.volunteer_id)
+
+@event.listens_for(Assignment, 'after_update')
+def _invalidate_updated_assignment_statistics(mapper, connection, target):
+    session = inspect(target).session
+    Assignment.queue_statistics_invalidation(session, target.volunteer_id)
+    # A reassigned volunteer loses the assignment from their statistics too
+    for volunteer_id in inspect(target).attrs.volunteer_id.history.deleted:
+        Assignment.queue_statistics_invalidation(session, volunteer_id)
+
+@event.listens_for(db.session, 'after_commit')
+def _apply_statistics_invalidations(session):
+    pending = session.info.pop(PENDING_STATS_INVALIDATION_KEY, None)
+    if pending:
+        from app.services.assignment_service import AssignmentService
+        AssignmentService.invalidate_statistics_cache(pending)
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _discard_statistics_invalidations(session, previous_transaction):
+    session.info.pop(PENDING_STATS_INVALIDATION_KEY, None)
@@ -1,6 +1,18 @@
 from datetime import datetime, timedelta, timezone
+from sqlalchemy import case, func, inspect, select
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import validates
+from sqlalchemy.orm.base import NO_VALUE
 from app import db
 
+# Numeric priority used for sorting, and the level each priority escalates to
+_PRIORITY_SCORES = {'low': 1, 'medium': 2, 'high': 3, 'critical': 4}
+_NEXT_PRIORITY = {'low': 'medium', 'medium': 'high', 'high': 'critical', 'critical': 'critical'}
+
+def _utcnow():
+    """Current UTC time, used for column defaults."""
+    return datetime.now(timezone.utc)
+
 class EmergencyRequest(db.Model):
     """Emergency request model with location and skill requirements."""
     
@@ -10,8 +22,8 @@ class EmergencyRequest(db.Model):
     authority_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
-    latitude = db.Column(db.Numeric(10, 8), nullable=False)
-    longitude = db.Column(db.Numeric(11, 8), nullable=False)
+    latitude = db.Column(db.Double, nullable=False)
+    longitude = db.Column(db.Double, nullable=False)
     address = db.Column(db.String(500))
     incident_type = db.Column(db.String(100))  # Fire, Flood, Earthquake, etc.
     estimated_duration_hours = db.Column(db.Integer)
@@ -28,10 +40,15 @@ class EmergencyRequest(db.Model):
     required_volunteers = db.Column(db.Integer, default=1)
     search_radius_km = db.Column(db.Integer, default=10)
     escalation_count = db.Column(db.Integer, default=0)
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), index=True)
-    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, default=_utcnow, index=True)
+    updated_at = db.Column(db.DateTime, default=_utcnow, onupdate=_utcnow)
     expires_at = db.Column(db.DateTime)
     
+    # Numeric priority for sorting, computed by the database from priority_level
+    priority_score = db.Column(db.Integer, db.Computed(
+        case(_PRIORITY_SCORES, value=priority_level, else_=1), persisted=True
+    ))
+    
     # Relationships
     required_skills = db.relationship('EmergencyRequiredSkill', backref='emergency_request',
                                     cascade='all, delete-orphan')
@@ -42,9 +59,16 @@ class EmergencyRequest(db.Model):
     __table_args__ = (
         db.Index('idx_location_priority', 'latitude', 'longitude', 'priority_level'),
         db.Index('idx_status_created', 'status', 'created_at'),
-        db.Index('idx_authority', 'authority_id'),
+        db.Index('idx_authority_created', 'authority_id', 'created_at'),
+        db.Index('idx_authority_status', 'authority_id', 'status'),
+        db.Index('idx_dispatch', status, priority_score.desc(), created_at),
+        db.Index('idx_status_expires', 'status', 'expires_at'),
+        db.Index('idx_created_status_priority', 'created_at', 'status', 'priority_level'),
     )
     
+    # Fetch the server-computed priority_score with the write itself (RETURNING where supported)
+    __mapper_args__ = {'eager_defaults': True}
+    
     def __init__(self, **kwargs):
         super(EmergencyRequest, self).__init__(**kwargs)
         # Set default expiration time if not provided
@@ -53,6 +77,11 @@ class EmergencyRequest(db.Model):
             timeout_minutes = current_app.config.get('ESCALATION_TIMEOUT_MINUTES', 30)
             self.expires_at = datetime.now(timezone.utc) + timedelta(minutes=timeout_minutes)
     
+    @validates('latitude', 'longitude')
+    def validate_coordinate(self, key, value):
+        """Store coordinates as floats, whatever form or JSON type they arrive as."""
+        return None if value in (None, '') else float(value)
+    
     @property
     def is_open(self):
         """Check if emergency is open."""
@@ -78,17 +107,6 @@ class EmergencyRequest(db.Model):
         """Check if emergency has expired."""
         return self.expires_at and datetime.now(timezone.utc) > self.expires_at
     
-    @property
-    def priority_score(self):
-        """Get numeric priority score for sorting."""
-        priority_scores = {
-            'low': 1,
-            'medium': 2,
-            'high': 3,
-            'critical': 4
-        }
-        return priority_scores.get(self.priority_level, 1)
-    
     @property
     def required_skill_ids(self):
         """Get list of required skill IDs."""
@@ -114,23 +132,45 @@ class EmergencyRequest(db.Model):
         """Get list of pending assignments."""
         return [a for a in self.assignments if a.status == 'requested']
     
+    @hybrid_property
+    def accepted_count(self):
+        """
+        Number of accepted assignments.
+        
+        Counted from the assignments collection when it is already loaded (or the
+        emergency is not yet saved); otherwise a COUNT on idx_emergency_status.
+        """
+        from app.models.assignment import Assignment
+        
+        if self.id is None or inspect(self).attrs.assignments.loaded_value is not NO_VALUE:
+            return sum(1 for a in self.assignments if a.status == 'accepted')
+        
+        return db.session.query(func.count(Assignment.id)).filter(
+            Assignment.emergency_id == self.id,
+            Assignment.status == 'accepted'
+        ).scalar()
+    
+    @accepted_count.expression
+    def accepted_count(cls):
+        from app.models.assignment import Assignment
+        
+        return select(func.count(Assignment.id)).where(
+            Assignment.emergency_id == cls.id,
+            Assignment.status == 'accepted'
+        ).scalar_subquery()
+    
     @property
     def volunteers_needed(self):
         """Calculate how many more volunteers are needed."""
-        accepted_count = len(self.accepted_assignments)
-        return max(0, self.required_volunteers - accepted_count)
+        return max(0, self.required_volunteers - self.accepted_count)
     
     def escalate(self):
         """Escalate the emergency priority and expand search radius."""
+        now = datetime.now(timezone.utc)
         self.escalation_count += 1
         
         # Increase priority level
-        if self.priority_level == 'low':
-            self.priority_level = 'medium'
-        elif self.priority_level == 'medium':
-            self.priority_level = 'high'
-        elif self.priority_level == 'high':
-            self.priority_level = 'critical'
+        self.priority_level = _NEXT_PRIORITY.get(self.priority_level, self.priority_level)
         
         # Expand search radius
         from flask import current_app
@@ -140,29 +180,67 @@ class EmergencyRequest(db.Model):
         
         # Extend expiration time
         timeout_minutes = current_app.config.get('ESCALATION_TIMEOUT_MINUTES', 30)
-        self.expires_at = datetime.now(timezone.utc) + timedelta(minutes=timeout_minutes)
+        self.expires_at = now + timedelta(minutes=timeout_minutes)
         
-        self.updated_at = datetime.now(timezone.utc)
+        self.updated_at = now
     
     def get_distance_from_volunteer(self, volunteer_profile):
         """Calculate distance from volunteer location."""
         if not volunteer_profile.latitude or not volunteer_profile.longitude:
             return None
-        return volunteer_profile.get_distance_from(float(self.latitude), float(self.longitude))
+        return volunteer_profile.get_distance_from(self.latitude, self.longitude)
     
     def find_matching_volunteers(self, limit=None):
         """Find volunteers that match this emergency's requirements."""
+        from app.models.volunteer import VolunteerProfile
+        
+        query = self._matching_volunteers_query(VolunteerProfile)
+        
+        if limit:
+            query = query.limit(limit)
+        
+        return query.all()
+    
+    def find_matching_volunteer_ids(self, limit=None):
+        """
+        Find matching volunteers as lightweight (id, user_id, distance) rows.
+        
+        Same matches and order as find_matching_volunteers, without building
+        VolunteerProfile objects; use this when only the ids are needed.
+        """
+        from app.models.volunteer import VolunteerProfile
+        
+        query = self._matching_volunteers_query(VolunteerProfile.id, VolunteerProfile.user_id)
+        
+        if limit:
+            query = query.limit(limit)
+        
+        return query.all()
+    
+    def _matching_volunteers_query(self, *entities):
+        """Build the matching volunteers query, selecting entities plus the distance."""
         from app.models.volunteer import VolunteerProfile, VolunteerSkill
-        from sqlalchemy import and_, func
+        from app.models.sql_functions import in_geohash_cells, within_radius
+        from app import geohash
+        from flask import current_app
+        
+        lat, lon = self.latitude, self.longitude
         
-        # Base query for available volunteers within radius
-        query = db.session.query(VolunteerProfile).filter(
+        # Available volunteers within the radius, found by a range scan of the
+        # unit-vector index rather than evaluating trigonometry on every row
+        query = db.session.query(*entities).filter(
             VolunteerProfile.availability_status == 'available',
-            VolunteerProfile.latitude.isnot(None),
-            VolunteerProfile.longitude.isnot(None)
+            within_radius(VolunteerProfile.cx, VolunteerProfile.cy, VolunteerProfile.cz,
+                          lat, lon, self.search_radius_km)
         )
         
-        # Add distance filter using Haversine formula
+        # Optionally narrow to the geohash cells covering the radius first
+        if current_app.config.get('MATCHING_GEOHASH_PREFILTER'):
+            cells = geohash.covering_cells(lat, lon, self.search_radius_km)
+            if cells:
+                query = query.filter(in_geohash_cells(VolunteerProfile.geohash, cells))
+        
+        # Haversine distance, only evaluated for volunteers inside the radius
         lat_rad = func.radians(self.latitude)
         lon_rad = func.radians(self.longitude)
         vol_lat_rad = func.radians(VolunteerProfile.latitude)
@@ -177,46 +255,164 @@ class EmergencyRequest(db.Model):
             )
         )
         
-        query = query.filter(distance <= self.search_radius_km)
-        
         # Filter by required skills if any
-        if self.required_skill_ids:
-            # Volunteers must have at least one verified required skill
-            query = query.join(VolunteerSkill).filter(
-                and_(
-                    VolunteerSkill.skill_id.in_(self.required_skill_ids),
+        required_skill_ids = self.required_skill_ids
+        if required_skill_ids:
+            # Volunteers must have at least one verified required skill; EXISTS stops at
+            # the first match on idx_volunteer_verified, with no join rows to de-duplicate
+            query = query.filter(
+                db.session.query(VolunteerSkill.id).filter(
+                    VolunteerSkill.volunteer_id == VolunteerProfile.id,
+                    VolunteerSkill.skill_id.in_(required_skill_ids),
                     VolunteerSkill.verification_status == 'verified'
-                )
-            ).distinct()
+                ).exists()
+            )
         
         # Order by priority: distance and verification level
-        query = query.add_columns(distance.label('distance')).order_by('distance')
+        return query.add_columns(distance.label('distance')).order_by('distance')
+    
+    @staticmethod
+    def to_dict_options(include_authority=False, include_skills=False, include_assignments=False):
+        """
+        Get query loader options for everything to_dict reads with the same flags.
         
-        if limit:
-            query = query.limit(limit)
+        Apply these to queries whose results are serialized with to_dict, so
+        related rows load in one query per relationship instead of one per
+        emergency, required skill or assignment.
+        """
+        from sqlalchemy.orm import joinedload, selectinload
+        from app.models.assignment import Assignment
+        from app.models.volunteer import VolunteerProfile
         
-        return query.all()
+        # volunteers_needed counts the loaded assignments instead of querying per emergency
+        assignments = selectinload(EmergencyRequest.assignments)
+        if include_assignments:
+            assignments = assignments.joinedload(Assignment.volunteer_profile).options(
+                joinedload(VolunteerProfile.user),
+                selectinload(VolunteerProfile.volunteer_skills)
+            )
+        
+        options = [assignments]
+        if include_authority:
+            options.append(joinedload(EmergencyRequest.authority))
+        if include_skills:
+            options.append(selectinload(EmergencyRequest.required_skills).joinedload(EmergencyRequiredSkill.skill))
+        
+        return options
+    
+    @staticmethod
+    def list_json(query, page, per_page):
+        """
+        Serialize one page of emergencies to a JSON array inside Postgres.
+        
+        Produces the same objects as to_dict(include_authority=True, include_skills=True),
+        newest first, so list endpoints can pass the database's JSON straight
+        through instead of loading ORM objects and building dicts row by row.
+        
+        Args:
+            query: Filtered EmergencyRequest query
+            page: Page number, starting at 1
+            per_page: Emergencies per page
+            
+        Returns:
+            JSON array text
+        """
+        from sqlalchemy import Text, cast, literal_column
+        from sqlalchemy.dialects.postgresql import aggregate_order_by
+        from sqlalchemy.orm import aliased
+        from app.models.sql_functions import utcnow
+        from app.models.user import User
+        from app.models.volunteer import Skill
+        
+        rows = query.order_by(EmergencyRequest.created_at.desc()).limit(per_page).offset(
+            max(page - 1, 0) * per_page
+        ).subquery()
+        emergency = aliased(EmergencyRequest, rows)
+        
+        authority = select(func.json_build_object(
+            'id', User.id,
+            'email', User.email,
+            'role', User.role,
+            'first_name', User.first_name,
+            'last_name', User.last_name,
+            'full_name', User.first_name + ' ' + User.last_name,
+            'phone', User.phone,
+            'is_active', User.is_active,
+            'created_at', User.created_at,
+            'updated_at', User.updated_at
+        )).where(User.id == emergency.authority_id).scalar_subquery()
+        
+        required_skills = select(func.coalesce(func.json_agg(func.json_build_object(
+            'id', EmergencyRequiredSkill.id,
+            'emergency_id', EmergencyRequiredSkill.emergency_id,
+            'skill_id', EmergencyRequiredSkill.skill_id,
+            'is_mandatory', EmergencyRequiredSkill.is_mandatory,
+            'created_at', EmergencyRequiredSkill.created_at,
+            'skill', func.json_build_object(
+                'id', Skill.id,
+                'name', Skill.name,
+                'category', Skill.category,
+                'description', Skill.description,
+                'created_at', Skill.created_at
+            )
+        )), literal_column("'[]'::json"))).join(
+            Skill, Skill.id == EmergencyRequiredSkill.skill_id
+        ).where(EmergencyRequiredSkill.emergency_id == emergency.id).scalar_subquery()
+        
+        status = emergency.status
+        item = func.json_build_object(
+            'id', emergency.id,
+            'authority_id', emergency.authority_id,
+            'title', emergency.title,
+            'description', emergency.description,
+            'latitude', emergency.latitude,
+            'longitude', emergency.longitude,
+            'address', emergency.address,
+            'priority_level', emergency.priority_level,
+            'priority_score', emergency.priority_score,
+            'status', status,
+            'required_volunteers', emergency.required_volunteers,
+            'search_radius_km', emergency.search_radius_km,
+            'escalation_count', emergency.escalation_count,
+            'volunteers_needed', func.greatest(0, emergency.required_volunteers - emergency.accepted_count),
+            'is_open', status == 'open',
+            'is_assigned', status == 'assigned',
+            'is_completed', status == 'completed',
+            'is_expired', emergency.expires_at < utcnow(),
+            'created_at', emergency.created_at,
+            'updated_at', emergency.updated_at,
+            'expires_at', emergency.expires_at,
+            'authority', authority,
+            'required_skills', required_skills
+        )
+        
+        # Cast to text so the driver hands back the JSON unparsed
+        return db.session.execute(select(cast(func.coalesce(
+            func.json_agg(aggregate_order_by(item, emergency.created_at.desc())),
+            literal_column("'[]'::json")
+        ), Text))).scalar()
     
     def to_dict(self, include_authority=False, include_skills=False, include_assignments=False):
         """Convert emergency request to dictionary representation."""
+        status = self.status
         data = {
             'id': self.id,
             'authority_id': self.authority_id,
             'title': self.title,
             'description': self.description,
-            'latitude': float(self.latitude),
-            'longitude': float(self.longitude),
+            'latitude': self.latitude,
+            'longitude': self.longitude,
             'address': self.address,
             'priority_level': self.priority_level,
             'priority_score': self.priority_score,
-            'status': self.status,
+            'status': status,
             'required_volunteers': self.required_volunteers,
             'search_radius_km': self.search_radius_km,
             'escalation_count': self.escalation_count,
             'volunteers_needed': self.volunteers_needed,
-            'is_open': self.is_open,
-            'is_assigned': self.is_assigned,
-            'is_completed': self.is_completed,
+            'is_open': status == 'open',
+            'is_assigned': status == 'assigned',
+            'is_completed': status == 'completed',
             'is_expired': self.is_expired,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
@@ -246,7 +442,7 @@ class EmergencyRequiredSkill(db.Model):
     emergency_id = db.Column(db.Integer, db.ForeignKey('emergency_requests.id'), nullable=False)
     skill_id = db.Column(db.Integer, db.ForeignKey('skills.id'), nullable=False)
     is_mandatory = db.Column(db.Boolean, default=True)
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, default=_utcnow)
     
     # Unique constraint to prevent duplicate emergency-skill combinations
     __table_args__ = (
@@ -0,0 +1,126 @@
+"""
+Portable SQL functions used by model columns and queries.
+
+Each function compiles to the equivalent expression on SQLite, Postgres
+and MySQL, so queries and column defaults behave the same on every
+supported database.
+"""
+
+import math
+from sqlalchemy import DateTime, Integer, and_, insert, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+from app import geohash
+
+
+class minutes_between(FunctionElement):
+    """Whole minutes elapsed between two datetime columns, computed in SQL."""
+    type = Integer()
+    inherit_cache = True
+    name = 'minutes_between'
+
+
+@compiles(minutes_between)
+def _compile_minutes_between(element, compiler, **kw):
+    start, end = [compiler.process(arg, **kw) for arg in element.clauses]
+    return (f"(CAST(strftime('%s', {end}) AS INTEGER) - "
+            f"CAST(strftime('%s', {start}) AS INTEGER)) / 60")
+
+
+@compiles(minutes_between, 'postgresql')
+def _compile_minutes_between_postgresql(element, compiler, **kw):
+    start, end = [compiler.process(arg, **kw) for arg in element.clauses]
+    return f'CAST(TRUNC(EXTRACT(EPOCH FROM ({end} - {start})) / 60) AS INTEGER)'
+
+
+@compiles(minutes_between, 'mysql')
+def _compile_minutes_between_mysql(element, compiler, **kw):
+    start, end = [compiler.process(arg, **kw) for arg in element.clauses]
+    return f'TIMESTAMPDIFF(MINUTE, {start}, {end})'
+
+
+class utcnow(FunctionElement):
+    """Current UTC time as a naive timestamp, evaluated by the database."""
+    type = DateTime()
+    inherit_cache = True
+    name = 'utcnow'
+
+
+@compiles(utcnow)
+def _compile_utcnow(element, compiler, **kw):
+    return "(strftime('%Y-%m-%d %H:%M:%f', 'now'))"
+
+
+@compiles(utcnow, 'postgresql')
+def _compile_utcnow_postgresql(element, compiler, **kw):
+    return "(TIMEZONE('utc', CURRENT_TIMESTAMP))"
+
+
+@compiles(utcnow, 'mysql')
+def _compile_utcnow_mysql(element, compiler, **kw):
+    return '(UTC_TIMESTAMP(6))'
+
+
+def insert_ignore(model, index_elements, dialect):
+    """
+    Build an INSERT for model that silently skips rows conflicting with the
+    unique key on index_elements, instead of raising an IntegrityError.
+    """
+    if dialect == 'postgresql':
+        return postgresql.insert(model).on_conflict_do_nothing(index_elements=index_elements)
+    if dialect == 'sqlite':
+        return sqlite.insert(model).on_conflict_do_nothing(index_elements=index_elements)
+    return insert(model).prefix_with('IGNORE', dialect='mysql')
+
+
+# Mean Earth radius in kilometres, as used by the Haversine distance queries
+EARTH_RADIUS_KM = 6371.0
+
+
+def unit_vector(lat, lon):
+    """Cartesian coordinates of a point on the unit sphere, from degrees."""
+    lat_rad, lon_rad = math.radians(lat), math.radians(lon)
+    return (math.cos(lat_rad) * math.cos(lon_rad),
+            math.cos(lat_rad) * math.sin(lon_rad),
+            math.sin(lat_rad))
+
+
+def within_radius(x_column, y_column, z_column, lat, lon, radius_km):
+    """
+    Filter clause keeping unit-vector columns within radius_km of a point.
+    
+    Points within the radius lie inside the cube of half-side equal to the chord
+    of the search angle, which a composite index on the columns can range-scan;
+    the dot product then makes the exact angular check without any trigonometry.
+    """
+    angle = min(radius_km / EARTH_RADIUS_KM, math.pi)
+    chord = 2 * math.sin(angle / 2)
+    qx, qy, qz = unit_vector(lat, lon)
+    
+    return and_(
+        x_column.between(qx - chord, qx + chord),
+        y_column.between(qy - chord, qy + chord),
+        z_column.between(qz - chord, qz + chord),
+        x_column * qx + y_column * qy + z_column * qz >= math.cos(angle)
+    )
+
+
+def in_geohash_cells(column, cells):
+    """
+    Filter clause keeping geohashes that lie inside any of the given cells.
+    
+    Each cell is a prefix of the geohashes inside it, so every cell becomes
+    one range scan on an index of the column. The range ends at the next
+    cell in base-32 order rather than at a sentinel character, so it holds
+    under any collation that orders digits and lowercase letters as ASCII does.
+    """
+    clauses = []
+    for cell in cells:
+        end = geohash.cell_end(cell)
+        if end is None:
+            clauses.append(column >= cell)
+        else:
+            clauses.append(and_(column >= cell, column < end))
+    return or_(*clauses)
@@ -1,8 +1,22 @@
 from datetime import datetime, timezone
+from flask import g, has_request_context
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy.orm import joinedload
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from werkzeug.security import check_password_hash
 from app import db, login_manager
 
+# User roles, stored as the values of the ``user_roles`` enum column
+ROLE_VOLUNTEER = 'volunteer'
+ROLE_AUTHORITY = 'authority'
+ROLE_ADMIN = 'admin'
+USER_ROLES = (ROLE_VOLUNTEER, ROLE_AUTHORITY, ROLE_ADMIN)
+
+# Argon2id hasher for passwords; hashes record their own parameters, so these
+# can be tuned later and older hashes are upgraded on the next successful login
+_password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=1)
+
 class User(UserMixin, db.Model):
     """Base user model for all user types (volunteer, authority, admin)."""
     
@@ -11,7 +25,7 @@ class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(255), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String(255), nullable=False)
-    role = db.Column(db.Enum('volunteer', 'authority', 'admin', name='user_roles'), 
+    role = db.Column(db.Enum(*USER_ROLES, name='user_roles'), 
                      nullable=False, index=True)
     first_name = db.Column(db.String(100), nullable=False)
     last_name = db.Column(db.String(100), nullable=False)
@@ -25,7 +39,7 @@ class User(UserMixin, db.Model):
                                       cascade='all, delete-orphan')
     created_emergencies = db.relationship('EmergencyRequest', backref='authority', 
                                         cascade='all, delete-orphan')
-    activity_logs = db.relationship('ActivityLog', backref='user', cascade='all, delete-orphan')
+    activity_logs = db.relationship('ActivityLog', backref='user', cascade='all, delete-orphan', lazy='raise')
     verified_skills = db.relationship('VolunteerSkill', foreign_keys='VolunteerSkill.verified_by',
                                     backref='verifier')
     
@@ -34,11 +48,34 @@ class User(UserMixin, db.Model):
         
     def set_password(self, password):
         """Hash and set the user's password."""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = _password_hasher.hash(password)
         
     def check_password(self, password):
-        """Check if the provided password matches the user's password."""
-        return check_password_hash(self.password_hash, password)
+        """
+        Check if the provided password matches the user's password.
+        
+        Hashes from before the switch to Argon2 (Werkzeug pbkdf2/scrypt) or with
+        outdated Argon2 parameters are re-hashed after a successful check; the
+        caller's next commit saves the upgraded hash.
+        """
+        # An empty password can never match, so skip the deliberately slow KDF
+        if not password:
+            return False
+        
+        if not self.password_hash.startswith('$argon2'):
+            if not check_password_hash(self.password_hash, password):
+                return False
+            self.set_password(password)
+            return True
+        
+        try:
+            _password_hasher.verify(self.password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+        
+        if _password_hasher.check_needs_rehash(self.password_hash):
+            self.set_password(password)
+        return True
     
     @property
     def full_name(self):
@@ -47,27 +84,27 @@ class User(UserMixin, db.Model):
     
     def is_volunteer(self):
         """Check if user is a volunteer."""
-        return self.role == 'volunteer'
+        return self.role == ROLE_VOLUNTEER
     
     def is_authority(self):
         """Check if user is an authority."""
-        return self.role == 'authority'
+        return self.role == ROLE_AUTHORITY
     
     def is_admin(self):
         """Check if user is an admin."""
-        return self.role == 'admin'
+        return self.role == ROLE_ADMIN
     
     def can_access_volunteer_features(self):
         """Check if user can access volunteer features."""
-        return self.role == 'volunteer'
+        return self.role == ROLE_VOLUNTEER
     
     def can_access_authority_features(self):
         """Check if user can access authority features."""
-        return self.role == 'authority'
+        return self.role == ROLE_AUTHORITY
     
     def can_access_admin_features(self):
         """Check if user can access admin features."""
-        return self.role == 'admin'
+        return self.role == ROLE_ADMIN
     
     def to_dict(self):
         """Convert user to dictionary representation."""
@@ -89,5 +126,21 @@ class User(UserMixin, db.Model):
 
 @login_manager.user_loader
 def load_user(user_id):
-    """Load user by ID for Flask-Login."""
-    return User.query.get(int(user_id))
\ No newline at end of file
+    """
+    Load user by ID for Flask-Login.
+    
+    The user is kept on flask.g for the rest of the request, and db.session.get
+    answers from the identity map without SQL when the user is already loaded.
+    The volunteer profile is joined in, since most volunteer views start by
+    reading its ID.
+    """
+    user_id = int(user_id)
+    if has_request_context():
+        user = g.get('_user_cache')
+        if user is not None and user.id == user_id:
+            return user
+    
+    user = db.session.get(User, user_id, options=[joinedload(User.volunteer_profile)])
+    if has_request_context():
+        g._user_cache = user
+    return user
\ No newline at end of file
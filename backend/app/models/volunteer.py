@@ -1,5 +1,13 @@
 from datetime import datetime, timezone
-from app import db
+import numpy as np
+import orjson
+from flask import current_app
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import joinedload, selectinload, validates
+from sqlalchemy.orm.base import NO_VALUE
+from sqlalchemy.ext.hybrid import hybrid_property
+from app import db, geohash, json_provider
+from app.models.sql_functions import unit_vector
 
 class VolunteerProfile(db.Model):
     """Volunteer profile with location and availability information."""
@@ -8,8 +16,14 @@ class VolunteerProfile(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    latitude = db.Column(db.Numeric(10, 8))
-    longitude = db.Column(db.Numeric(11, 8))
+    latitude = db.Column(db.Double)
+    longitude = db.Column(db.Double)
+    # Location as a unit vector, kept in step with latitude/longitude for radial search
+    cx = db.Column(db.Double)
+    cy = db.Column(db.Double)
+    cz = db.Column(db.Double)
+    # Geohash of the location, for cell-based prefiltering (see app.geohash)
+    geohash = db.Column(db.String(geohash.STORED_PRECISION), index=True)
     city = db.Column(db.String(100))
     availability_status = db.Column(db.Enum('available', 'busy', 'offline', 
                                           name='availability_statuses'), 
@@ -35,118 +49,202 @@ class VolunteerProfile(db.Model):
     # Indexes for location-based queries
     __table_args__ = (
         db.Index('idx_location', 'latitude', 'longitude'),
+        db.Index('idx_xyz', 'cx', 'cy', 'cz'),
         db.Index('idx_availability', 'availability_status'),
+        # Radius searches for available volunteers: a partial index on Postgres,
+        # a composite one elsewhere
+        db.Index('idx_available_location', 'latitude', 'longitude',
+                 postgresql_where=db.text("availability_status = 'available'")).ddl_if(dialect='postgresql'),
+        db.Index('idx_availability_location', 'availability_status', 'latitude', 'longitude').ddl_if(
+            callable_=lambda ddl, target, bind, dialect, **kw: dialect.name != 'postgresql'),
     )
     
     def __init__(self, **kwargs):
         super(VolunteerProfile, self).__init__(**kwargs)
     
+    @validates('latitude', 'longitude')
+    def validate_coordinate(self, key, value):
+        """Store coordinates as floats, whatever form or JSON type they arrive as."""
+        return None if value in (None, '') else float(value)
+    
+    def update_location_keys(self):
+        """Recompute the unit vector and geohash from the current latitude and longitude."""
+        if self.latitude is None or self.longitude is None:
+            self.cx = self.cy = self.cz = None
+            self.geohash = None
+        else:
+            lat, lon = self.latitude, self.longitude
+            self.cx, self.cy, self.cz = unit_vector(lat, lon)
+            self.geohash = geohash.encode(lat, lon)
+    
     @property
     def is_available(self):
         """Check if volunteer is currently available."""
         return self.availability_status == 'available'
     
+    @property
+    def skills_by_status(self):
+        """Get skills grouped by verification status, built in a single pass."""
+        buckets = {'verified': [], 'pending': [], 'rejected': []}
+        for vs in self.volunteer_skills:
+            bucket = buckets.get(vs.verification_status)
+            if bucket is not None:
+                bucket.append(vs)
+        return buckets
+    
     @property
     def verified_skills(self):
         """Get list of verified skills."""
-        return [vs for vs in self.volunteer_skills if vs.verification_status == 'verified']
+        return self.skills_by_status['verified']
     
     @property
     def pending_skills(self):
         """Get list of skills pending verification."""
-        return [vs for vs in self.volunteer_skills if vs.verification_status == 'pending']
+        return self.skills_by_status['pending']
     
     @property
     def rejected_skills(self):
         """Get list of rejected skills."""
-        return [vs for vs in self.volunteer_skills if vs.verification_status == 'rejected']
+        return self.skills_by_status['rejected']
+    
+    @hybrid_property
+    def verified_skills_count(self):
+        """Number of verified skills; a correlated COUNT subquery in SQL."""
+        return sum(1 for vs in self.volunteer_skills if vs.verification_status == 'verified')
+    
+    @verified_skills_count.expression
+    def verified_skills_count(cls):
+        return select(func.count(VolunteerSkill.id)).where(
+            VolunteerSkill.volunteer_id == cls.id,
+            VolunteerSkill.verification_status == 'verified'
+        ).scalar_subquery()
+    
+    def _parsed_list(self, column):
+        """
+        Parse a JSON list column, reusing the last result while the text is unchanged.
+        
+        The parsed list is memoized on the instance against the column value, so
+        repeated to_dict calls do not parse again and assigning the column (or
+        using the setters) invalidates it.
+        """
+        raw = getattr(self, column)
+        if not raw:
+            return []
+        
+        cache_key = f'_{column}_cache'
+        cached = self.__dict__.get(cache_key)
+        if cached is None or cached[0] is not raw:
+            try:
+                parsed = json_provider.loads(raw)
+            except (orjson.JSONDecodeError, TypeError):
+                parsed = []
+            cached = (raw, parsed)
+            self.__dict__[cache_key] = cached
+        
+        return list(cached[1])
     
     @property
     def interests_list(self):
         """Get interests as a list."""
-        if self.interests:
-            import json
-            try:
-                return json.loads(self.interests)
-            except (json.JSONDecodeError, TypeError):
-                return []
-        return []
+        return self._parsed_list('interests')
     
     @property
     def languages_list(self):
         """Get languages as a list."""
-        if self.languages_spoken:
-            import json
-            try:
-                return json.loads(self.languages_spoken)
-            except (json.JSONDecodeError, TypeError):
-                return []
-        return []
+        return self._parsed_list('languages_spoken')
     
     def set_interests(self, interests_list):
         """Set interests from a list."""
-        import json
-        self.interests = json.dumps(interests_list) if interests_list else None
+        self.interests = json_provider.dumps(interests_list) if interests_list else None
     
     def set_languages(self, languages_list):
         """Set languages from a list."""
-        import json
-        self.languages_spoken = json.dumps(languages_list) if languages_list else None
-    
-    @property
-    def rejected_skills(self):
-        """Get list of rejected skills."""
-        return [vs for vs in self.volunteer_skills if vs.verification_status == 'rejected']
+        self.languages_spoken = json_provider.dumps(languages_list) if languages_list else None
     
     def has_verified_skill(self, skill_id):
         """Check if volunteer has a specific verified skill."""
-        return any(vs.skill_id == skill_id and vs.verification_status == 'verified' 
-                  for vs in self.volunteer_skills)
+        return self.has_any_verified_skills([skill_id])
     
     def has_any_verified_skills(self, skill_ids):
-        """Check if volunteer has any of the specified verified skills."""
-        return any(self.has_verified_skill(skill_id) for skill_id in skill_ids)
+        """
+        Check if volunteer has any of the specified verified skills.
+        
+        Uses the volunteer_skills collection when it is already loaded (or the
+        profile is not yet saved); otherwise runs a single EXISTS query on the
+        idx_volunteer_verified index instead of loading every skill row.
+        """
+        skill_ids = set(skill_ids)
+        if not skill_ids:
+            return False
+        
+        if self.id is None or inspect(self).attrs.volunteer_skills.loaded_value is not NO_VALUE:
+            return any(vs.skill_id in skill_ids and vs.verification_status == 'verified'
+                       for vs in self.volunteer_skills)
+        
+        return db.session.query(
+            select(VolunteerSkill.id).where(
+                VolunteerSkill.volunteer_id == self.id,
+                VolunteerSkill.skill_id.in_(skill_ids),
+                VolunteerSkill.verification_status == 'verified'
+            ).exists()
+        ).scalar()
     
     def get_distance_from(self, latitude, longitude):
         """Calculate distance from given coordinates using Haversine formula."""
         if not self.latitude or not self.longitude:
             return None
-            
-        import math
         
-        # Convert to radians
-        lat1_rad = math.radians(float(self.latitude))
-        lon1_rad = math.radians(float(self.longitude))
-        lat2_rad = math.radians(latitude)
-        lon2_rad = math.radians(longitude)
+        distance = VolunteerProfile.haversine_vec(
+            latitude, longitude, [self.latitude], [self.longitude]
+        )[0]
+        
+        return round(float(distance), 2)
+    
+    @staticmethod
+    def haversine_vec(lat1, lon1, lat2_arr, lon2_arr):
+        """
+        Calculate Haversine distances from one point to many at once.
+        
+        The arithmetic runs over whole NumPy arrays, so scoring a batch of
+        volunteers costs one pass in C rather than one Python call per row.
+        
+        Args:
+            lat1, lon1: Origin coordinates in decimal degrees
+            lat2_arr, lon2_arr: Sequences of target coordinates in decimal degrees
+            
+        Returns:
+            np.ndarray of unrounded distances in kilometers
+        """
+        lat1_rad = np.radians(lat1)
+        lon1_rad = np.radians(lon1)
+        lat2_rad = np.radians(np.asarray(lat2_arr, dtype=float))
+        lon2_rad = np.radians(np.asarray(lon2_arr, dtype=float))
         
         # Haversine formula
         dlat = lat2_rad - lat1_rad
         dlon = lon2_rad - lon1_rad
         
-        a = (math.sin(dlat / 2) ** 2 + 
-             math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2) ** 2)
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+        a = (np.sin(dlat / 2) ** 2 +
+             np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlon / 2) ** 2)
+        c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
         
         # Earth's radius in kilometers
-        R = 6371
-        distance = R * c
-        
-        return round(distance, 2)
+        return 6371 * c
     
     def to_dict(self, include_user=False):
         """Convert volunteer profile to dictionary representation."""
+        skills = self.skills_by_status
         data = {
             'id': self.id,
             'user_id': self.user_id,
-            'latitude': float(self.latitude) if self.latitude else None,
-            'longitude': float(self.longitude) if self.longitude else None,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
             'city': self.city,
             'availability_status': self.availability_status,
             'bio': self.bio,
             'is_available': self.is_available,
-            'verified_skills_count': len(self.verified_skills),
-            'pending_skills_count': len(self.pending_skills),
+            'verified_skills_count': len(skills['verified']),
+            'pending_skills_count': len(skills['pending']),
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -157,7 +255,58 @@ class VolunteerProfile(db.Model):
         return data
     
     def __repr__(self):
-        return f'<VolunteerProfile {self.user.full_name if self.user else self.user_id}>'
+        # Only use the user if already loaded, so logging a profile never runs a query
+        user = inspect(self).attrs.user.loaded_value
+        return f'<VolunteerProfile {user.full_name if user not in (None, NO_VALUE) else self.user_id}>'
+
+@event.listens_for(VolunteerProfile, 'before_insert')
+@event.listens_for(VolunteerProfile, 'before_update')
+def _set_location_keys(mapper, connection, target):
+    """Keep the unit-vector and geohash columns in step with the profile's location."""
+    target.update_location_keys()
+
+# Session info key for volunteer locations awaiting the geo index after commit
+PENDING_GEO_INDEX_KEY = 'pending_geo_index_updates'
+
+def _queue_geo_index_update(target, deleted=False):
+    """Queue a profile's availability and location for the live geo index."""
+    if not current_app.config.get('VOLUNTEER_GEO_INDEX_URL'):
+        return
+    
+    available = (not deleted and target.availability_status == 'available'
+                 and target.latitude is not None and target.longitude is not None)
+    inspect(target).session.info.setdefault(PENDING_GEO_INDEX_KEY, {})[target.id] = (
+        (target.latitude, target.longitude) if available else None
+    )
+
+@event.listens_for(VolunteerProfile, 'after_insert')
+def _index_inserted_volunteer(mapper, connection, target):
+    _queue_geo_index_update(target)
+
+@event.listens_for(VolunteerProfile, 'after_update')
+def _index_updated_volunteer(mapper, connection, target):
+    attrs = inspect(target).attrs
+    if (attrs.availability_status.history.has_changes() or
+            attrs.latitude.history.has_changes() or attrs.longitude.history.has_changes()):
+        _queue_geo_index_update(target)
+
+@event.listens_for(VolunteerProfile, 'after_delete')
+def _unindex_deleted_volunteer(mapper, connection, target):
+    _queue_geo_index_update(target, deleted=True)
+
+@event.listens_for(db.session, 'after_commit')
+def _apply_geo_index_updates(session):
+    pending = session.info.pop(PENDING_GEO_INDEX_KEY, None)
+    if pending:
+        from app.services.geo_index_service import GeoIndexService
+        GeoIndexService.apply(pending)
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _discard_geo_index_updates(session, previous_transaction):
+    session.info.pop(PENDING_GEO_INDEX_KEY, None)
+
+# Cache key for the full skill list used by emergency forms
+ALL_SKILLS_CACHE_KEY = 'skills:all'
 
 class Skill(db.Model):
     """Master table of available skills."""
@@ -224,7 +373,8 @@ class VolunteerSkill(db.Model):
     # Unique constraint to prevent duplicate volunteer-skill combinations
     __table_args__ = (
         db.UniqueConstraint('volunteer_id', 'skill_id', name='unique_volunteer_skill'),
-        db.Index('idx_verification_status', 'verification_status'),
+        db.Index('idx_verification_created', 'verification_status', 'created_at'),
+        db.Index('idx_verification_verified_at', 'verification_status', verified_at.desc()),
         db.Index('idx_volunteer_verified', 'volunteer_id', 'verification_status'),
     )
     
@@ -262,6 +412,27 @@ class VolunteerSkill(db.Model):
         """Check if skill is rejected."""
         return self.verification_status == 'rejected'
     
+    @staticmethod
+    def to_dict_options(include_skill=False, include_volunteer=False):
+        """
+        Get query loader options for everything to_dict reads with the same flags.
+        
+        Apply these to list queries that are serialized with to_dict, so the
+        skill, profile and user come back with each row in the same SELECT and
+        the profiles' skill counts load in one more, instead of a few queries
+        per verification.
+        """
+        options = []
+        if include_skill:
+            options.append(joinedload(VolunteerSkill.skill))
+        if include_volunteer:
+            options.append(joinedload(VolunteerSkill.volunteer_profile).options(
+                joinedload(VolunteerProfile.user),
+                selectinload(VolunteerProfile.volunteer_skills)
+            ))
+        
+        return options
+    
     def to_dict(self, include_skill=False, include_volunteer=False):
         """Convert volunteer skill to dictionary representation."""
         data = {
@@ -5,17 +5,36 @@ This module provides comprehensive admin management including
 skill verification workflow, user management, and system reporting.
 """
 
+import time
 from typing import List, Dict, Optional, Tuple
 from flask import current_app
-from app import db
+from app import db, cache
 from app.models import User, VolunteerProfile, VolunteerSkill, Skill, EmergencyRequest, Assignment, ActivityLog
+from app.models.sql_functions import utcnow
 from app.auth.utils import log_user_activity
-from datetime import datetime, timedelta
-from sqlalchemy import and_, or_, func, desc
+from app.services.task_service import TaskService
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, or_, case, cast, func, desc, select, text
+from sqlalchemy.orm import joinedload
 
 class AdminService:
     """Service class for admin management operations."""
     
+    # How long admin dashboard statistics are shared between page loads
+    DASHBOARD_CACHE_TIMEOUT = 60
+    
+    # How long this process reuses skill verification statistics without asking
+    # the shared cache; other workers may see a decision this much later
+    LOCAL_STATS_TIMEOUT = 5
+    
+    @staticmethod
+    def invalidate_dashboard_cache():
+        """Drop cached admin dashboard statistics after an admin action changes them."""
+        current_app.extensions.pop('local_verification_stats', None)
+        cache.delete_memoized(AdminService.get_admin_dashboard_data)
+        cache.delete_memoized(AdminService._compute_skill_verification_statistics)
+        cache.delete_memoized(AdminService.get_user_management_overview)
+    
     @staticmethod
     def get_pending_skill_verifications(limit=None, skill_category=None):
         """
@@ -28,7 +47,9 @@ class AdminService:
         Returns:
             List of VolunteerSkill objects pending verification
         """
-        query = VolunteerSkill.query.filter_by(verification_status='pending')
+        query = VolunteerSkill.query.options(
+            *VolunteerSkill.to_dict_options(include_skill=True, include_volunteer=True)
+        ).filter_by(verification_status='pending')
         
         if skill_category:
             query = query.join(Skill).filter(Skill.category == skill_category)
@@ -68,16 +89,17 @@ class AdminService:
             db.session.commit()
             
             # Log activity
-            ActivityLog.log_skill_verification_decision(
+            ActivityLog.log_skill_verification(
                 admin_user=admin_user,
                 volunteer_skill=volunteer_skill,
                 decision='approved',
                 notes=notes
             )
             
-            # Send notification to volunteer
-            from app.services.notification_service import NotificationService
-            AdminService._notify_skill_verification_decision(volunteer_skill, 'approved')
+            # Notify the volunteer off the request path
+            TaskService.submit(AdminService.notify_skill_verification_decision, volunteer_skill.id, 'approved')
+            
+            AdminService.invalidate_dashboard_cache()
             
             return volunteer_skill
             
@@ -113,15 +135,17 @@ class AdminService:
             db.session.commit()
             
             # Log activity
-            ActivityLog.log_skill_verification_decision(
+            ActivityLog.log_skill_verification(
                 admin_user=admin_user,
                 volunteer_skill=volunteer_skill,
                 decision='rejected',
                 notes=notes
             )
             
-            # Send notification to volunteer
-            AdminService._notify_skill_verification_decision(volunteer_skill, 'rejected')
+            # Notify the volunteer off the request path
+            TaskService.submit(AdminService.notify_skill_verification_decision, volunteer_skill.id, 'rejected')
+            
+            AdminService.invalidate_dashboard_cache()
             
             return volunteer_skill
             
@@ -134,46 +158,71 @@ class AdminService:
         """
         Get comprehensive skill verification statistics.
         
+        Repeated calls within LOCAL_STATS_TIMEOUT are answered from this
+        process without a round trip to the shared cache.
+        
         Returns:
             Dictionary with verification statistics
         """
-        # Get counts by status
-        status_counts = {}
-        for status in ['pending', 'verified', 'rejected']:
-            count = VolunteerSkill.query.filter_by(verification_status=status).count()
-            status_counts[status] = count
-        
-        # Get counts by skill category
-        category_stats = db.session.query(
+        # (expiry time, statistics) held by this process for the app
+        local = current_app.extensions.get('local_verification_stats')
+        if local is not None and local[0] > time.monotonic():
+            return local[1]
+        
+        stats = AdminService._compute_skill_verification_statistics()
+        current_app.extensions['local_verification_stats'] = (
+            time.monotonic() + AdminService.LOCAL_STATS_TIMEOUT, stats
+        )
+        return stats
+    
+    @staticmethod
+    @cache.memoize(timeout=DASHBOARD_CACHE_TIMEOUT)
+    def _compute_skill_verification_statistics():
+        """Compute skill verification statistics, shared through the cache."""
+        # Get counts and verification rates by skill category in a single grouped
+        # query; the overall status counts are the sums across categories
+        def count_status(status):
+            return func.count(case((VolunteerSkill.verification_status == status, 1)))
+        
+        rows = db.session.query(
             Skill.category,
             func.count(VolunteerSkill.id).label('total'),
-            func.sum(func.case([(VolunteerSkill.verification_status == 'verified', 1)], else_=0)).label('verified'),
-            func.sum(func.case([(VolunteerSkill.verification_status == 'pending', 1)], else_=0)).label('pending'),
-            func.sum(func.case([(VolunteerSkill.verification_status == 'rejected', 1)], else_=0)).label('rejected')
+            count_status('verified').label('verified'),
+            count_status('pending').label('pending'),
+            count_status('rejected').label('rejected'),
+            cast(count_status('verified') * 100.0 / func.nullif(func.count(VolunteerSkill.id), 0), db.Float).label('verification_rate')
         ).join(VolunteerSkill).group_by(Skill.category).all()
         
         category_breakdown = {}
-        for stat in category_stats:
-            category_breakdown[stat.category] = {
-                'total': stat.total,
-                'verified': stat.verified,
-                'pending': stat.pending,
-                'rejected': stat.rejected,
-                'verification_rate': round((stat.verified / stat.total * 100) if stat.total > 0 else 0, 2)
+        status_counts = dict.fromkeys(['pending', 'verified', 'rejected'], 0)
+        
+        for row in rows:
+            category_breakdown[row.category] = {
+                'total': row.total,
+                'verified': row.verified,
+                'pending': row.pending,
+                'rejected': row.rejected,
+                'verification_rate': round(row.verification_rate, 2)
             }
+            for status in status_counts:
+                status_counts[status] += getattr(row, status)
+        
+        total_requests = sum(status_counts.values())
         
         # Get recent verification activity
-        recent_verifications = VolunteerSkill.query.filter(
+        recent_verifications = VolunteerSkill.query.options(
+            *VolunteerSkill.to_dict_options(include_skill=True, include_volunteer=True)
+        ).filter(
             VolunteerSkill.verification_status.in_(['verified', 'rejected'])
         ).order_by(VolunteerSkill.verified_at.desc()).limit(10).all()
         
         return {
-            'total_requests': sum(status_counts.values()),
+            'total_requests': total_requests,
             'status_breakdown': status_counts,
             'category_breakdown': category_breakdown,
             'verification_rate': round(
-                (status_counts['verified'] / sum(status_counts.values()) * 100) 
-                if sum(status_counts.values()) > 0 else 0, 2
+                (status_counts['verified'] / total_requests * 100) 
+                if total_requests > 0 else 0, 2
             ),
             'recent_verifications': [
                 vs.to_dict(include_skill=True, include_volunteer=True) 
@@ -182,6 +231,7 @@ class AdminService:
         }
     
     @staticmethod
+    @cache.memoize(timeout=DASHBOARD_CACHE_TIMEOUT)
     def get_user_management_overview():
         """
         Get user management overview statistics.
@@ -189,24 +239,30 @@ class AdminService:
         Returns:
             Dictionary with user management statistics
         """
-        # Get user counts by role
-        role_counts = {}
-        for role in ['volunteer', 'authority', 'admin']:
-            count = User.query.filter_by(role=role, is_active=True).count()
-            role_counts[role] = count
+        # Active user counts by role and the inactive count, from one grouped query
+        role_counts = dict.fromkeys(['volunteer', 'authority', 'admin'], 0)
+        inactive_users = 0
+        
+        user_rows = db.session.query(
+            User.role, User.is_active, func.count(User.id)
+        ).group_by(User.role, User.is_active).all()
         
-        # Get inactive user count
-        inactive_users = User.query.filter_by(is_active=False).count()
+        for role, is_active, count in user_rows:
+            if not is_active:
+                inactive_users += count
+            elif role in role_counts:
+                role_counts[role] = count
         
         # Get recent user registrations
         recent_users = User.query.order_by(User.created_at.desc()).limit(10).all()
         
         # Get volunteer profile completion statistics
-        total_volunteers = User.query.filter_by(role='volunteer', is_active=True).count()
-        volunteers_with_profiles = VolunteerProfile.query.count()
-        volunteers_with_skills = db.session.query(VolunteerProfile.id).join(
-            VolunteerSkill
-        ).distinct().count()
+        total_volunteers = role_counts['volunteer']
+        # EXISTS probes unique_volunteer_skill per profile instead of de-duplicating the join
+        volunteers_with_profiles, volunteers_with_skills = db.session.query(
+            func.count(VolunteerProfile.id),
+            func.count(VolunteerProfile.id).filter(VolunteerProfile.volunteer_skills.any())
+        ).one()
         
         return {
             'total_users': sum(role_counts.values()),
@@ -253,37 +309,45 @@ class AdminService:
             if not user.is_active:
                 raise ValueError("User is already blocked")
             
-            # Block the user
+            # Block the user (updated_at is stamped by the column's onupdate)
             user.is_active = False
-            user.updated_at = datetime.now(timezone.utc)
             
-            # Cancel any active assignments if user is a volunteer
+            # Cancel any active assignments if user is a volunteer, with one UPDATE per table
             if user.role == 'volunteer' and user.volunteer_profile:
                 active_assignments = Assignment.query.filter_by(
                     volunteer_id=user.volunteer_profile.id,
                     status='accepted'
-                ).all()
+                )
                 
-                for assignment in active_assignments:
-                    assignment.cancel("User account blocked by admin")
+                # Reopen emergencies that were assigned through these assignments
+                # (as Assignment.cancel does), before the assignments change status
+                EmergencyRequest.query.filter(
+                    EmergencyRequest.id.in_(active_assignments.with_entities(Assignment.emergency_id)),
+                    EmergencyRequest.status == 'assigned'
+                ).update({'status': 'open'})
+                
+                active_assignments.update({
+                    'status': 'cancelled',
+                    'notes': 'User account blocked by admin'
+                })
+                Assignment.queue_statistics_invalidation(db.session, user.volunteer_profile.id)
                 
                 # Set volunteer as offline
                 user.volunteer_profile.availability_status = 'offline'
             
             # Cancel any open emergencies if user is an authority
             if user.role == 'authority':
-                open_emergencies = EmergencyRequest.query.filter_by(
+                EmergencyRequest.query.filter_by(
                     authority_id=user.id,
                     status='open'
-                ).all()
-                
-                for emergency in open_emergencies:
-                    emergency.status = 'cancelled'
-                    emergency.updated_at = datetime.now(timezone.utc)
-            
-            db.session.commit()
-            
-            # Log activity
+                ).update({
+                    'status': 'cancelled',
+                    'updated_at': utcnow()
+                })
+            
+            # Log activity before committing, so the entry is only kept if the block
+            # commits. It is inserted in the same transaction unless background audit
+            # log writes are in use (see ActivityLog.uses_background_writes).
             log_user_activity(
                 action='user_blocked',
                 entity_type='user',
@@ -291,6 +355,10 @@ class AdminService:
                 details={'reason': reason, 'blocked_by': admin_user.id}
             )
             
+            db.session.commit()
+            
+            AdminService.invalidate_dashboard_cache()
+            
             return user
             
         except Exception as e:
@@ -319,9 +387,8 @@ class AdminService:
             if user.is_active:
                 raise ValueError("User is not blocked")
             
-            # Unblock the user
+            # Unblock the user (updated_at is stamped by the column's onupdate)
             user.is_active = True
-            user.updated_at = datetime.now(timezone.utc)
             
             db.session.commit()
             
@@ -333,6 +400,8 @@ class AdminService:
                 details={'reason': reason, 'unblocked_by': admin_user.id}
             )
             
+            AdminService.invalidate_dashboard_cache()
+            
             return user
             
         except Exception as e:
@@ -352,48 +421,47 @@ class AdminService:
         """
         start_date = datetime.now(timezone.utc) - timedelta(days=date_range_days)
         
+        emergency_rows, assignment_rows = AdminService._report_counts(start_date)
+        
+        # Emergency counts by status and priority
+        by_status = dict.fromkeys(['open', 'assigned', 'completed', 'cancelled'], 0)
+        by_priority = dict.fromkeys(['low', 'medium', 'high', 'critical'], 0)
+        total = 0
+        escalations = 0
+        
+        for status, priority, count, escalated in emergency_rows:
+            total += count
+            escalations += escalated
+            if status in by_status:
+                by_status[status] += count
+            if priority in by_priority:
+                by_priority[priority] += count
+        
         # Emergency statistics
         emergency_stats = {
-            'total': EmergencyRequest.query.filter(
-                EmergencyRequest.created_at >= start_date
-            ).count(),
-            'by_status': {},
-            'by_priority': {},
+            'total': total,
+            'by_status': by_status,
+            'by_priority': by_priority,
             'average_response_time': 0,
             'completion_rate': 0
         }
         
-        # Get emergency counts by status and priority
-        for status in ['open', 'assigned', 'completed', 'cancelled']:
-            count = EmergencyRequest.query.filter(
-                EmergencyRequest.created_at >= start_date,
-                EmergencyRequest.status == status
-            ).count()
-            emergency_stats['by_status'][status] = count
-        
-        for priority in ['low', 'medium', 'high', 'critical']:
-            count = EmergencyRequest.query.filter(
-                EmergencyRequest.created_at >= start_date,
-                EmergencyRequest.priority_level == priority
-            ).count()
-            emergency_stats['by_priority'][priority] = count
-        
         # Assignment statistics
-        assignments_in_period = Assignment.query.join(EmergencyRequest).filter(
-            EmergencyRequest.created_at >= start_date
-        ).all()
-        
         assignment_stats = {
-            'total': len(assignments_in_period),
-            'by_status': {},
+            'total': sum(count for _, count, _, _ in assignment_rows),
+            'by_status': dict.fromkeys(['requested', 'accepted', 'declined', 'completed', 'cancelled'], 0),
             'acceptance_rate': 0,
             'completion_rate': 0,
             'average_response_time': 0
         }
         
-        for status in ['requested', 'accepted', 'declined', 'completed', 'cancelled']:
-            count = len([a for a in assignments_in_period if a.status == status])
-            assignment_stats['by_status'][status] = count
+        response_time_total = 0
+        response_time_count = 0
+        for status, count, status_response_time_total, status_response_time_count in assignment_rows:
+            if status in assignment_stats['by_status']:
+                assignment_stats['by_status'][status] = count
+            response_time_total += status_response_time_total or 0
+            response_time_count += status_response_time_count
         
         # Calculate rates
         total_responses = assignment_stats['by_status']['accepted'] + assignment_stats['by_status']['declined']
@@ -408,9 +476,8 @@ class AdminService:
             )
         
         # Calculate average response time
-        response_times = [a.response_time_minutes for a in assignments_in_period if a.response_time_minutes]
-        if response_times:
-            assignment_stats['average_response_time'] = round(sum(response_times) / len(response_times), 2)
+        if response_time_count:
+            assignment_stats['average_response_time'] = round(response_time_total / response_time_count, 2)
         
         # User activity statistics
         user_stats = {
@@ -426,10 +493,7 @@ class AdminService:
             'total_activity_logs': ActivityLog.query.filter(
                 ActivityLog.created_at >= start_date
             ).count(),
-            'emergency_escalations': EmergencyRequest.query.filter(
-                EmergencyRequest.created_at >= start_date,
-                EmergencyRequest.escalation_count > 0
-            ).count()
+            'emergency_escalations': escalations
         }
         
         return {
@@ -445,6 +509,86 @@ class AdminService:
             'generated_at': datetime.now(timezone.utc).isoformat()
         }
     
+    @staticmethod
+    def _report_counts(start_date):
+        """
+        Get grouped emergency and assignment counts for emergencies created since start_date.
+        
+        Reads the pre-aggregated daily materialized views when they exist (see
+        scripts/create_report_views.sql), counting whole days from start_date's
+        day; otherwise aggregates the tables directly.
+        
+        Returns:
+            Tuple of (status, priority_level, count, escalated) rows and
+            (status, count, response_time_total, response_time_count) rows
+        """
+        if AdminService._report_views_available():
+            # Stored timestamps are naive UTC
+            params = {'start_date': start_date.replace(tzinfo=None)}
+            emergency_rows = db.session.execute(text(
+                "SELECT status, priority_level, CAST(SUM(emergencies) AS bigint), CAST(SUM(escalated) AS bigint) "
+                "FROM mv_admin_daily_emergency_stats "
+                "WHERE day >= date_trunc('day', CAST(:start_date AS timestamp)) "
+                "GROUP BY status, priority_level"
+            ), params).all()
+            assignment_rows = db.session.execute(text(
+                "SELECT status, CAST(SUM(assignments) AS bigint), CAST(SUM(response_time_total) AS bigint), "
+                "CAST(SUM(response_time_count) AS bigint) "
+                "FROM mv_admin_daily_assignment_stats "
+                "WHERE day >= date_trunc('day', CAST(:start_date AS timestamp)) "
+                "GROUP BY status"
+            ), params).all()
+            return emergency_rows, assignment_rows
+        
+        emergency_rows = db.session.query(
+            EmergencyRequest.status,
+            EmergencyRequest.priority_level,
+            func.count(EmergencyRequest.id),
+            func.count(case((EmergencyRequest.escalation_count > 0, 1)))
+        ).filter(
+            EmergencyRequest.created_at >= start_date
+        ).group_by(EmergencyRequest.status, EmergencyRequest.priority_level).all()
+        
+        # Response time totals only include positive response times
+        response_time = case((Assignment.response_time_minutes > 0, Assignment.response_time_minutes))
+        assignment_rows = db.session.query(
+            Assignment.status,
+            func.count(Assignment.id),
+            func.sum(response_time),
+            func.count(response_time)
+        ).join(EmergencyRequest).filter(
+            EmergencyRequest.created_at >= start_date
+        ).group_by(Assignment.status).all()
+        
+        return emergency_rows, assignment_rows
+    
+    @staticmethod
+    def _report_views_available():
+        """Check whether the report materialized views exist (Postgres only)."""
+        if db.session.get_bind().dialect.name != 'postgresql':
+            return False
+        
+        return db.session.execute(text(
+            "SELECT to_regclass('mv_admin_daily_emergency_stats') IS NOT NULL "
+            "AND to_regclass('mv_admin_daily_assignment_stats') IS NOT NULL"
+        )).scalar()
+    
+    @staticmethod
+    def refresh_report_views():
+        """
+        Refresh the report materialized views without blocking readers.
+        
+        Returns:
+            True if the views were refreshed, False if they do not exist
+        """
+        if not AdminService._report_views_available():
+            return False
+        
+        db.session.execute(text('REFRESH MATERIALIZED VIEW CONCURRENTLY mv_admin_daily_emergency_stats'))
+        db.session.execute(text('REFRESH MATERIALIZED VIEW CONCURRENTLY mv_admin_daily_assignment_stats'))
+        db.session.commit()
+        return True
+    
     @staticmethod
     def get_user_details(user_id):
         """
@@ -456,7 +600,11 @@ class AdminService:
         Returns:
             Dictionary with comprehensive user information
         """
-        user = db.session.get(User, user_id)
+        # Load the profile and its skills with the user; the lists below are
+        # fetched newest first with their own limited queries
+        user = db.session.get(User, user_id, options=[
+            joinedload(User.volunteer_profile).selectinload(VolunteerProfile.volunteer_skills).joinedload(VolunteerSkill.skill)
+        ])
         if not user:
             return None
         
@@ -469,17 +617,29 @@ class AdminService:
                 vs.to_dict(include_skill=True) 
                 for vs in user.volunteer_profile.volunteer_skills
             ]
-            user_data['assignments'] = [
-                a.to_dict(include_emergency=True) 
-                for a in user.volunteer_profile.assignments[:10]  # Last 10 assignments
-            ]
+            assignments = Assignment.query.options(
+                *Assignment.to_dict_options(include_emergency=True)
+            ).filter_by(volunteer_id=user.volunteer_profile.id).order_by(
+                Assignment.assigned_at.desc()
+            ).limit(10).all()  # Last 10 assignments
+            user_data['assignments'] = [a.to_dict(include_emergency=True) for a in assignments]
         
         elif user.role == 'authority':
-            user_data['emergencies'] = [
-                e.to_dict() for e in user.created_emergencies[:10]  # Last 10 emergencies
-            ]
+            emergencies = EmergencyRequest.query.options(
+                *EmergencyRequest.to_dict_options()
+            ).filter_by(authority_id=user.id).order_by(
+                EmergencyRequest.created_at.desc()
+            ).limit(10).all()  # Last 10 emergencies
+            user_data['emergencies'] = [e.to_dict() for e in emergencies]
+        
+        # Add activity history, selecting only the columns shown
+        recent_activity = db.session.query(
+            ActivityLog.action, ActivityLog.entity_type, ActivityLog.entity_id,
+            ActivityLog.created_at, ActivityLog.details
+        ).filter(ActivityLog.user_id == user.id).order_by(
+            ActivityLog.created_at.desc()
+        ).limit(20)  # Last 20 activities
         
-        # Add activity history
         user_data['recent_activity'] = [
             {
                 'action': log.action,
@@ -488,21 +648,28 @@ class AdminService:
                 'created_at': log.created_at.isoformat() if log.created_at else None,
                 'details': log.details
             }
-            for log in user.activity_logs[:20]  # Last 20 activities
+            for log in recent_activity
         ]
         
         return user_data
     
     @staticmethod
-    def _notify_skill_verification_decision(volunteer_skill, decision):
+    def notify_skill_verification_decision(volunteer_skill_id, decision):
         """
-        Send notification to volunteer about skill verification decision.
+        Background task: notify a volunteer about a skill verification decision.
         
         Args:
-            volunteer_skill: The VolunteerSkill object
+            volunteer_skill_id: ID of the VolunteerSkill
             decision: 'approved' or 'rejected'
         """
         try:
+            volunteer_skill = db.session.get(VolunteerSkill, volunteer_skill_id, options=[
+                joinedload(VolunteerSkill.volunteer_profile),
+                joinedload(VolunteerSkill.skill)
+            ])
+            if not volunteer_skill:
+                return
+            
             volunteer = volunteer_skill.volunteer_profile
             skill = volunteer_skill.skill
             
@@ -534,6 +701,7 @@ class AdminService:
             print(f"Error sending skill verification notification: {str(e)}")
     
     @staticmethod
+    @cache.memoize(timeout=DASHBOARD_CACHE_TIMEOUT)
     def get_admin_dashboard_data():
         """
         Get comprehensive data for admin dashboard.
@@ -541,47 +709,67 @@ class AdminService:
         Returns:
             Dictionary with admin dashboard data
         """
-        # Get pending items that need attention
-        pending_verifications = AdminService.get_pending_skill_verifications(limit=10)
+        # The sections below are independent, so they are fetched side by side,
+        # each with its own session, and returned as plain data
+        def pending_verifications():
+            # Get pending items that need attention
+            return [
+                vs.to_dict(include_skill=True, include_volunteer=True)
+                for vs in AdminService.get_pending_skill_verifications(limit=10)
+            ]
         
-        # Get recent system activity
-        recent_activity = ActivityLog.query.order_by(
-            ActivityLog.created_at.desc()
-        ).limit(20).all()
+        def recent_activity():
+            # Get recent system activity as plain mappings, with user names built
+            # by the same query, so no ORM instances are created for the rows
+            rows = db.session.execute(
+                select(
+                    ActivityLog.id, ActivityLog.user_id,
+                    case(
+                        (ActivityLog.user_id.is_(None), 'System'),
+                        else_=User.first_name + ' ' + User.last_name
+                    ).label('user_name'),
+                    ActivityLog.action, ActivityLog.entity_type, ActivityLog.entity_id,
+                    ActivityLog.created_at, ActivityLog.details
+                ).outerjoin(User, ActivityLog.user_id == User.id).order_by(
+                    ActivityLog.created_at.desc()
+                ).limit(20)
+            ).mappings().all()
+            
+            return [
+                {
+                    **log,
+                    'created_at': log['created_at'].isoformat() if log['created_at'] else None
+                }
+                for log in rows
+            ]
+        
+        def system_counts():
+            # Get system overview counts in a single round trip
+            return db.session.query(
+                select(func.count(User.id)).where(User.is_active == True).scalar_subquery().label('total_users'),
+                select(func.count(EmergencyRequest.id)).scalar_subquery().label('total_emergencies'),
+                select(func.count(Assignment.id)).where(Assignment.status == 'accepted').scalar_subquery().label('active_assignments')
+            ).one()._asdict()
+        
+        pending, activity, counts, user_overview, verification_stats = TaskService.gather(
+            pending_verifications,
+            recent_activity,
+            system_counts,
+            AdminService.get_user_management_overview,
+            AdminService.get_skill_verification_statistics
+        )
         
-        # Get system overview statistics
         system_stats = {
-            'total_users': User.query.filter_by(is_active=True).count(),
-            'total_emergencies': EmergencyRequest.query.count(),
-            'pending_verifications': len(pending_verifications),
-            'active_assignments': Assignment.query.filter_by(status='accepted').count()
+            'total_users': counts['total_users'],
+            'total_emergencies': counts['total_emergencies'],
+            'pending_verifications': len(pending),
+            'active_assignments': counts['active_assignments']
         }
         
-        # Get user management overview
-        user_overview = AdminService.get_user_management_overview()
-        
-        # Get skill verification statistics
-        verification_stats = AdminService.get_skill_verification_statistics()
-        
         return {
             'system_overview': system_stats,
             'user_management': user_overview,
             'skill_verification': verification_stats,
-            'pending_verifications': [
-                vs.to_dict(include_skill=True, include_volunteer=True) 
-                for vs in pending_verifications
-            ],
-            'recent_activity': [
-                {
-                    'id': log.id,
-                    'user_id': log.user_id,
-                    'user_name': log.user.full_name if log.user else 'System',
-                    'action': log.action,
-                    'entity_type': log.entity_type,
-                    'entity_id': log.entity_id,
-                    'created_at': log.created_at.isoformat() if log.created_at else None,
-                    'details': log.details
-                }
-                for log in recent_activity
-            ]
-        }
\ No newline at end of file
+            'pending_verifications': pending,
+            'recent_activity': activity
+        }
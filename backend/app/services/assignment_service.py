@@ -7,15 +7,33 @@ volunteer request acceptance/decline, state tracking, and notification handling.
 
 from typing import List, Dict, Optional
 from flask import current_app
-from app import db
+from app import db, cache
 from app.models import Assignment, EmergencyRequest, VolunteerProfile, ActivityLog
 from app.auth.utils import log_user_activity
-from datetime import datetime, timedelta
-from sqlalchemy import and_, or_
+from app.services.task_service import TaskService
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, or_, case, func, select
+from sqlalchemy.orm import joinedload
 
 class AssignmentService:
     """Service class for assignment management."""
     
+    # How long polled assignment statistics are shared between requests
+    OVERVIEW_CACHE_TIMEOUT = 30
+    VOLUNTEER_STATS_CACHE_TIMEOUT = 60
+    
+    @staticmethod
+    def invalidate_statistics_cache(volunteer_ids):
+        """
+        Drop cached statistics affected by changes to assignments.
+        
+        Called after every commit that writes assignments (see
+        Assignment.queue_statistics_invalidation), with the volunteers involved.
+        """
+        cache.delete_memoized(AssignmentService.get_system_assignment_overview)
+        for volunteer_id in volunteer_ids:
+            cache.delete_memoized(AssignmentService._volunteer_statistics, volunteer_id)
+    
     @staticmethod
     def accept_assignment(assignment_id, volunteer_user, notes=None):
         """
@@ -30,10 +48,15 @@ class AssignmentService:
             Updated Assignment object
         """
         try:
-            # Get assignment and verify it belongs to the volunteer
-            assignment = Assignment.query.filter_by(
+            profile = volunteer_user.volunteer_profile
+            
+            # Get assignment and verify it belongs to the volunteer, with the
+            # emergency that accepting updates
+            assignment = Assignment.query.options(
+                joinedload(Assignment.emergency_request)
+            ).filter_by(
                 id=assignment_id,
-                volunteer_id=volunteer_user.volunteer_profile.id
+                volunteer_id=profile.id
             ).first()
             
             if not assignment:
@@ -43,14 +66,14 @@ class AssignmentService:
                 raise ValueError("Can only accept requested assignments")
             
             # Check if volunteer is still available
-            if not volunteer_user.volunteer_profile.is_available:
+            if not profile.is_available:
                 raise ValueError("Volunteer is not currently available")
             
             # Accept the assignment
             assignment.accept(notes)
             
             # Update volunteer availability to busy
-            volunteer_user.volunteer_profile.availability_status = 'busy'
+            profile.availability_status = 'busy'
             
             db.session.commit()
             
@@ -60,9 +83,9 @@ class AssignmentService:
                 assignment=assignment
             )
             
-            # Send notification to authority
+            # Notify the authority off the request path
             from app.services.notification_service import NotificationService
-            NotificationService.notify_assignment_response(assignment, 'accepted')
+            TaskService.submit(NotificationService.notify_assignment_events, [(assignment.id, 'accepted')])
             
             return assignment
             
@@ -107,9 +130,9 @@ class AssignmentService:
                 assignment=assignment
             )
             
-            # Send notification to authority
+            # Notify the authority off the request path
             from app.services.notification_service import NotificationService
-            NotificationService.notify_assignment_response(assignment, 'declined')
+            TaskService.submit(NotificationService.notify_assignment_events, [(assignment.id, 'declined')])
             
             # Try to find replacement volunteers for the emergency
             AssignmentService._find_replacement_volunteers(assignment.emergency_request)
@@ -134,10 +157,15 @@ class AssignmentService:
             Updated Assignment object
         """
         try:
-            # Get assignment and verify it belongs to the volunteer
-            assignment = Assignment.query.filter_by(
+            profile = volunteer_user.volunteer_profile
+            
+            # Get assignment and verify it belongs to the volunteer, with the
+            # emergency that completing may update
+            assignment = Assignment.query.options(
+                joinedload(Assignment.emergency_request)
+            ).filter_by(
                 id=assignment_id,
-                volunteer_id=volunteer_user.volunteer_profile.id
+                volunteer_id=profile.id
             ).first()
             
             if not assignment:
@@ -150,7 +178,7 @@ class AssignmentService:
             assignment.complete(notes)
             
             # Update volunteer availability back to available
-            volunteer_user.volunteer_profile.availability_status = 'available'
+            profile.availability_status = 'available'
             
             db.session.commit()
             
@@ -160,9 +188,9 @@ class AssignmentService:
                 assignment=assignment
             )
             
-            # Send notification to authority
+            # Notify the authority off the request path
             from app.services.notification_service import NotificationService
-            NotificationService.notify_assignment_completion(assignment)
+            TaskService.submit(NotificationService.notify_assignment_events, [(assignment.id, 'completed')])
             
             return assignment
             
@@ -184,7 +212,10 @@ class AssignmentService:
             Updated Assignment object
         """
         try:
-            assignment = db.session.get(Assignment, assignment_id)
+            # The emergency is needed for the authority check and for reopening it
+            assignment = db.session.get(Assignment, assignment_id, options=[
+                joinedload(Assignment.emergency_request)
+            ])
             
             if not assignment:
                 raise ValueError("Assignment not found")
@@ -223,7 +254,7 @@ class AssignmentService:
             )
             
             # Try to find replacement volunteers if this was an accepted assignment
-            if assignment.status == 'accepted':
+            if was_accepted:
                 AssignmentService._find_replacement_volunteers(assignment.emergency_request)
             
             return assignment
@@ -232,6 +263,81 @@ class AssignmentService:
             db.session.rollback()
             raise e
     
+    @staticmethod
+    def cancel_assignments(assignment_ids, user, notes=None):
+        """
+        Cancel several assignments at once, with the same rules as cancel_assignment.
+        
+        The assignments are loaded with one query and cancelled, logged and
+        committed in a single transaction; if any of them cannot be cancelled,
+        none are.
+        
+        Args:
+            assignment_ids: IDs of the assignments to cancel
+            user: The user cancelling the assignments
+            notes: Optional cancellation notes
+            
+        Returns:
+            List of updated Assignment objects
+        """
+        try:
+            assignment_ids = set(assignment_ids)
+            assignments = Assignment.query.options(
+                joinedload(Assignment.emergency_request)
+            ).filter(Assignment.id.in_(assignment_ids)).all()
+            
+            if len(assignments) != len(assignment_ids):
+                raise ValueError("Assignment not found")
+            
+            volunteer_id = user.volunteer_profile.id if user.role == 'volunteer' else None
+            
+            # Check permissions and states before changing anything
+            for assignment in assignments:
+                if user.role == 'volunteer':
+                    can_cancel = assignment.volunteer_id == volunteer_id
+                elif user.role == 'authority':
+                    can_cancel = assignment.emergency_request.authority_id == user.id
+                else:
+                    can_cancel = user.role == 'admin'
+                
+                if not can_cancel:
+                    raise ValueError(f"Access denied: cannot cancel assignment {assignment.id}")
+                
+                if assignment.status in ['completed', 'cancelled']:
+                    raise ValueError(f"Cannot cancel completed or already cancelled assignment {assignment.id}")
+            
+            # Emergencies that lost an accepted volunteer need replacements
+            reopened_emergencies = {}
+            
+            for assignment in assignments:
+                if assignment.status == 'accepted':
+                    reopened_emergencies[assignment.emergency_id] = assignment.emergency_request
+                
+                assignment.cancel(notes)
+                
+                # Logged before the commit, so the entries are only kept if the cancellations
+                # commit (written in the same transaction unless background audit log
+                # writes hand them to the background writer after the commit)
+                ActivityLog.log_assignment_cancellation(
+                    user=user,
+                    assignment=assignment
+                )
+            
+            # If the volunteer was busy with one of these assignments, make them available again
+            if reopened_emergencies and user.role == 'volunteer':
+                user.volunteer_profile.availability_status = 'available'
+            
+            db.session.commit()
+            
+            for emergency in reopened_emergencies.values():
+                AssignmentService._find_replacement_volunteers(emergency)
+            
+            return assignments
+            
+        except Exception as e:
+            db.session.rollback()
+            raise e
+    
     @staticmethod
     def get_volunteer_assignments(volunteer_user, status_filter=None, limit=None):
         """
@@ -245,7 +351,9 @@ class AssignmentService:
         Returns:
             List of Assignment objects
         """
-        query = Assignment.query.filter_by(volunteer_id=volunteer_user.volunteer_profile.id)
+        query = Assignment.query.options(
+            *Assignment.to_dict_options(include_emergency=True)
+        ).filter_by(volunteer_id=volunteer_user.volunteer_profile.id)
         
         if status_filter:
             query = query.filter_by(status=status_filter)
@@ -268,7 +376,9 @@ class AssignmentService:
         Returns:
             List of pending Assignment objects
         """
-        return Assignment.query.filter_by(
+        return Assignment.query.options(
+            *Assignment.to_dict_options(include_emergency=True)
+        ).filter_by(
             volunteer_id=volunteer_user.volunteer_profile.id,
             status='requested'
         ).order_by(Assignment.assigned_at.desc()).all()
@@ -284,7 +394,9 @@ class AssignmentService:
         Returns:
             List of active Assignment objects
         """
-        return Assignment.query.filter_by(
+        return Assignment.query.options(
+            *Assignment.to_dict_options(include_emergency=True)
+        ).filter_by(
             volunteer_id=volunteer_user.volunteer_profile.id,
             status='accepted'
         ).order_by(Assignment.assigned_at.desc()).all()
@@ -301,7 +413,9 @@ class AssignmentService:
         Returns:
             List of Assignment objects
         """
-        return Assignment.query.filter_by(
+        return Assignment.query.options(
+            *Assignment.to_dict_options(include_emergency=True)
+        ).filter_by(
             volunteer_id=volunteer_user.volunteer_profile.id
         ).order_by(Assignment.assigned_at.desc()).limit(limit).all()
     
@@ -317,7 +431,9 @@ class AssignmentService:
         Returns:
             List of Assignment objects
         """
-        query = Assignment.query.filter_by(emergency_id=emergency_id)
+        query = Assignment.query.options(
+            joinedload(Assignment.volunteer_profile).joinedload(VolunteerProfile.user)
+        ).filter_by(emergency_id=emergency_id)
         
         # If authority user provided, verify they own the emergency
         if authority_user:
@@ -331,6 +447,51 @@ class AssignmentService:
         
         return query.order_by(Assignment.assigned_at.desc()).all()
     
+    @staticmethod
+    def get_authority_assignment_counts(authority_user):
+        """
+        Get assignment counts by status across an authority's emergencies in one query.
+        
+        Args:
+            authority_user: The authority user
+            
+        Returns:
+            Dictionary mapping each assignment status to its count
+        """
+        status_counts = dict.fromkeys(['requested', 'accepted', 'declined', 'completed', 'cancelled'], 0)
+        
+        rows = db.session.execute(
+            select(Assignment.status, func.count(Assignment.id))
+            .join(EmergencyRequest, Assignment.emergency_id == EmergencyRequest.id)
+            .where(EmergencyRequest.authority_id == authority_user.id)
+            .group_by(Assignment.status)
+        ).all()
+        
+        status_counts.update(rows)
+        return status_counts
+    
+    @staticmethod
+    def get_emergency_assignment_counts(emergency_id):
+        """
+        Get assignment counts by status for a single emergency in one query.
+        
+        Args:
+            emergency_id: ID of the emergency
+            
+        Returns:
+            Dictionary mapping each assignment status to its count
+        """
+        status_counts = dict.fromkeys(['requested', 'accepted', 'declined', 'completed', 'cancelled'], 0)
+        
+        rows = db.session.execute(
+            select(Assignment.status, func.count(Assignment.id))
+            .where(Assignment.emergency_id == emergency_id)
+            .group_by(Assignment.status)
+        ).all()
+        
+        status_counts.update(rows)
+        return status_counts
+    
     @staticmethod
     def get_assignment_statistics(assignment_id):
         """
@@ -342,7 +503,10 @@ class AssignmentService:
         Returns:
             Dictionary with assignment statistics
         """
-        assignment = db.session.get(Assignment, assignment_id)
+        assignment = db.session.get(
+            Assignment, assignment_id,
+            options=Assignment.to_dict_options(include_emergency=True, include_volunteer=True)
+        )
         if not assignment:
             return None
         
@@ -370,23 +534,55 @@ class AssignmentService:
         Returns:
             Dictionary with volunteer assignment statistics
         """
-        assignments = Assignment.query.filter_by(
-            volunteer_id=volunteer_user.volunteer_profile.id
-        ).all()
-        
-        # Calculate statistics
-        total_assignments = len(assignments)
-        status_counts = {}
-        for status in ['requested', 'accepted', 'declined', 'completed', 'cancelled']:
-            status_counts[status] = len([a for a in assignments if a.status == status])
+        profile = volunteer_user.volunteer_profile
         
-        # Response time statistics
-        response_times = [a.response_time_minutes for a in assignments if a.response_time_minutes]
-        avg_response_time = sum(response_times) / len(response_times) if response_times else None
+        return {
+            'volunteer': profile.to_dict(include_user=True),
+            **AssignmentService._volunteer_statistics(profile.id)
+        }
+    
+    @staticmethod
+    @cache.memoize(timeout=VOLUNTEER_STATS_CACHE_TIMEOUT)
+    def _volunteer_statistics(volunteer_id):
+        """Compute the assignment counts, metrics and recent assignments of a volunteer profile."""
+        # Counts and timing totals by status in one grouped query; timing
+        # averages only include positive times
+        response_time = case((Assignment.response_time_minutes > 0, Assignment.response_time_minutes))
+        completion_time = case((Assignment.completion_time_minutes > 0, Assignment.completion_time_minutes))
+        rows = db.session.query(
+            Assignment.status,
+            func.count(Assignment.id),
+            func.sum(response_time),
+            func.count(response_time),
+            func.sum(completion_time),
+            func.count(completion_time)
+        ).filter(
+            Assignment.volunteer_id == volunteer_id
+        ).group_by(Assignment.status).all()
         
-        # Completion time statistics
-        completion_times = [a.completion_time_minutes for a in assignments if a.completion_time_minutes]
-        avg_completion_time = sum(completion_times) / len(completion_times) if completion_times else None
+        # Calculate statistics
+        status_counts = dict.fromkeys(['requested', 'accepted', 'declined', 'completed', 'cancelled'], 0)
+        total_assignments = 0
+        response_time_total = response_time_count = 0
+        completion_time_total = completion_time_count = 0
+        
+        for status, count, status_response_total, status_response_count, status_completion_total, status_completion_count in rows:
+            total_assignments += count
+            if status in status_counts:
+                status_counts[status] = count
+            response_time_total += status_response_total or 0
+            response_time_count += status_response_count
+            completion_time_total += status_completion_total or 0
+            completion_time_count += status_completion_count
+        
+        avg_response_time = response_time_total / response_time_count if response_time_count else None
+        avg_completion_time = completion_time_total / completion_time_count if completion_time_count else None
+        
+        recent_assignments = Assignment.query.options(
+            *Assignment.to_dict_options(include_emergency=True)
+        ).filter_by(
+            volunteer_id=volunteer_id
+        ).order_by(Assignment.assigned_at.desc()).limit(10).all()
         
         # Calculate acceptance rate
         total_responses = status_counts['accepted'] + status_counts['declined']
@@ -396,7 +592,6 @@ class AssignmentService:
         completion_rate = (status_counts['completed'] / status_counts['accepted'] * 100) if status_counts['accepted'] > 0 else 0
         
         return {
-            'volunteer': volunteer_user.volunteer_profile.to_dict(include_user=True),
             'assignment_counts': {
                 'total': total_assignments,
                 **status_counts
@@ -407,7 +602,7 @@ class AssignmentService:
                 'average_response_time_minutes': round(avg_response_time, 2) if avg_response_time else None,
                 'average_completion_time_minutes': round(avg_completion_time, 2) if avg_completion_time else None
             },
-            'recent_assignments': [a.to_dict(include_emergency=True) for a in assignments[:10]]
+            'recent_assignments': [a.to_dict(include_emergency=True) for a in recent_assignments]
         }
     
     @staticmethod
@@ -490,7 +685,9 @@ class AssignmentService:
             now = datetime.now(timezone.utc)
             
             # Find overdue requested assignments (no response)
-            overdue_requests = Assignment.query.filter(
+            overdue_requests = Assignment.query.options(
+                *Assignment.to_dict_options(include_emergency=True, include_volunteer=True)
+            ).filter(
                 and_(
                     Assignment.status == 'requested',
                     Assignment.assigned_at < now - timedelta(minutes=response_timeout_minutes)
@@ -498,7 +695,9 @@ class AssignmentService:
             ).all()
             
             # Find overdue accepted assignments (not completed)
-            overdue_completions = Assignment.query.filter(
+            overdue_completions = Assignment.query.options(
+                *Assignment.to_dict_options(include_emergency=True, include_volunteer=True)
+            ).filter(
                 and_(
                     Assignment.status == 'accepted',
                     Assignment.responded_at < now - timedelta(hours=completion_timeout_hours)
@@ -521,6 +720,7 @@ class AssignmentService:
             }
     
     @staticmethod
+    @cache.memoize(timeout=OVERVIEW_CACHE_TIMEOUT)
     def get_system_assignment_overview():
         """
         Get system-wide assignment overview statistics.
@@ -528,19 +728,41 @@ class AssignmentService:
         Returns:
             Dictionary with system assignment statistics
         """
-        # Get counts by status
-        status_counts = {}
-        for status in ['requested', 'accepted', 'declined', 'completed', 'cancelled']:
-            count = Assignment.query.filter_by(status=status).count()
-            status_counts[status] = count
+        # Get counts by status in one grouped query
+        status_counts = dict.fromkeys(['requested', 'accepted', 'declined', 'completed', 'cancelled'], 0)
+        status_rows = db.session.query(
+            Assignment.status, func.count(Assignment.id)
+        ).group_by(Assignment.status).all()
+        
+        for status, count in status_rows:
+            if status in status_counts:
+                status_counts[status] = count
         
         # Get recent assignments
-        recent_assignments = Assignment.query.order_by(
+        recent_assignments = Assignment.query.options(
+            *Assignment.to_dict_options(include_emergency=True, include_volunteer=True)
+        ).order_by(
             Assignment.assigned_at.desc()
         ).limit(10).all()
         
-        # Get overdue information
-        overdue_info = AssignmentService.check_overdue_assignments()
+        # Count overdue assignments with the same rules as check_overdue_assignments,
+        # without loading and serializing them
+        response_timeout_minutes = current_app.config.get('ASSIGNMENT_RESPONSE_TIMEOUT_MINUTES', 60)
+        completion_timeout_hours = current_app.config.get('ASSIGNMENT_COMPLETION_TIMEOUT_HOURS', 24)
+        now = datetime.now(timezone.utc)
+        
+        overdue_count = db.session.query(func.count(Assignment.id)).filter(
+            or_(
+                and_(
+                    Assignment.status == 'requested',
+                    Assignment.assigned_at < now - timedelta(minutes=response_timeout_minutes)
+                ),
+                and_(
+                    Assignment.status == 'accepted',
+                    Assignment.responded_at < now - timedelta(hours=completion_timeout_hours)
+                )
+            )
+        ).scalar()
         
         # Calculate performance metrics
         total_responses = status_counts['accepted'] + status_counts['declined']
@@ -555,6 +777,6 @@ class AssignmentService:
                 'acceptance_rate': round(acceptance_rate, 2),
                 'completion_rate': round(completion_rate, 2)
             },
-            'overdue_assignments': overdue_info['total_overdue'],
+            'overdue_assignments': overdue_count,
             'recent_assignments': [a.to_dict(include_emergency=True, include_volunteer=True) for a in recent_assignments]
         }
\ No newline at end of file
@@ -0,0 +1,256 @@
+"""
+Audit log service for the Emergency Response Platform.
+
+This module writes activity log entries from a background thread. Committed
+entries are appended to an in-process queue and inserted in batches, so
+requests never wait on audit log I/O. On SQLite, which allows only one
+writer at a time, entries are written in the committing transaction instead.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import text
+from app import db
+from app.models import ActivityLog
+
+# Guards creating an app's queue and flusher thread
+_queue_lock = threading.Lock()
+
+class AuditLogService:
+    """Service class for batching activity log writes."""
+    
+    # Key of an app's entry queue in app.extensions
+    EXTENSION_KEY = 'audit_log_queue'
+    
+    # Largest number of entries written in a single insert
+    BATCH_SIZE = 1000
+    
+    # How long the flusher keeps collecting entries once one arrives
+    FLUSH_INTERVAL_SECONDS = 0.2
+    
+    # Attempts at writing a whole batch, and the delay before each retry
+    WRITE_ATTEMPTS = 3
+    RETRY_DELAY_SECONDS = 0.5
+    
+    @staticmethod
+    def enqueue(rows):
+        """
+        Queue activity log entries for the current app's background flusher.
+        
+        Args:
+            rows: List of activity log column dictionaries
+        """
+        audit_queue = AuditLogService._get_queue(current_app._get_current_object())
+        for row in rows:
+            audit_queue.put(row)
+    
+    @staticmethod
+    def queue_depth():
+        """Get the number of activity log entries waiting to be written."""
+        audit_queue = current_app.extensions.get(AuditLogService.EXTENSION_KEY)
+        return audit_queue.qsize() if audit_queue else 0
+    
+    @staticmethod
+    def drain(app):
+        """
+        Write every queued entry from the calling thread.
+        
+        Args:
+            app: The Flask application whose queued entries are written
+        """
+        audit_queue = app.extensions.get(AuditLogService.EXTENSION_KEY)
+        if audit_queue is None:
+            return
+        
+        while True:
+            batch = AuditLogService._take_batch(audit_queue, block=False)
+            if not batch:
+                return
+            AuditLogService._write(app, batch)
+    
+    @staticmethod
+    def _get_queue(app):
+        """
+        Get an app's entry queue, starting its flusher thread on first use.
+        
+        Each app has its own queue and flusher, kept in app.extensions, so
+        entries are always written to the database of the app that logged them.
+        """
+        audit_queue = app.extensions.get(AuditLogService.EXTENSION_KEY)
+        if audit_queue is not None:
+            return audit_queue
+        
+        with _queue_lock:
+            audit_queue = app.extensions.get(AuditLogService.EXTENSION_KEY)
+            if audit_queue is None:
+                audit_queue = queue.SimpleQueue()
+                threading.Thread(
+                    target=AuditLogService._flush_loop,
+                    args=(app, audit_queue),
+                    name='audit-log-flusher',
+                    daemon=True
+                ).start()
+                atexit.register(AuditLogService.drain, app)
+                app.extensions[AuditLogService.EXTENSION_KEY] = audit_queue
+        
+        return audit_queue
+    
+    @staticmethod
+    def _flush_loop(app, audit_queue):
+        """Write an app's queued entries in batches for the life of the process."""
+        while True:
+            AuditLogService._write(app, AuditLogService._take_batch(audit_queue, block=True))
+    
+    @staticmethod
+    def _take_batch(audit_queue, block):
+        """
+        Collect up to BATCH_SIZE queued entries.
+        
+        When blocking, waits for a first entry and then keeps collecting for
+        FLUSH_INTERVAL_SECONDS so bursts are written together.
+        """
+        batch = []
+        try:
+            batch.append(audit_queue.get(block=block))
+        except queue.Empty:
+            return batch
+        
+        deadline = time.monotonic() + AuditLogService.FLUSH_INTERVAL_SECONDS
+        while len(batch) < AuditLogService.BATCH_SIZE:
+            try:
+                if block:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    batch.append(audit_queue.get(timeout=remaining))
+                else:
+                    batch.append(audit_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        return batch
+    
+    @staticmethod
+    def _write(app, batch):
+        """
+        Insert a batch of entries in its own short transaction.
+        
+        A failed batch is retried WRITE_ATTEMPTS times. If it still fails, the
+        entries are written one at a time, so only entries that cannot be
+        written at all are dropped.
+        """
+        if not batch:
+            return
+        
+        with app.app_context():
+            for attempt in range(1, AuditLogService.WRITE_ATTEMPTS + 1):
+                try:
+                    AuditLogService._insert(batch)
+                    return
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Error writing {len(batch)} activity logs (attempt {attempt}): {str(e)}")
+                    if attempt < AuditLogService.WRITE_ATTEMPTS:
+                        time.sleep(AuditLogService.RETRY_DELAY_SECONDS * attempt)
+            
+            dropped = 0
+            for row in batch:
+                try:
+                    AuditLogService._insert([row])
+                except Exception:
+                    db.session.rollback()
+                    dropped += 1
+            
+            if dropped:
+                print(f"Error writing activity logs: dropped {dropped} of {len(batch)} entries")
+    
+    @staticmethod
+    def _insert(rows):
+        """Insert entries and commit, relaxing durability where configured."""
+        ActivityLog.relax_commit_durability(db.session)
+        ActivityLog.insert_rows(db.session, rows)
+        db.session.commit()
+    
+    @staticmethod
+    def create_partitions(months_ahead=3):
+        """
+        Create monthly activity_logs partitions from the current month onward.
+        
+        Only applies to Postgres databases migrated with
+        scripts/partition_activity_logs.sql; otherwise nothing is done.
+        
+        Args:
+            months_ahead: Number of months after the current one to prepare
+            
+        Returns:
+            List of partition names that now exist for those months
+        """
+        if not AuditLogService._is_partitioned():
+            return []
+        
+        month_start = datetime.now(timezone.utc).date().replace(day=1)
+        names = []
+        for _ in range(months_ahead + 1):
+            next_month = AuditLogService._next_month(month_start)
+            name = f'activity_logs_{month_start:%Y_%m}'
+            db.session.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF activity_logs "
+                f"FOR VALUES FROM ('{month_start.isoformat()}') TO ('{next_month.isoformat()}')"
+            ))
+            names.append(name)
+            month_start = next_month
+        
+        db.session.commit()
+        return names
+    
+    @staticmethod
+    def drop_partitions_before(cutoff):
+        """
+        Drop monthly activity_logs partitions that end on or before a date.
+        
+        Args:
+            cutoff: Date before which activity logs are no longer kept
+            
+        Returns:
+            List of dropped partition names
+        """
+        if not AuditLogService._is_partitioned():
+            return []
+        
+        partitions = db.session.execute(text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'activity_logs'::regclass"
+        )).scalars().all()
+        
+        dropped = []
+        for name in sorted(partitions):
+            try:
+                month_start = datetime.strptime(name, 'activity_logs_%Y_%m').date()
+            except ValueError:
+                continue  # Not a monthly partition (e.g. activity_logs_history)
+            
+            if AuditLogService._next_month(month_start) <= cutoff:
+                db.session.execute(text(f'DROP TABLE {name}'))
+                dropped.append(name)
+        
+        db.session.commit()
+        return dropped
+    
+    @staticmethod
+    def _is_partitioned():
+        """Check whether activity_logs is a partitioned Postgres table."""
+        if db.session.get_bind().dialect.name != 'postgresql':
+            return False
+        
+        return db.session.execute(text(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('activity_logs')"
+        )).first() is not None
+    
+    @staticmethod
+    def _next_month(month_start):
+        """Get the first day of the month after the given month."""
+        return (month_start + timedelta(days=32)).replace(day=1)
@@ -5,19 +5,43 @@ This module provides comprehensive emergency request management including
 creation, status tracking, escalation, and volunteer assignment coordination.
 """
 
+from collections import Counter
 from typing import List, Dict, Optional, Tuple
 from flask import current_app
-from app import db
+from app import db, cache
 from app.models import EmergencyRequest, EmergencyRequiredSkill, Assignment, Skill, ActivityLog
 from app.services.location_service import LocationService
 from app.services.matching_service import MatchingService
+from app.services.task_service import TaskService
 from app.auth.utils import log_user_activity
-from datetime import datetime, timedelta
-from sqlalchemy import and_, or_
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, or_, func, select
+from sqlalchemy.orm import selectinload
 
 class EmergencyService:
     """Service class for emergency request management."""
     
+    # How long polled status payloads are shared between requests
+    STATUS_CACHE_TIMEOUT = 5
+    
+    @staticmethod
+    def status_cache_key(authority_id, emergency_id):
+        """Cache key for the polled status payload of one emergency."""
+        return f'authority:{authority_id}:emergency:{emergency_id}:status'
+    
+    @staticmethod
+    def dashboard_stats_cache_key(authority_id):
+        """Cache key for the polled dashboard statistics of an authority."""
+        return f'authority:{authority_id}:dashboard_stats'
+    
+    @staticmethod
+    def invalidate_status_cache(emergency):
+        """Drop cached polling payloads affected by a change to an emergency."""
+        cache.delete_many(
+            EmergencyService.status_cache_key(emergency.authority_id, emergency.id),
+            EmergencyService.dashboard_stats_cache_key(emergency.authority_id)
+        )
+    
     @staticmethod
     def create_emergency_request(authority_user, emergency_data, required_skill_ids=None):
         """
@@ -78,8 +102,8 @@ class EmergencyService:
                 emergency=emergency
             )
             
-            # Automatically start volunteer matching
-            EmergencyService.initiate_volunteer_matching(emergency)
+            # Automatically start volunteer matching off the request path
+            TaskService.submit(EmergencyService.match_volunteers_for_emergency, emergency.id)
             
             return emergency
             
@@ -135,6 +159,7 @@ class EmergencyService:
             
             emergency.updated_at = datetime.now(timezone.utc)
             db.session.commit()
+            EmergencyService.invalidate_status_cache(emergency)
             
             # Log activity
             log_user_activity(
@@ -175,6 +200,55 @@ class EmergencyService:
         
         return query.all()
     
+    @staticmethod
+    def get_emergency_status_counts(authority_user):
+        """
+        Get emergency counts by status for an authority user in one query.
+        
+        Args:
+            authority_user: The authority user
+            
+        Returns:
+            Dictionary mapping each emergency status to its count
+        """
+        status_counts = dict.fromkeys(['open', 'assigned', 'completed', 'cancelled'], 0)
+        
+        rows = db.session.execute(
+            select(EmergencyRequest.status, func.count(EmergencyRequest.id))
+            .where(EmergencyRequest.authority_id == authority_user.id)
+            .group_by(EmergencyRequest.status)
+        ).all()
+        
+        status_counts.update(rows)
+        return status_counts
+    
+    @staticmethod
+    def get_emergency_status_summary(emergency_id, authority_user):
+        """
+        Get the polled status fields of an emergency without loading the ORM object.
+        
+        Args:
+            emergency_id: ID of the emergency
+            authority_user: The authority user owning the emergency
+            
+        Returns:
+            Row with id, status, priority_level, escalation_count,
+            required_volunteers and expires_at, or None
+        """
+        return db.session.execute(
+            select(
+                EmergencyRequest.id,
+                EmergencyRequest.status,
+                EmergencyRequest.priority_level,
+                EmergencyRequest.escalation_count,
+                EmergencyRequest.required_volunteers,
+                EmergencyRequest.expires_at
+            ).where(
+                EmergencyRequest.id == emergency_id,
+                EmergencyRequest.authority_id == authority_user.id
+            )
+        ).first()
+    
     @staticmethod
     def get_emergency_by_id(emergency_id, authority_user=None):
         """
@@ -187,7 +261,10 @@ class EmergencyService:
         Returns:
             EmergencyRequest object or None
         """
-        query = EmergencyRequest.query.filter_by(id=emergency_id)
+        query = EmergencyRequest.query.options(
+            selectinload(EmergencyRequest.required_skills),
+            selectinload(EmergencyRequest.assignments).joinedload(Assignment.volunteer_profile)
+        ).filter_by(id=emergency_id)
         
         if authority_user:
             query = query.filter_by(authority_id=authority_user.id)
@@ -221,6 +298,7 @@ class EmergencyService:
             # Escalate the emergency
             emergency.escalate()
             db.session.commit()
+            EmergencyService.invalidate_status_cache(emergency)
             
             # Log escalation
             ActivityLog.log_emergency_escalation(
@@ -276,6 +354,7 @@ class EmergencyService:
             emergency.updated_at = datetime.now(timezone.utc)
             
             db.session.commit()
+            EmergencyService.invalidate_status_cache(emergency)
             
             # Log activity
             log_user_activity(
@@ -333,6 +412,7 @@ class EmergencyService:
             emergency.updated_at = datetime.now(timezone.utc)
             
             db.session.commit()
+            EmergencyService.invalidate_status_cache(emergency)
             
             # Log activity
             log_user_activity(
@@ -348,6 +428,28 @@ class EmergencyService:
             db.session.rollback()
             raise e
     
+    @staticmethod
+    def match_volunteers_for_emergency(emergency_id):
+        """
+        Background task: match and notify volunteers for an emergency by ID.
+        
+        Args:
+            emergency_id: ID of the emergency
+            
+        Returns:
+            List of created Assignment objects
+        """
+        emergency = db.session.get(EmergencyRequest, emergency_id)
+        if not emergency or emergency.status not in ['open', 'assigned']:
+            return []
+        
+        try:
+            return EmergencyService.initiate_volunteer_matching(emergency)
+        except Exception:
+            # The emergency stays open, so the escalation check retries matching
+            current_app.logger.exception(f"Volunteer matching failed for emergency {emergency_id}")
+            return []
+    
     @staticmethod
     def initiate_volunteer_matching(emergency):
         """
@@ -376,19 +478,10 @@ class EmergencyService:
                 match = volunteer_matches[i]
                 volunteer = match['volunteer']
                 
-                # Check if assignment already exists
-                existing_assignment = Assignment.query.filter_by(
-                    emergency_id=emergency.id,
-                    volunteer_id=volunteer.id
-                ).first()
+                # Skipped if the volunteer is already assigned
+                assignment = Assignment.upsert(emergency.id, volunteer.id)
                 
-                if not existing_assignment:
-                    assignment = Assignment(
-                        emergency_id=emergency.id,
-                        volunteer_id=volunteer.id,
-                        status='requested'
-                    )
-                    db.session.add(assignment)
+                if assignment:
                     assignments.append(assignment)
             
             db.session.commit()
@@ -439,23 +532,12 @@ class EmergencyService:
             if not volunteer.is_available:
                 raise ValueError("Volunteer is not currently available")
             
-            # Check if assignment already exists
-            existing_assignment = Assignment.query.filter_by(
-                emergency_id=emergency.id,
-                volunteer_id=volunteer.id
-            ).first()
+            # Create assignment unless one already exists
+            assignment = Assignment.upsert(emergency.id, volunteer.id)
             
-            if existing_assignment:
+            if not assignment:
                 raise ValueError("Volunteer is already assigned to this emergency")
             
-            # Create assignment
-            assignment = Assignment(
-                emergency_id=emergency.id,
-                volunteer_id=volunteer.id,
-                status='requested'
-            )
-            
-            db.session.add(assignment)
             db.session.commit()
             
             # Log activity
@@ -493,13 +575,12 @@ class EmergencyService:
         # Get assignment statistics
         assignments = Assignment.query.filter_by(emergency_id=emergency.id).all()
         
+        # Count statuses in one pass over the assignments
+        status_counter = Counter(a.status for a in assignments)
         assignment_stats = {
             'total_assignments': len(assignments),
-            'requested': len([a for a in assignments if a.status == 'requested']),
-            'accepted': len([a for a in assignments if a.status == 'accepted']),
-            'declined': len([a for a in assignments if a.status == 'declined']),
-            'completed': len([a for a in assignments if a.status == 'completed']),
-            'cancelled': len([a for a in assignments if a.status == 'cancelled'])
+            **{status: status_counter[status]
+               for status in ['requested', 'accepted', 'declined', 'completed', 'cancelled']}
         }
         
         # Get matching statistics
@@ -535,6 +616,7 @@ class EmergencyService:
         }
     
     @staticmethod
+    @cache.memoize(timeout=30)
     def get_system_emergency_overview():
         """
         Get system-wide emergency overview statistics.
@@ -542,25 +624,32 @@ class EmergencyService:
         Returns:
             Dictionary with system emergency statistics
         """
-        # Get counts by status
-        status_counts = {}
-        for status in ['open', 'assigned', 'completed', 'cancelled']:
-            count = EmergencyRequest.query.filter_by(status=status).count()
-            status_counts[status] = count
-        
-        # Get counts by priority
-        priority_counts = {}
-        for priority in ['low', 'medium', 'high', 'critical']:
-            count = EmergencyRequest.query.filter_by(priority_level=priority).count()
-            priority_counts[priority] = count
+        # Get counts by status and priority in a single round trip
+        status_counts = dict.fromkeys(['open', 'assigned', 'completed', 'cancelled'], 0)
+        priority_counts = dict.fromkeys(['low', 'medium', 'high', 'critical'], 0)
+        
+        rows = db.session.execute(
+            select(EmergencyRequest.status, EmergencyRequest.priority_level, func.count(EmergencyRequest.id))
+            .group_by(EmergencyRequest.status, EmergencyRequest.priority_level)
+        ).all()
+        
+        for status, priority, count in rows:
+            if status in status_counts:
+                status_counts[status] += count
+            if priority in priority_counts:
+                priority_counts[priority] += count
         
         # Get recent activity
-        recent_emergencies = EmergencyRequest.query.order_by(
+        recent_emergencies = EmergencyRequest.query.options(
+            *EmergencyRequest.to_dict_options(include_authority=True)
+        ).order_by(
             EmergencyRequest.created_at.desc()
         ).limit(10).all()
         
         # Get escalated emergencies
-        escalated_emergencies = EmergencyRequest.query.filter(
+        escalated_emergencies = EmergencyRequest.query.options(
+            *EmergencyRequest.to_dict_options(include_authority=True)
+        ).filter(
             EmergencyRequest.escalation_count > 0
         ).order_by(EmergencyRequest.escalation_count.desc()).limit(5).all()
         
@@ -591,6 +680,10 @@ class EmergencyService:
                     EmergencyRequest.expires_at < datetime.now(timezone.utc),
                     EmergencyRequest.escalation_count < 3  # Limit escalations
                 )
+            ).order_by(
+                # Most urgent first, oldest first within a priority
+                EmergencyRequest.priority_score.desc(),
+                EmergencyRequest.created_at
             ).all()
             
             escalated_ids = []
@@ -0,0 +1,167 @@
+"""
+Live volunteer availability index for the Emergency Response Platform.
+
+Available volunteers are mirrored into a Redis geo set, so volunteer searches
+can find everyone inside a radius with a single GEOSEARCH instead of a spatial
+scan of the volunteer_profiles table. The database remains the source of
+truth: the set is rebuilt from it when missing, only committed changes are
+mirrored, and every search result is re-checked against the database.
+"""
+
+from typing import Dict, List, Optional, Tuple
+from flask import current_app
+from app import db, geohash
+from app.models import VolunteerProfile
+
+class GeoIndexService:
+    """Service class for the Redis index of available volunteers."""
+    
+    # Geo set holding the location of every available volunteer profile
+    KEY = 'volunteers:available'
+    
+    # Redis measures distances on a slightly larger sphere than the 6371 km one
+    # used for Haversine distances, so searches are widened by this fraction
+    RADIUS_MARGIN = 0.001
+    
+    # GEOADD only accepts latitudes up to this value
+    MAX_LATITUDE = 85.05112878
+    
+    REBUILD_BATCH_SIZE = 1000
+    
+    @staticmethod
+    def _client():
+        """Get the Redis client for the index, or None when it is not configured."""
+        url = current_app.config.get('VOLUNTEER_GEO_INDEX_URL')
+        if not url:
+            return None
+        
+        state = current_app.extensions.setdefault('geo_index', {})
+        if 'client' not in state:
+            import redis
+            state['client'] = redis.Redis.from_url(url)
+        
+        return state['client']
+    
+    @staticmethod
+    def _ensure_built(client):
+        """Rebuild the set from the database the first time this process uses an empty index."""
+        state = current_app.extensions['geo_index']
+        if not state.get('checked'):
+            if not client.exists(GeoIndexService.KEY):
+                GeoIndexService.rebuild()
+            state['checked'] = True
+    
+    @staticmethod
+    def rebuild() -> Optional[int]:
+        """
+        Replace the set with the currently available volunteers from the database.
+        
+        The new set is built under a temporary key and renamed over the old one,
+        so searches never see a partially built index.
+        
+        Returns:
+            Number of volunteers indexed, or None if the index is not configured
+        """
+        client = GeoIndexService._client()
+        if client is None:
+            return None
+        
+        building_key = f'{GeoIndexService.KEY}:rebuild'
+        client.delete(building_key)
+        
+        rows = db.session.query(
+            VolunteerProfile.id, VolunteerProfile.latitude, VolunteerProfile.longitude
+        ).filter(
+            VolunteerProfile.availability_status == 'available',
+            VolunteerProfile.latitude.between(-GeoIndexService.MAX_LATITUDE, GeoIndexService.MAX_LATITUDE),
+            VolunteerProfile.longitude.isnot(None)
+        ).yield_per(GeoIndexService.REBUILD_BATCH_SIZE)
+        
+        indexed = 0
+        values = []
+        for profile_id, lat, lon in rows:
+            values.extend((lon, lat, profile_id))
+            if len(values) >= 3 * GeoIndexService.REBUILD_BATCH_SIZE:
+                client.geoadd(building_key, values)
+                indexed += len(values) // 3
+                values = []
+        
+        if values:
+            client.geoadd(building_key, values)
+            indexed += len(values) // 3
+        
+        if indexed:
+            client.rename(building_key, GeoIndexService.KEY)
+        else:
+            client.delete(GeoIndexService.KEY)
+        
+        return indexed
+    
+    @staticmethod
+    def apply(changes: Dict[int, Optional[Tuple[float, float]]]):
+        """
+        Mirror committed availability and location changes into the set.
+        
+        Args:
+            changes: Locations keyed by volunteer profile ID, with None for
+                profiles that are no longer available or were deleted
+        """
+        client = GeoIndexService._client()
+        if client is None or not changes:
+            return
+        
+        import redis
+        
+        pipeline = client.pipeline(transaction=False)
+        for profile_id, location in changes.items():
+            if location is None or abs(location[0]) > GeoIndexService.MAX_LATITUDE:
+                pipeline.zrem(GeoIndexService.KEY, profile_id)
+            else:
+                lat, lon = location
+                pipeline.geoadd(GeoIndexService.KEY, (lon, lat, profile_id))
+        
+        try:
+            pipeline.execute()
+        except redis.RedisError as e:
+            print(f"Error updating volunteer geo index: {str(e)}")
+    
+    @staticmethod
+    def search(lat: float, lon: float, radius_km: float) -> Optional[List[int]]:
+        """
+        Find available volunteers within a radius using the index.
+        
+        Results are candidates only: callers still check availability and
+        exact distances against the database.
+        
+        Args:
+            lat, lon: Center point coordinates
+            radius_km: Search radius in kilometers
+        
+        Returns:
+            Volunteer profile IDs, or None when the index is not configured or
+            cannot be reached and the database should be searched instead
+        """
+        client = GeoIndexService._client()
+        if client is None:
+            return None
+        
+        # Volunteers near the poles cannot be indexed, so search those areas in the database
+        if abs(lat) + radius_km / geohash.KM_PER_DEGREE > GeoIndexService.MAX_LATITUDE:
+            return None
+        
+        import redis
+        
+        try:
+            GeoIndexService._ensure_built(client)
+            members = client.geosearch(
+                GeoIndexService.KEY,
+                longitude=lon,
+                latitude=lat,
+                radius=radius_km * (1 + GeoIndexService.RADIUS_MARGIN),
+                unit='km'
+            )
+        except redis.RedisError as e:
+            print(f"Error searching volunteer geo index: {str(e)}")
+            return None
+        
+        return [int(member) for member in members]
@@ -8,10 +8,12 @@ calculations on the Earth's surface.
 
 import math
 from typing import List, Tuple, Optional
-from flask import current_app
+from flask import current_app, g, has_request_context
 from app import db
 from app.models import VolunteerProfile, EmergencyRequest
+from app.services.geo_index_service import GeoIndexService
 from sqlalchemy import and_, func
+from sqlalchemy.orm import joinedload, selectinload
 
 class LocationService:
     """Service class for location-based operations."""
@@ -107,45 +109,71 @@ class LocationService:
         """
         from app.models.volunteer import VolunteerSkill
         
-        # Get bounding box for efficient initial filtering
-        min_lat, max_lat, min_lon, max_lon = LocationService.get_bounding_box(
-            center_lat, center_lon, radius_km
-        )
-        
-        # Build base query
-        query = db.session.query(VolunteerProfile).filter(
-            and_(
+        # Searches are memoized for the current request, so views that run both
+        # matching and matching statistics only hit the database once
+        memo = g.setdefault('volunteers_in_radius', {}) if has_request_context() else {}
+        search_key = (center_lat, center_lon, radius_km, tuple(required_skill_ids or ()))
+        
+        if (search_key, availability_filter) in memo:
+            return list(memo[(search_key, availability_filter)])
+        
+        if availability_filter and (search_key, None) in memo:
+            return [(volunteer, distance) for volunteer, distance in memo[(search_key, None)]
+                    if volunteer.availability_status == availability_filter]
+        
+        # Available volunteers nearby come from the live geo index when configured
+        nearby_ids = None
+        if availability_filter == 'available':
+            nearby_ids = GeoIndexService.search(center_lat, center_lon, radius_km)
+        
+        if nearby_ids is not None:
+            location_filter = VolunteerProfile.id.in_(nearby_ids)
+        else:
+            # Get bounding box for efficient initial filtering
+            min_lat, max_lat, min_lon, max_lon = LocationService.get_bounding_box(
+                center_lat, center_lon, radius_km
+            )
+            location_filter = and_(
                 VolunteerProfile.latitude.isnot(None),
                 VolunteerProfile.longitude.isnot(None),
                 VolunteerProfile.latitude.between(min_lat, max_lat),
                 VolunteerProfile.longitude.between(min_lon, max_lon)
             )
-        )
         
-        # Filter by availability if specified
+        # Build base query, loading users and skills up front for scoring and display
+        query = db.session.query(VolunteerProfile).options(
+            joinedload(VolunteerProfile.user),
+            selectinload(VolunteerProfile.volunteer_skills)
+        ).filter(location_filter)
+        
+        # Filter by availability if specified (also re-checks geo index candidates)
         if availability_filter:
             query = query.filter(VolunteerProfile.availability_status == availability_filter)
         
         # Filter by required skills if specified
         if required_skill_ids:
             # Volunteers must have at least one of the required skills (verified)
-            query = query.join(VolunteerSkill).filter(
-                and_(
+            query = query.filter(
+                db.session.query(VolunteerSkill.id).filter(
+                    VolunteerSkill.volunteer_id == VolunteerProfile.id,
                     VolunteerSkill.skill_id.in_(required_skill_ids),
                     VolunteerSkill.verification_status == 'verified'
-                )
-            ).distinct()
+                ).exists()
+            )
         
         # Get volunteers in bounding box
         volunteers = query.all()
         
-        # Calculate exact distances and filter by radius
+        # Calculate exact distances for the whole batch and filter by radius
+        distances = VolunteerProfile.haversine_vec(
+            center_lat, center_lon,
+            [volunteer.latitude for volunteer in volunteers],
+            [volunteer.longitude for volunteer in volunteers]
+        )
+        
         volunteers_with_distance = []
-        for volunteer in volunteers:
-            distance = LocationService.calculate_distance(
-                center_lat, center_lon,
-                float(volunteer.latitude), float(volunteer.longitude)
-            )
+        for volunteer, distance in zip(volunteers, distances):
+            distance = round(float(distance), 2)
             
             if distance <= radius_km:
                 volunteers_with_distance.append((volunteer, distance))
@@ -153,7 +181,8 @@ class LocationService:
         # Sort by distance
         volunteers_with_distance.sort(key=lambda x: x[1])
         
-        return volunteers_with_distance
+        memo[(search_key, availability_filter)] = volunteers_with_distance
+        return list(volunteers_with_distance)
     
     @staticmethod
     def find_emergencies_near_volunteer(volunteer_profile: VolunteerProfile,
@@ -176,7 +205,7 @@ class LocationService:
         
         # Get bounding box for efficient initial filtering
         min_lat, max_lat, min_lon, max_lon = LocationService.get_bounding_box(
-            float(volunteer_profile.latitude), float(volunteer_profile.longitude), radius_km
+            volunteer_profile.latitude, volunteer_profile.longitude, radius_km
         )
         
         # Find open emergencies in bounding box
@@ -192,18 +221,15 @@ class LocationService:
         emergencies_with_distance = []
         for emergency in emergencies:
             distance = LocationService.calculate_distance(
-                float(volunteer_profile.latitude), float(volunteer_profile.longitude),
-                float(emergency.latitude), float(emergency.longitude)
+                volunteer_profile.latitude, volunteer_profile.longitude,
+                emergency.latitude, emergency.longitude
             )
             
             if distance <= radius_km:
                 emergencies_with_distance.append((emergency, distance))
         
         # Sort by priority (higher priority first) then by distance
-        priority_scores = {'critical': 4, 'high': 3, 'medium': 2, 'low': 1}
-        emergencies_with_distance.sort(
-            key=lambda x: (-priority_scores.get(x[0].priority_level, 0), x[1])
-        )
+        emergencies_with_distance.sort(key=lambda x: (-x[0].priority_score, x[1]))
         
         return emergencies_with_distance
     
@@ -238,8 +264,8 @@ class LocationService:
             return None
         
         return LocationService.calculate_distance(
-            float(profile1.latitude), float(profile1.longitude),
-            float(profile2.latitude), float(profile2.longitude)
+            profile1.latitude, profile1.longitude,
+            profile2.latitude, profile2.longitude
         )
     
     @staticmethod
@@ -259,8 +285,8 @@ class LocationService:
             return None
         
         return LocationService.calculate_distance(
-            float(volunteer_profile.latitude), float(volunteer_profile.longitude),
-            float(emergency.latitude), float(emergency.longitude)
+            volunteer_profile.latitude, volunteer_profile.longitude,
+            emergency.latitude, emergency.longitude
         )
     
     @staticmethod
@@ -307,10 +333,10 @@ class LocationService:
             return 0.0, 0.0, 0.0, 0.0
         
         # Find overall bounding box
-        min_lat = min(float(v.latitude) for v in valid_volunteers)
-        max_lat = max(float(v.latitude) for v in valid_volunteers)
-        min_lon = min(float(v.longitude) for v in valid_volunteers)
-        max_lon = max(float(v.longitude) for v in valid_volunteers)
+        min_lat = min(v.latitude for v in valid_volunteers)
+        max_lat = max(v.latitude for v in valid_volunteers)
+        min_lon = min(v.longitude for v in valid_volunteers)
+        max_lon = max(v.longitude for v in valid_volunteers)
         
         # Expand by service radius
         lat_delta = radius_km / 111.0
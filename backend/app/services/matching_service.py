@@ -5,6 +5,7 @@ This module provides intelligent matching between volunteers and emergency reque
 based on location, skills, availability, and priority levels.
 """
 
+import numpy as np
 from typing import List, Dict, Tuple, Optional
 from flask import current_app
 from app import db
@@ -35,95 +36,90 @@ class MatchingService:
         
         # Find volunteers in radius with required skills
         volunteers_with_distance = LocationService.find_volunteers_in_radius(
-            center_lat=float(emergency.latitude),
-            center_lon=float(emergency.longitude),
+            center_lat=emergency.latitude,
+            center_lon=emergency.longitude,
             radius_km=emergency.search_radius_km,
             required_skill_ids=required_skill_ids if required_skill_ids else None,
             availability_filter='available'
         )
         
-        # Score and rank volunteers
-        volunteer_matches = []
+        # Volunteers who already have assignments for this emergency
+        assigned_volunteer_ids = {
+            volunteer_id for (volunteer_id,) in db.session.query(Assignment.volunteer_id).filter(
+                Assignment.emergency_id == emergency.id
+            )
+        }
+        
+        # Collect candidates, then score and rank the whole batch at once
+        candidates = []
         for volunteer, distance in volunteers_with_distance:
             # Skip volunteers who already have assignments for this emergency
-            existing_assignment = Assignment.query.filter_by(
-                emergency_id=emergency.id,
-                volunteer_id=volunteer.id
-            ).first()
-            
-            if existing_assignment:
+            if volunteer.id in assigned_volunteer_ids:
                 continue
             
-            match_score = MatchingService._calculate_match_score(
-                volunteer, emergency, distance, mandatory_skill_ids, optional_skill_ids
-            )
-            
-            volunteer_matches.append({
+            candidates.append({
                 'volunteer': volunteer,
                 'distance_km': distance,
-                'match_score': match_score,
                 'skill_match': MatchingService._get_skill_match_details(
                     volunteer, mandatory_skill_ids, optional_skill_ids
                 )
             })
         
-        # Sort by match score (highest first)
-        volunteer_matches.sort(key=lambda x: x['match_score'], reverse=True)
+        scores = MatchingService._calculate_match_scores(emergency, candidates)
         
+        # Highest score first; the stable sort keeps distance order between equal scores
+        order = np.argsort(-scores, kind='stable')
         if limit:
-            volunteer_matches = volunteer_matches[:limit]
+            order = order[:limit]
+        
+        volunteer_matches = []
+        for index in order:
+            match = candidates[index]
+            match['match_score'] = float(scores[index])
+            volunteer_matches.append(match)
         
         return volunteer_matches
     
     @staticmethod
-    def _calculate_match_score(volunteer: VolunteerProfile, emergency: EmergencyRequest,
-                             distance: float, mandatory_skill_ids: List[int],
-                             optional_skill_ids: List[int]) -> float:
+    def _calculate_match_scores(emergency: EmergencyRequest, candidates: List[Dict]) -> np.ndarray:
         """
-        Calculate a match score for a volunteer-emergency pair.
+        Calculate match scores for a batch of candidate volunteers.
         
         Score components:
         - Distance (closer is better): 0-40 points
         - Skill match (more skills is better): 0-40 points
         - Priority bonus (critical emergencies get boost): 0-20 points
         
+        Each component is computed over arrays for the whole batch rather than
+        in a Python loop per volunteer.
+        
         Args:
-            volunteer: The volunteer profile
             emergency: The emergency request
-            distance: Distance in kilometers
-            mandatory_skill_ids: List of mandatory skill IDs
-            optional_skill_ids: List of optional skill IDs
+            candidates: Candidate dictionaries with 'distance_km' and 'skill_match'
             
         Returns:
-            Match score (0-100)
+            Array of match scores (0-100), in candidate order
         """
-        score = 0.0
+        distances = np.fromiter((c['distance_km'] for c in candidates), dtype=float, count=len(candidates))
+        scores = np.zeros(len(candidates))
         
         # Distance score (0-40 points, closer is better)
         max_distance = emergency.search_radius_km
         if max_distance > 0:
-            distance_score = max(0, 40 * (1 - distance / max_distance))
-            score += distance_score
+            scores += np.maximum(0, 40 * (1 - distances / max_distance))
         
-        # Skill match score (0-40 points)
-        volunteer_skill_ids = [vs.skill_id for vs in volunteer.verified_skills]
-        
-        # Mandatory skills (must have all for any points)
-        if mandatory_skill_ids:
-            mandatory_matches = sum(1 for skill_id in mandatory_skill_ids 
-                                  if skill_id in volunteer_skill_ids)
-            if mandatory_matches == len(mandatory_skill_ids):
-                score += 25  # Base score for having all mandatory skills
-            else:
-                # Penalty for missing mandatory skills
-                score -= 20
+        # Mandatory skills (must have all for any points, penalty otherwise)
+        skill_matches = [c['skill_match'] for c in candidates]
+        if candidates and skill_matches[0]['mandatory_total']:
+            has_all = np.fromiter((m['has_all_mandatory'] for m in skill_matches), dtype=bool,
+                                  count=len(candidates))
+            scores += np.where(has_all, 25, -20)
         
         # Optional skills (bonus points for each match)
-        if optional_skill_ids:
-            optional_matches = sum(1 for skill_id in optional_skill_ids 
-                                 if skill_id in volunteer_skill_ids)
-            optional_score = min(15, (optional_matches / len(optional_skill_ids)) * 15)
-            score += optional_score
+        if candidates and skill_matches[0]['optional_total']:
+            optional_matches = np.fromiter((m['optional_matches'] for m in skill_matches), dtype=float,
+                                           count=len(candidates))
+            scores += np.minimum(15, (optional_matches / skill_matches[0]['optional_total']) * 15)
         
         # Priority bonus (0-20 points for critical emergencies)
         priority_bonuses = {
@@ -132,10 +128,10 @@ class MatchingService:
             'medium': 5,
             'low': 0
         }
-        score += priority_bonuses.get(emergency.priority_level, 0)
+        scores += priority_bonuses.get(emergency.priority_level, 0)
         
-        # Ensure score is within bounds
-        return max(0, min(100, score))
+        # Ensure scores are within bounds
+        return np.clip(scores, 0, 100)
     
     @staticmethod
     def _get_skill_match_details(volunteer: VolunteerProfile, 
@@ -152,7 +148,7 @@ class MatchingService:
         Returns:
             Dictionary with skill match details
         """
-        volunteer_skill_ids = [vs.skill_id for vs in volunteer.verified_skills]
+        volunteer_skill_ids = {vs.skill_id for vs in volunteer.verified_skills}
         
         mandatory_matches = [skill_id for skill_id in mandatory_skill_ids 
                            if skill_id in volunteer_skill_ids]
@@ -332,15 +328,11 @@ class MatchingService:
         for i, match in enumerate(best_matches[:volunteers_needed]):
             volunteer = match['volunteer']
             
-            # Create assignment
-            assignment = Assignment(
-                emergency_id=emergency.id,
-                volunteer_id=volunteer.id,
-                status='requested'
-            )
+            # Create assignment, skipping volunteers already assigned
+            assignment = Assignment.upsert(emergency.id, volunteer.id)
             
-            db.session.add(assignment)
-            assignments.append(assignment)
+            if assignment:
+                assignments.append(assignment)
         
         return assignments
     
@@ -359,8 +351,8 @@ class MatchingService:
         required_skill_ids = [rs.skill_id for rs in emergency.required_skills]
         
         volunteers_in_radius = LocationService.find_volunteers_in_radius(
-            center_lat=float(emergency.latitude),
-            center_lon=float(emergency.longitude),
+            center_lat=emergency.latitude,
+            center_lon=emergency.longitude,
             radius_km=emergency.search_radius_km,
             required_skill_ids=required_skill_ids if required_skill_ids else None,
             availability_filter=None  # Include all availability statuses
@@ -433,8 +425,8 @@ class MatchingService:
         
         # Check how many volunteers would be available at expanded radius
         expanded_volunteers = LocationService.find_volunteers_in_radius(
-            center_lat=float(emergency.latitude),
-            center_lon=float(emergency.longitude),
+            center_lat=emergency.latitude,
+            center_lon=emergency.longitude,
             radius_km=suggested_radius,
             required_skill_ids=[rs.skill_id for rs in emergency.required_skills],
             availability_filter='available'
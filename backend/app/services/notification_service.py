@@ -8,9 +8,10 @@ assignment updates, and activity history tracking.
 from typing import List, Dict, Optional
 from flask import current_app
 from app import db
-from app.models import User, Assignment, EmergencyRequest, ActivityLog
-from datetime import datetime, timedelta
+from app.models import User, Assignment, EmergencyRequest, ActivityLog, VolunteerProfile, VolunteerSkill
+from datetime import datetime, timedelta, timezone
 from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload, selectinload
 
 class NotificationService:
     """Service class for notification management."""
@@ -46,14 +47,14 @@ class NotificationService:
                     'description': emergency.description,
                     'priority_level': emergency.priority_level,
                     'location': {
-                        'latitude': float(emergency.latitude),
-                        'longitude': float(emergency.longitude),
+                        'latitude': emergency.latitude,
+                        'longitude': emergency.longitude,
                         'address': emergency.address
                     },
                     'required_volunteers': emergency.required_volunteers,
                     'distance_km': volunteer.get_distance_from(
-                        float(emergency.latitude), 
-                        float(emergency.longitude)
+                        emergency.latitude, 
+                        emergency.longitude
                     ) if volunteer.latitude and volunteer.longitude else None
                 }
             }
@@ -140,6 +141,39 @@ class NotificationService:
             print(f"Error sending response notification: {str(e)}")
             return []
     
+    @staticmethod
+    def notify_assignment_events(events):
+        """
+        Background task: send the notifications for a batch of assignment changes.
+        
+        All the assignments, with the emergency, authority, volunteer and skills
+        the notifications read, are loaded together rather than one by one.
+        
+        Args:
+            events: List of (assignment ID, event) pairs, where event is
+                'accepted', 'declined' or 'completed'
+        """
+        assignments = Assignment.query.options(
+            joinedload(Assignment.emergency_request).joinedload(EmergencyRequest.authority),
+            joinedload(Assignment.volunteer_profile).options(
+                joinedload(VolunteerProfile.user),
+                selectinload(VolunteerProfile.volunteer_skills).joinedload(VolunteerSkill.skill)
+            )
+        ).filter(
+            Assignment.id.in_({assignment_id for assignment_id, _ in events})
+        ).all()
+        assignments_by_id = {assignment.id: assignment for assignment in assignments}
+        
+        for assignment_id, event in events:
+            assignment = assignments_by_id.get(assignment_id)
+            if not assignment:
+                continue
+            
+            if event == 'completed':
+                NotificationService.notify_assignment_completion(assignment)
+            else:
+                NotificationService.notify_assignment_response(assignment, event)
+    
     @staticmethod
     def notify_assignment_completion(assignment):
         """
@@ -357,28 +391,33 @@ class NotificationService:
             Dictionary with notification statistics
         """
         try:
-            # Get all notifications for user
-            notifications = ActivityLog.query.filter(
+            # Stream notifications for user in chunks instead of loading them all
+            notifications = db.session.query(
+                ActivityLog.id, ActivityLog.details, ActivityLog.created_at
+            ).filter(
                 and_(
                     ActivityLog.user_id == user.id,
                     ActivityLog.action == 'notification_sent'
                 )
-            ).all()
+            ).execution_options(stream_results=True).yield_per(1000)
             
-            # Count by type
+            # Count by type, keeping the first few as recent notifications
+            total_notifications = 0
             type_counts = {}
+            recent_notifications = []
             for notification in notifications:
+                total_notifications += 1
                 if notification.details and 'type' in notification.details:
                     notification_type = notification.details['type']
                     type_counts[notification_type] = type_counts.get(notification_type, 0) + 1
-            
-            # Get recent notifications
-            recent_notifications = notifications[:10]
+                
+                if len(recent_notifications) < 10:
+                    recent_notifications.append(notification)
             
             return {
-                'total_notifications': len(notifications),
+                'total_notifications': total_notifications,
                 'type_breakdown': type_counts,
-                'unread_count': len(notifications),  # In a real system, track read status
+                'unread_count': total_notifications,  # In a real system, track read status
                 'recent_notifications': [
                     {
                         'id': n.id,
@@ -11,6 +11,7 @@ from app import db
 from app.models import User, VolunteerProfile, EmergencyRequest, Assignment, ActivityLog
 from datetime import datetime, timedelta, timezone
 from sqlalchemy import and_, or_, func
+from app.services.audit_log_service import AuditLogService
 
 class RealtimeService:
     """Service class for real-time updates and polling."""
@@ -200,29 +201,26 @@ class RealtimeService:
             ]
             
             # Get assignment responses for authority's emergencies
-            authority_emergency_ids = [e.id for e in EmergencyRequest.query.filter_by(
-                authority_id=authority_user.id
-            ).all()]
-            
-            if authority_emergency_ids:
-                assignment_responses = Assignment.query.filter(
-                    and_(
-                        Assignment.emergency_id.in_(authority_emergency_ids),
-                        Assignment.responded_at > last_update_time
-                    )
-                ).all()
-                
-                updates['assignment_responses'] = [
-                    {
-                        'id': assignment.id,
-                        'emergency_id': assignment.emergency_id,
-                        'emergency_title': assignment.emergency_request.title,
-                        'volunteer_name': assignment.volunteer_profile.user.full_name,
-                        'status': assignment.status,
-                        'responded_at': assignment.responded_at.isoformat()
-                    }
-                    for assignment in assignment_responses
-                ]
+            assignment_responses = Assignment.query.join(
+                EmergencyRequest, Assignment.emergency_id == EmergencyRequest.id
+            ).filter(
+                and_(
+                    EmergencyRequest.authority_id == authority_user.id,
+                    Assignment.responded_at > last_update_time
+                )
+            ).all()
+            
+            updates['assignment_responses'] = [
+                {
+                    'id': assignment.id,
+                    'emergency_id': assignment.emergency_id,
+                    'emergency_title': assignment.emergency_request.title,
+                    'volunteer_name': assignment.volunteer_profile.user.full_name,
+                    'status': assignment.status,
+                    'responded_at': assignment.responded_at.isoformat()
+                }
+                for assignment in assignment_responses
+            ]
             
             # Get new notifications
             new_notifications = ActivityLog.query.filter(
@@ -560,7 +558,8 @@ class RealtimeService:
                     'notification_compliance_rate': notification_health['compliance_rate'],
                     'stuck_assignments': stuck_assignments,
                     'overdue_emergencies': overdue_emergencies,
-                    'recent_activity_count': recent_activity
+                    'recent_activity_count': recent_activity,
+                    'audit_log_queue_depth': AuditLogService.queue_depth()
                 },
                 'alerts': [
                     'Notification delivery below 90% compliance' if notification_health['compliance_rate'] < 90 else None,
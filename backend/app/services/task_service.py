@@ -0,0 +1,115 @@
+"""
+Background task service for the Emergency Response Platform.
+
+This module runs slow follow-up work, such as volunteer matching and
+notification fan-out, outside the request that triggered it, and runs
+independent queries for a single request side by side.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from app import db
+from app.models import ActivityLog
+
+_executor = None
+_query_executor = None
+
+class TaskService:
+    """Service class for running work in the background."""
+    
+    @staticmethod
+    def _get_executor():
+        """Get the shared worker pool, creating it on first use."""
+        global _executor
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=current_app.config.get('BACKGROUND_TASK_WORKERS', 4),
+                thread_name_prefix='background-task'
+            )
+        return _executor
+    
+    @staticmethod
+    def submit(func, *args, **kwargs):
+        """
+        Run a function in the background inside an application context.
+        
+        The function should take plain values (such as IDs) rather than ORM
+        objects, since it runs with its own database session. When
+        BACKGROUND_TASKS_EAGER is set or the database is SQLite, which would
+        lock out writes from a second thread, the function runs immediately instead.
+        
+        Args:
+            func: The function to run
+            *args, **kwargs: Arguments passed to the function
+        """
+        app = current_app._get_current_object()
+        
+        if app.config.get('BACKGROUND_TASKS_EAGER') or db.engine.dialect.name == 'sqlite':
+            return TaskService._call(func, *args, **kwargs)
+        
+        return TaskService._get_executor().submit(TaskService._run, app, func, *args, **kwargs)
+    
+    @staticmethod
+    def _get_query_executor():
+        """
+        Get the worker pool for parallel queries, creating it on first use.
+        
+        Kept apart from the background task pool so requests never wait
+        behind queued matching or notification work.
+        """
+        global _query_executor
+        if _query_executor is None:
+            _query_executor = ThreadPoolExecutor(
+                max_workers=current_app.config.get('PARALLEL_QUERY_WORKERS', 4),
+                thread_name_prefix='parallel-query'
+            )
+        return _query_executor
+    
+    @staticmethod
+    def gather(*funcs):
+        """
+        Run independent functions concurrently and return their results in order.
+        
+        Each function runs in its own application context, and so with its own
+        database session and pooled connection; it should return plain data
+        rather than ORM objects. Unlike submit, exceptions are raised to the
+        caller. The functions run one after another when BACKGROUND_TASKS_EAGER
+        is set or the database is SQLite, which cannot serve queries in parallel.
+        
+        Args:
+            *funcs: Functions taking no arguments
+            
+        Returns:
+            List of the functions' results
+        """
+        app = current_app._get_current_object()
+        
+        if app.config.get('BACKGROUND_TASKS_EAGER') or db.engine.dialect.name == 'sqlite':
+            return [func() for func in funcs]
+        
+        executor = TaskService._get_query_executor()
+        futures = [executor.submit(TaskService._run_query, app, func) for func in funcs]
+        return [future.result() for future in futures]
+    
+    @staticmethod
+    def _run_query(app, func):
+        """Run a parallel query function inside its own application context."""
+        with app.app_context():
+            return func()
+    
+    @staticmethod
+    def _run(app, func, *args, **kwargs):
+        """Run a task inside its own application context."""
+        with app.app_context():
+            result = TaskService._call(func, *args, **kwargs)
+            ActivityLog.flush_pending()
+            return result
+    
+    @staticmethod
+    def _call(func, *args, **kwargs):
+        """Call a task function, logging any failure."""
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            current_app.logger.exception(f"Error running background task {func.__name__}")
+            return None
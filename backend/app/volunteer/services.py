@@ -3,8 +3,9 @@ Volunteer management services for the Emergency Response Platform.
 """
 
 from flask import current_app
-from app import db
+from app import db, cache
 from app.models import VolunteerProfile, Skill, VolunteerSkill, Assignment, ActivityLog
+from app.models.volunteer import ALL_SKILLS_CACHE_KEY
 from app.auth.utils import log_user_activity
 from sqlalchemy import and_, func
 from datetime import datetime, timezone
@@ -335,8 +336,8 @@ class VolunteerService:
         # If no skills, show all open emergencies within radius
         if not skill_ids:
             try:
-                lat_rad = func.radians(float(profile.latitude))
-                lon_rad = func.radians(float(profile.longitude))
+                lat_rad = func.radians(profile.latitude)
+                lon_rad = func.radians(profile.longitude)
                 
                 # Haversine distance calculation
                 distance = (
@@ -366,8 +367,8 @@ class VolunteerService:
         
         # Find open emergencies within radius that require volunteer's skills
         try:
-            lat_rad = func.radians(float(profile.latitude))
-            lon_rad = func.radians(float(profile.longitude))
+            lat_rad = func.radians(profile.latitude)
+            lon_rad = func.radians(profile.longitude)
             
             # Haversine distance calculation
             distance = (
@@ -431,19 +432,17 @@ class VolunteerService:
         try:
             assignments = Assignment.query.filter_by(volunteer_id=profile.id).all()
             
-            # Safely get skill counts
-            verified_skills = getattr(profile, 'verified_skills', [])
-            pending_skills = getattr(profile, 'pending_skills', [])
-            rejected_skills = getattr(profile, 'rejected_skills', [])
+            # Skill counts, grouped in a single pass
+            skills = profile.skills_by_status
             
             return {
                 'total_assignments': len(assignments),
                 'completed_assignments': len([a for a in assignments if hasattr(a, 'is_completed') and a.is_completed]),
                 'pending_assignments': len([a for a in assignments if hasattr(a, 'is_requested') and a.is_requested]),
                 'active_assignments': len([a for a in assignments if hasattr(a, 'is_accepted') and a.is_accepted]),
-                'verified_skills': len(verified_skills),
-                'pending_skills': len(pending_skills),
-                'rejected_skills': len(rejected_skills)
+                'verified_skills': len(skills['verified']),
+                'pending_skills': len(skills['pending']),
+                'rejected_skills': len(skills['rejected'])
             }
         except Exception as e:
             # Return safe defaults if there's any error
@@ -501,6 +500,9 @@ class SkillService:
             db.session.add(skill)
             db.session.commit()
             
+            # Emergency forms cache the full skill list
+            cache.delete(ALL_SKILLS_CACHE_KEY)
+            
             return skill
             
         except Exception as e:
@@ -11,9 +11,19 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ENGINE_OPTIONS = {
         'pool_pre_ping': True,
-        'pool_recycle': 300,
+        'pool_recycle': 1800,
     }
     
+    # Connection pool sizing for server databases (ignored for SQLite)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    
+    # Cache configuration (Redis when REDIS_URL is set, in-process otherwise)
+    CACHE_REDIS_URL = os.environ.get('REDIS_URL')
+    CACHE_TYPE = os.environ.get('CACHE_TYPE') or \
+        ('RedisCache' if CACHE_REDIS_URL else 'SimpleCache')
+    CACHE_DEFAULT_TIMEOUT = 300
+    
     # Emergency system configuration
     DEFAULT_SEARCH_RADIUS_KM = 10
     MAX_SEARCH_RADIUS_KM = 100
@@ -21,6 +31,26 @@ class Config:
     NOTIFICATION_TIMEOUT_MINUTES = 1
     POLLING_INTERVAL_SECONDS = 30
     
+    # Also prefilter volunteer matching by geohash cells; worthwhile once volunteers
+    # are dense enough that the unit-vector range scan returns too many rows
+    MATCHING_GEOHASH_PREFILTER = os.environ.get('MATCHING_GEOHASH_PREFILTER', 'false').lower() == 'true'
+    
+    # Redis URL for the live index of available volunteer locations; when set,
+    # volunteer searches start from a GEOSEARCH instead of a table scan
+    VOLUNTEER_GEO_INDEX_URL = os.environ.get('VOLUNTEER_GEO_INDEX_URL')
+    
+    # Background task configuration
+    BACKGROUND_TASK_WORKERS = int(os.environ.get('BACKGROUND_TASK_WORKERS', 4))
+    BACKGROUND_TASKS_EAGER = False
+    
+    # Workers for running independent queries of one request side by side
+    PARALLEL_QUERY_WORKERS = int(os.environ.get('PARALLEL_QUERY_WORKERS', 4))
+    
+    # Audit log configuration: write committed activity logs from a background
+    # thread, and commit them without waiting for fsync (Postgres only)
+    AUDIT_LOG_BACKGROUND_WRITES = True
+    AUDIT_LOG_ASYNC_COMMIT = os.environ.get('AUDIT_LOG_ASYNC_COMMIT', 'true').lower() == 'true'
+    
     # File upload configuration
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = 'uploads'
@@ -42,6 +72,9 @@ class TestingConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or \
         'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    CACHE_TYPE = 'NullCache'
+    BACKGROUND_TASKS_EAGER = True
+    AUDIT_LOG_BACKGROUND_WRITES = False
 
 class ProductionConfig(Config):
     """Production configuration."""
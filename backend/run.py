@@ -43,6 +43,82 @@ def reset_db():
         
         click.echo('Database reset successfully!')
 
+@app.cli.command()
+@click.option('--months-ahead', default=3, help='Months after the current one to prepare.')
+@with_appcontext
+def create_log_partitions(months_ahead):
+    """Create upcoming monthly activity log partitions (PostgreSQL only)."""
+    from app.services.audit_log_service import AuditLogService
+    names = AuditLogService.create_partitions(months_ahead)
+    
+    if names:
+        click.echo(f'Activity log partitions ready: {", ".join(names)}')
+    else:
+        click.echo('activity_logs is not partitioned; see scripts/partition_activity_logs.sql.')
+
+@app.cli.command()
+@click.option('--keep-months', default=12, help='Months of activity logs to keep.')
+@with_appcontext
+def prune_activity_logs(keep_months):
+    """Drop activity log partitions older than the retention period (PostgreSQL only)."""
+    from datetime import datetime, timezone
+    from app.services.audit_log_service import AuditLogService
+    
+    today = datetime.now(timezone.utc).date()
+    months = today.year * 12 + today.month - 1 - keep_months
+    cutoff = today.replace(year=months // 12, month=months % 12 + 1, day=1)
+    
+    dropped = AuditLogService.drop_partitions_before(cutoff)
+    click.echo(f'Dropped {len(dropped)} activity log partition(s) ending before {cutoff.isoformat()}.')
+
+@app.cli.command()
+@click.option('--batch-size', default=1000, help='Profiles updated per transaction.')
+@with_appcontext
+def backfill_location_keys(batch_size):
+    """Fill the unit-vector and geohash columns of existing volunteer profiles."""
+    from app.models import VolunteerProfile
+    
+    updated = 0
+    while True:
+        profiles = VolunteerProfile.query.filter(
+            db.or_(VolunteerProfile.cx.is_(None), VolunteerProfile.geohash.is_(None)),
+            VolunteerProfile.latitude.isnot(None),
+            VolunteerProfile.longitude.isnot(None)
+        ).limit(batch_size).all()
+        
+        if not profiles:
+            break
+        
+        for profile in profiles:
+            profile.update_location_keys()
+        db.session.commit()
+        updated += len(profiles)
+    
+    click.echo(f'Updated {updated} volunteer profile(s).')
+
+@app.cli.command()
+@with_appcontext
+def refresh_report_views():
+    """Refresh the admin report materialized views (PostgreSQL only)."""
+    from app.services.admin_service import AdminService
+    
+    if AdminService.refresh_report_views():
+        click.echo('Report views refreshed.')
+    else:
+        click.echo('Report views do not exist; see scripts/create_report_views.sql.')
+
+@app.cli.command()
+@with_appcontext
+def rebuild_geo_index():
+    """Rebuild the Redis index of available volunteers from the database."""
+    from app.services.geo_index_service import GeoIndexService
+    indexed = GeoIndexService.rebuild()
+    
+    if indexed is None:
+        click.echo('VOLUNTEER_GEO_INDEX_URL is not set; the geo index is disabled.')
+    else:
+        click.echo(f'Indexed {indexed} available volunteer(s).')
+
 @app.shell_context_processor
 def make_shell_context():
     """Make database and models available in Flask shell."""
@@ -0,0 +1,23 @@
+-- Emergency Response Platform - Index activity_logs.details (PostgreSQL only)
+-- Adds the JSONB indexes declared on the ActivityLog model to an existing database,
+-- so audit searches on details keys use an index instead of scanning the table.
+--
+-- Searchable keys: any top-level key through containment, e.g.
+--   SELECT * FROM activity_logs WHERE details @> '{"assignment_id": 42}';
+-- and volunteer_id / emergency_id through equality on the extracted text, e.g.
+--   SELECT * FROM activity_logs WHERE details->>'volunteer_id' = '7';
+--
+-- CREATE INDEX CONCURRENTLY cannot run inside a transaction block, so run this
+-- file as-is (psql -f) rather than wrapping it in BEGIN/COMMIT. It can run before
+-- or after partition_activity_logs.sql, which rebuilds the table with these indexes
+-- too. On a partitioned activity_logs table drop CONCURRENTLY; the indexes are then
+-- created on every partition.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_activity_details_gin
+    ON activity_logs USING GIN (details jsonb_path_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_activity_details_volunteer
+    ON activity_logs ((details->>'volunteer_id'));
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_activity_details_emergency
+    ON activity_logs ((details->>'emergency_id'));
@@ -0,0 +1,17 @@
+-- Emergency Response Platform - Indexes for admin verification queues and reports
+-- Adds the indexes declared on the VolunteerSkill and EmergencyRequest models to an
+-- existing database. idx_verification_status is replaced by idx_verification_created,
+-- whose leading column serves the same lookups.
+
+-- PostgreSQL: built without blocking writes. CREATE/DROP INDEX CONCURRENTLY cannot run
+-- inside a transaction block, so run these statements on their own (psql -f).
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_verification_created
+    ON volunteer_skills (verification_status, created_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_verification_verified_at
+    ON volunteer_skills (verification_status, verified_at DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_created_status_priority
+    ON emergency_requests (created_at, status, priority_level);
+DROP INDEX CONCURRENTLY IF EXISTS idx_verification_status;
+
+-- MySQL and SQLite: drop CONCURRENTLY and IF NOT EXISTS; on MySQL the DROP INDEX
+-- statement also needs ON volunteer_skills.
@@ -0,0 +1,36 @@
+-- Emergency Response Platform - Store assignment timings as generated columns
+-- Adds the response_time_minutes, completion_time_minutes and total_time_minutes
+-- columns declared on the Assignment model to an existing database. They are STORED
+-- generated columns computed from the assignment timestamps, so existing rows get
+-- their values when the columns are added and reports can aggregate them in SQL.
+-- Adding a stored generated column rewrites the table; run it in a maintenance window.
+
+-- PostgreSQL (12 or newer)
+BEGIN;
+
+ALTER TABLE assignments
+    DROP COLUMN IF EXISTS response_time_minutes,
+    DROP COLUMN IF EXISTS completion_time_minutes,
+    DROP COLUMN IF EXISTS total_time_minutes;
+
+ALTER TABLE assignments
+    ADD COLUMN response_time_minutes INTEGER GENERATED ALWAYS AS
+        (CAST(TRUNC(EXTRACT(EPOCH FROM (responded_at - assigned_at)) / 60) AS INTEGER)) STORED,
+    ADD COLUMN completion_time_minutes INTEGER GENERATED ALWAYS AS
+        (CAST(TRUNC(EXTRACT(EPOCH FROM (completed_at - responded_at)) / 60) AS INTEGER)) STORED,
+    ADD COLUMN total_time_minutes INTEGER GENERATED ALWAYS AS
+        (CAST(TRUNC(EXTRACT(EPOCH FROM (completed_at - assigned_at)) / 60) AS INTEGER)) STORED;
+
+COMMIT;
+
+-- MySQL (5.7 or newer; drop any plain columns of the same name first)
+-- ALTER TABLE assignments
+--     ADD COLUMN response_time_minutes INTEGER GENERATED ALWAYS AS
+--         (TIMESTAMPDIFF(MINUTE, assigned_at, responded_at)) STORED,
+--     ADD COLUMN completion_time_minutes INTEGER GENERATED ALWAYS AS
+--         (TIMESTAMPDIFF(MINUTE, responded_at, completed_at)) STORED,
+--     ADD COLUMN total_time_minutes INTEGER GENERATED ALWAYS AS
+--         (TIMESTAMPDIFF(MINUTE, assigned_at, completed_at)) STORED;
+
+-- SQLite cannot add STORED generated columns to an existing table; recreate
+-- development databases with flask reset-db.
@@ -0,0 +1,32 @@
+-- Emergency Response Platform - Dispatch ordering by priority_score
+-- Adds the priority_score generated column and the indexes declared on the
+-- EmergencyRequest model to an existing database. priority_score is STORED and
+-- computed from priority_level (low 1 to critical 4), so existing rows get their
+-- score when the column is added and idx_dispatch can serve the urgency ordering.
+-- Adding a stored generated column rewrites the table; run it in a maintenance window.
+
+-- PostgreSQL (12 or newer). CREATE INDEX CONCURRENTLY cannot run inside a
+-- transaction block, so run this file on its own (psql -f).
+ALTER TABLE emergency_requests
+    ADD COLUMN IF NOT EXISTS priority_score INTEGER GENERATED ALWAYS AS
+        (CASE priority_level WHEN 'low' THEN 1 WHEN 'medium' THEN 2
+                             WHEN 'high' THEN 3 WHEN 'critical' THEN 4 ELSE 1 END) STORED;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_dispatch
+    ON emergency_requests (status, priority_score DESC, created_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_status_expires
+    ON emergency_requests (status, expires_at);
+-- Also created by add_admin_query_indexes.sql
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_created_status_priority
+    ON emergency_requests (created_at, status, priority_level);
+
+-- MySQL (5.7 or newer)
+-- ALTER TABLE emergency_requests
+--     ADD COLUMN priority_score INTEGER GENERATED ALWAYS AS
+--         (CASE priority_level WHEN 'low' THEN 1 WHEN 'medium' THEN 2
+--                              WHEN 'high' THEN 3 WHEN 'critical' THEN 4 ELSE 1 END) STORED;
+-- CREATE INDEX idx_dispatch ON emergency_requests (status, priority_score DESC, created_at);
+-- CREATE INDEX idx_status_expires ON emergency_requests (status, expires_at);
+-- CREATE INDEX idx_created_status_priority ON emergency_requests (created_at, status, priority_level);
+
+-- SQLite cannot add STORED generated columns to an existing table; recreate
+-- development databases with flask reset-db.
@@ -0,0 +1,56 @@
+-- Emergency Response Platform - Store User-Agent strings once in user_agents
+-- Moves the activity_logs.user_agent text column of an existing database into the
+-- user_agents table declared on the UserAgent model: every distinct string is
+-- inserted once, keyed by its SHA-1 hex digest (the hash UserAgent.hash_text
+-- computes), and log rows reference it through activity_logs.user_agent_id.
+-- Run the block for your database during a maintenance window, before deploying
+-- code that writes user_agent_id. Run it before partition_activity_logs.sql.
+
+-- PostgreSQL (digest() comes from pgcrypto)
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS pgcrypto;
+
+CREATE TABLE IF NOT EXISTS user_agents (
+    id SERIAL PRIMARY KEY,
+    hash VARCHAR(40) NOT NULL UNIQUE,
+    text TEXT NOT NULL
+);
+
+ALTER TABLE activity_logs
+    ADD COLUMN IF NOT EXISTS user_agent_id INTEGER REFERENCES user_agents(id);
+
+INSERT INTO user_agents (hash, text)
+SELECT encode(digest(user_agent, 'sha1'), 'hex'), user_agent
+FROM (SELECT DISTINCT user_agent FROM activity_logs WHERE user_agent <> '') AS distinct_agents
+ON CONFLICT (hash) DO NOTHING;
+
+UPDATE activity_logs
+SET user_agent_id = user_agents.id
+FROM user_agents
+WHERE user_agents.hash = encode(digest(activity_logs.user_agent, 'sha1'), 'hex')
+  AND activity_logs.user_agent <> '';
+
+ALTER TABLE activity_logs DROP COLUMN user_agent;
+
+COMMIT;
+
+-- MySQL
+-- CREATE TABLE IF NOT EXISTS user_agents (
+--     id INTEGER NOT NULL AUTO_INCREMENT PRIMARY KEY,
+--     hash VARCHAR(40) NOT NULL UNIQUE,
+--     text TEXT NOT NULL
+-- );
+-- ALTER TABLE activity_logs
+--     ADD COLUMN user_agent_id INTEGER,
+--     ADD FOREIGN KEY (user_agent_id) REFERENCES user_agents(id);
+-- INSERT IGNORE INTO user_agents (hash, text)
+-- SELECT SHA1(user_agent), user_agent
+-- FROM (SELECT DISTINCT user_agent FROM activity_logs WHERE user_agent <> '') AS distinct_agents;
+-- UPDATE activity_logs
+-- JOIN user_agents ON user_agents.hash = SHA1(activity_logs.user_agent)
+-- SET activity_logs.user_agent_id = user_agents.id;
+-- ALTER TABLE activity_logs DROP COLUMN user_agent;
+
+-- SQLite has no SHA-1 function; development databases are simplest to recreate
+-- with flask reset-db.
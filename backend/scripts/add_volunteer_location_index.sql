@@ -0,0 +1,13 @@
+-- Emergency Response Platform - Index available volunteers by location
+-- Adds the index declared on the VolunteerProfile model to an existing database,
+-- so radius searches for available volunteers range-scan only available rows.
+
+-- PostgreSQL: partial index, built without blocking writes. CREATE INDEX CONCURRENTLY
+-- cannot run inside a transaction block, so run this statement on its own (psql -f).
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_available_location
+    ON volunteer_profiles (latitude, longitude)
+    WHERE availability_status = 'available';
+
+-- MySQL and SQLite have no partial indexes; use the composite index instead:
+-- CREATE INDEX idx_availability_location
+--     ON volunteer_profiles (availability_status, latitude, longitude);
@@ -0,0 +1,32 @@
+-- Emergency Response Platform - Location keys for volunteer profiles
+-- Adds the cx/cy/cz unit-vector columns, the geohash column and their indexes
+-- declared on the VolunteerProfile model to an existing database. Run it before
+--   flask backfill-location-keys
+-- which fills the new columns from latitude/longitude for existing profiles.
+
+-- PostgreSQL. CREATE INDEX CONCURRENTLY cannot run inside a transaction block,
+-- so run this file on its own (psql -f).
+ALTER TABLE volunteer_profiles
+    ADD COLUMN IF NOT EXISTS cx DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS cy DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS cz DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS geohash VARCHAR(8);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_xyz
+    ON volunteer_profiles (cx, cy, cz);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_volunteer_profiles_geohash
+    ON volunteer_profiles (geohash);
+
+-- MySQL
+-- ALTER TABLE volunteer_profiles
+--     ADD COLUMN cx DOUBLE, ADD COLUMN cy DOUBLE, ADD COLUMN cz DOUBLE,
+--     ADD COLUMN geohash VARCHAR(8);
+-- CREATE INDEX idx_xyz ON volunteer_profiles (cx, cy, cz);
+-- CREATE INDEX ix_volunteer_profiles_geohash ON volunteer_profiles (geohash);
+
+-- SQLite
+-- ALTER TABLE volunteer_profiles ADD COLUMN cx REAL;
+-- ALTER TABLE volunteer_profiles ADD COLUMN cy REAL;
+-- ALTER TABLE volunteer_profiles ADD COLUMN cz REAL;
+-- ALTER TABLE volunteer_profiles ADD COLUMN geohash VARCHAR(8);
+-- CREATE INDEX idx_xyz ON volunteer_profiles (cx, cy, cz);
+-- CREATE INDEX ix_volunteer_profiles_geohash ON volunteer_profiles (geohash);
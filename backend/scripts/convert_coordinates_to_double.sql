@@ -0,0 +1,24 @@
+-- Emergency Response Platform - Store coordinates as double precision floats
+-- Converts latitude/longitude (previously NUMERIC(10,8)/(11,8)) and the unit-vector
+-- columns of existing databases to the DOUBLE types now declared on the models.
+-- Run the block for your database, after add_volunteer_location_keys.sql.
+
+-- PostgreSQL
+ALTER TABLE volunteer_profiles
+    ALTER COLUMN latitude TYPE DOUBLE PRECISION USING latitude::double precision,
+    ALTER COLUMN longitude TYPE DOUBLE PRECISION USING longitude::double precision,
+    ALTER COLUMN cx TYPE DOUBLE PRECISION,
+    ALTER COLUMN cy TYPE DOUBLE PRECISION,
+    ALTER COLUMN cz TYPE DOUBLE PRECISION;
+ALTER TABLE emergency_requests
+    ALTER COLUMN latitude TYPE DOUBLE PRECISION USING latitude::double precision,
+    ALTER COLUMN longitude TYPE DOUBLE PRECISION USING longitude::double precision;
+
+-- MySQL
+-- ALTER TABLE volunteer_profiles
+--     MODIFY latitude DOUBLE, MODIFY longitude DOUBLE,
+--     MODIFY cx DOUBLE, MODIFY cy DOUBLE, MODIFY cz DOUBLE;
+-- ALTER TABLE emergency_requests
+--     MODIFY latitude DOUBLE NOT NULL, MODIFY longitude DOUBLE NOT NULL;
+
+-- SQLite stores both types as REAL already; no change is needed.
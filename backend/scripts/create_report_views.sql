@@ -0,0 +1,41 @@
+-- Emergency Response Platform - Pre-aggregated admin report statistics (PostgreSQL only)
+-- Creates materialized views with per-day emergency and assignment counts, so the
+-- admin system report sums a few rows per day instead of scanning and grouping the
+-- emergency_requests and assignments tables on every request.
+--
+-- Run once. Afterwards keep the views current with
+--   flask refresh-report-views
+-- (for example from a cron job every 5 minutes). Reports read from the views whenever
+-- they exist, so they lag behind live data by at most the refresh interval.
+
+BEGIN;
+
+-- Emergencies per creation day, status and priority
+CREATE MATERIALIZED VIEW mv_admin_daily_emergency_stats AS
+SELECT date_trunc('day', created_at) AS day,
+       status,
+       priority_level,
+       COUNT(*) AS emergencies,
+       COUNT(*) FILTER (WHERE escalation_count > 0) AS escalated
+FROM emergency_requests
+GROUP BY 1, 2, 3;
+
+-- Assignments per emergency creation day and assignment status, with the totals
+-- needed for the average response time (positive response times only)
+CREATE MATERIALIZED VIEW mv_admin_daily_assignment_stats AS
+SELECT date_trunc('day', e.created_at) AS day,
+       a.status,
+       COUNT(*) AS assignments,
+       COALESCE(SUM(a.response_time_minutes) FILTER (WHERE a.response_time_minutes > 0), 0) AS response_time_total,
+       COUNT(*) FILTER (WHERE a.response_time_minutes > 0) AS response_time_count
+FROM assignments a
+JOIN emergency_requests e ON e.id = a.emergency_id
+GROUP BY 1, 2;
+
+-- REFRESH ... CONCURRENTLY requires a unique index on each view
+CREATE UNIQUE INDEX idx_mv_emergency_stats_key
+    ON mv_admin_daily_emergency_stats (day, status, priority_level);
+CREATE UNIQUE INDEX idx_mv_assignment_stats_key
+    ON mv_admin_daily_assignment_stats (day, status);
+
+COMMIT;
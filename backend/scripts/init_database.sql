@@ -19,7 +19,11 @@ USE emergency_response;
 -- Volunteer profiles indexes  
 -- PRIMARY KEY (id) - automatically created
 -- INDEX idx_location (latitude, longitude) - for spatial queries
+-- INDEX idx_xyz (cx, cy, cz) - unit-vector range scans for radial volunteer matching
+-- INDEX ix_volunteer_profiles_geohash (geohash) - optional geohash cell prefilter for matching
 -- INDEX idx_availability (availability_status) - for filtering available volunteers
+-- INDEX idx_available_location (latitude, longitude) WHERE availability_status = 'available' - radius searches (Postgres only)
+-- INDEX idx_availability_location (availability_status, latitude, longitude) - radius searches (other databases)
 -- FOREIGN KEY (user_id) REFERENCES users(id) - cascade delete
 
 -- Skills table indexes
@@ -30,7 +34,8 @@ USE emergency_response;
 -- Volunteer skills indexes
 -- PRIMARY KEY (id) - automatically created
 -- UNIQUE KEY unique_volunteer_skill (volunteer_id, skill_id) - prevent duplicates
--- INDEX idx_verification_status (verification_status) - for admin queries
+-- INDEX idx_verification_created (verification_status, created_at) - for the pending verification queue
+-- INDEX idx_verification_verified_at (verification_status, verified_at DESC) - for recent verification decisions
 -- INDEX idx_volunteer_verified (volunteer_id, verification_status) - for matching
 -- FOREIGN KEY (volunteer_id) REFERENCES volunteer_profiles(id) - cascade delete
 -- FOREIGN KEY (skill_id) REFERENCES skills(id) - cascade delete
@@ -40,7 +45,13 @@ USE emergency_response;
 -- PRIMARY KEY (id) - automatically created
 -- INDEX idx_location_priority (latitude, longitude, priority_level) - for matching
 -- INDEX idx_status_created (status, created_at) - for dashboard queries
--- INDEX idx_authority (authority_id) - for authority dashboard
+-- INDEX idx_authority_created (authority_id, created_at) - for authority lists and reports
+-- INDEX idx_authority_status (authority_id, status) - for authority dashboard counts
+-- INDEX idx_dispatch (status, priority_score DESC, created_at) - for emergencies by urgency
+-- INDEX idx_status_expires (status, expires_at) - for the escalation timeout check
+-- INDEX idx_created_status_priority (created_at, status, priority_level) - covers report counts by period
+-- priority_score - STORED generated column computed from priority_level (low 1 to critical 4);
+--   existing databases add it with scripts/add_emergency_priority_score.sql
 -- FOREIGN KEY (authority_id) REFERENCES users(id) - cascade delete
 
 -- Emergency required skills indexes
@@ -54,6 +65,10 @@ USE emergency_response;
 -- UNIQUE KEY unique_assignment (emergency_id, volunteer_id) - prevent duplicates
 -- INDEX idx_volunteer_status (volunteer_id, status) - for volunteer dashboard
 -- INDEX idx_emergency_status (emergency_id, status) - for emergency tracking
+-- INDEX idx_assigned_at (assigned_at) - for assignment lists ordered by assignment time
+-- response_time_minutes, completion_time_minutes, total_time_minutes - STORED generated columns
+--   computed from the assignment timestamps; existing databases add them with
+--   scripts/add_assignment_timing_columns.sql
 -- FOREIGN KEY (emergency_id) REFERENCES emergency_requests(id) - cascade delete
 -- FOREIGN KEY (volunteer_id) REFERENCES volunteer_profiles(id) - cascade delete
 
@@ -61,8 +76,17 @@ USE emergency_response;
 -- PRIMARY KEY (id) - automatically created
 -- INDEX idx_user_action (user_id, action) - for user activity queries
 -- INDEX idx_entity (entity_type, entity_id) - for entity activity queries
--- INDEX idx_created_at (created_at) - for chronological queries
+-- INDEX idx_created_at_cover (created_at) INCLUDE (action, entity_type, entity_id, user_id) - for recent activity pages (INCLUDE on Postgres only)
+-- INDEX idx_activity_details_gin USING GIN (details jsonb_path_ops) - for searches on details keys (Postgres only)
+-- INDEX idx_activity_details_volunteer ((details->>'volunteer_id')) - Postgres only
+-- INDEX idx_activity_details_emergency ((details->>'emergency_id')) - Postgres only
 -- FOREIGN KEY (user_id) REFERENCES users(id) - set null on delete
+-- FOREIGN KEY (user_agent_id) REFERENCES user_agents(id) - shared User-Agent strings;
+--   existing databases are migrated with scripts/add_user_agents_table.sql
+
+-- User agents indexes
+-- PRIMARY KEY (id) - automatically created
+-- UNIQUE KEY (hash) - SHA-1 of the User-Agent string, for lookups while logging
 
 -- Performance optimization settings
 SET GLOBAL innodb_buffer_pool_size = 268435456; -- 256MB, adjust based on available memory
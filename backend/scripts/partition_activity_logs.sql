@@ -0,0 +1,75 @@
+-- Emergency Response Platform - Partition activity_logs by month (PostgreSQL only)
+-- Converts the append-only activity_logs table into a table range-partitioned on
+-- created_at, so recent-activity queries only touch the newest partitions and old
+-- audit data can be removed by dropping whole partitions instead of DELETE.
+--
+-- Run once during a maintenance window. Afterwards, keep upcoming months created with
+--   flask create-log-partitions
+-- and remove expired months with
+--   flask prune-activity-logs --keep-months 12
+-- (for example from a monthly cron job).
+--
+-- Requires the user_agents table; run add_user_agents_table.sql first. The table is
+-- rebuilt with every index declared on the ActivityLog model, including the details
+-- indexes from add_activity_details_indexes.sql, which need not be run afterwards.
+
+BEGIN;
+
+ALTER TABLE activity_logs RENAME TO activity_logs_unpartitioned;
+
+CREATE TABLE activity_logs (
+    id INTEGER NOT NULL DEFAULT nextval('activity_logs_id_seq'),
+    user_id INTEGER REFERENCES users(id),
+    action VARCHAR(100) NOT NULL,
+    entity_type VARCHAR(50) NOT NULL,
+    entity_id INTEGER,
+    details JSONB,
+    ip_address VARCHAR(45),
+    user_agent_id INTEGER REFERENCES user_agents(id),
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT TIMEZONE('utc', CURRENT_TIMESTAMP),
+    -- The partition key must be part of the primary key
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+ALTER SEQUENCE activity_logs_id_seq OWNED BY activity_logs.id;
+
+-- One partition for everything before the current month, then one per month
+DO $$
+DECLARE
+    month_start TIMESTAMP := date_trunc('month', TIMEZONE('utc', CURRENT_TIMESTAMP));
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE activity_logs_history PARTITION OF activity_logs FOR VALUES FROM (MINVALUE) TO (%L)',
+        month_start
+    );
+    FOR i IN 0..3 LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF activity_logs FOR VALUES FROM (%L) TO (%L)',
+            'activity_logs_' || to_char(month_start + make_interval(months => i), 'YYYY_MM'),
+            month_start + make_interval(months => i),
+            month_start + make_interval(months => i + 1)
+        );
+    END LOOP;
+END $$;
+
+INSERT INTO activity_logs (id, user_id, action, entity_type, entity_id, details,
+                           ip_address, user_agent_id, created_at)
+SELECT id, user_id, action, entity_type, entity_id, details,
+       ip_address, user_agent_id, COALESCE(created_at, TIMEZONE('utc', CURRENT_TIMESTAMP))
+FROM activity_logs_unpartitioned;
+
+DROP TABLE activity_logs_unpartitioned;
+
+-- Indexes declared on the parent are created on every partition
+CREATE INDEX idx_user_action ON activity_logs (user_id, action);
+CREATE INDEX idx_entity ON activity_logs (entity_type, entity_id);
+CREATE INDEX idx_created_at_cover ON activity_logs (created_at)
+    INCLUDE (action, entity_type, entity_id, user_id);
+
+-- JSONB details indexes (also added to unpartitioned tables by
+-- add_activity_details_indexes.sql), so running that script first loses nothing
+CREATE INDEX idx_activity_details_gin ON activity_logs USING GIN (details jsonb_path_ops);
+CREATE INDEX idx_activity_details_volunteer ON activity_logs ((details->>'volunteer_id'));
+CREATE INDEX idx_activity_details_emergency ON activity_logs ((details->>'emergency_id'));
+
+COMMIT;